@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncEngine
 
 from app.config import settings
 from app.db.base import Base
-from app.models import pet, user  
+from app.models import pet, revoked_token, user  
 
 
 config = context.config
@@ -0,0 +1,40 @@
+"""pg_trgm GIN indexes for substring search on pets
+
+Revision ID: 0002_pets_trgm_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-18 10:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_pets_trgm_indexes"
+down_revision: Union[str, None] = "0001_initial_schema"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRGM_FIELDS = ("name", "type", "breed", "color")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY не блокирует запись в таблицу на время построения индекса,
+    # но не может выполняться внутри транзакции
+    with op.get_context().autocommit_block():
+        for field in TRGM_FIELDS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_pets_{field}_trgm "
+                f"ON pets USING gin ({field} gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for field in TRGM_FIELDS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_pets_{field}_trgm")
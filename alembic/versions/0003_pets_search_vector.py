@@ -0,0 +1,47 @@
+"""stored russian tsvector column for full-text pet search
+
+Revision ID: 0003_pets_search_vector
+Revises: 0002_pets_trgm_indexes
+Create Date: 2026-10-18 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_pets_search_vector"
+down_revision: Union[str, None] = "0002_pets_trgm_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian'::regconfig, name), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, breed), 'B') || "
+    "setweight(to_tsvector('russian'::regconfig, type), 'B') || "
+    "setweight(to_tsvector('russian'::regconfig, color), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Генерируемая колонка заполняется для существующих строк при добавлении
+    # (с перезаписью таблицы) и далее поддерживается самой БД
+    op.execute(
+        "ALTER TABLE pets ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+    )
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_pets_search_vector "
+            "ON pets USING gin (search_vector)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_pets_search_vector")
+    op.execute("ALTER TABLE pets DROP COLUMN IF EXISTS search_vector")
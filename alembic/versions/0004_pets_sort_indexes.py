@@ -0,0 +1,45 @@
+"""composite indexes for sorted keyset pagination of pets
+
+Revision ID: 0004_pets_sort_indexes
+Revises: 0003_pets_search_vector
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_pets_sort_indexes"
+down_revision: Union[str, None] = "0003_pets_search_vector"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRICE_ASC_SORT_SQL = "coalesce(price, 'Infinity'::double precision)"
+PRICE_DESC_SORT_SQL = "coalesce(price, '-Infinity'::double precision)"
+
+SORT_INDEXES = {
+    "ix_pets_price_asc_id": f"{PRICE_ASC_SORT_SQL}, id",
+    "ix_pets_price_desc_id": f"{PRICE_DESC_SORT_SQL}, id",
+    "ix_pets_age_id": "age, id",
+    "ix_pets_created_at_id": "created_at, id",
+    "ix_pets_is_available_price_id": f"is_available, {PRICE_ASC_SORT_SQL}, id",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, columns in SORT_INDEXES.items():
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON pets ({columns})"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in SORT_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,32 @@
+"""version column of pets for optimistic concurrency
+
+Revision ID: 0005_pets_version
+Revises: 0004_pets_sort_indexes
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_pets_version"
+down_revision: Union[str, None] = "0004_pets_sort_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Константное значение по умолчанию не требует перезаписи таблицы.
+    # Колонка уже есть, если таблицу создал create_all при старте приложения
+    op.execute(
+        "ALTER TABLE pets ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE pets DROP COLUMN IF EXISTS version")
@@ -0,0 +1,46 @@
+"""revoked tokens
+
+Revision ID: 0006_revoked_tokens
+Revises: 0005_pets_version
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_revoked_tokens"
+down_revision: Union[str, None] = "0005_pets_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Таблица могла быть уже создана через Base.metadata.create_all в lifespan
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("revoked_tokens"):
+        op.create_table(
+            "revoked_tokens",
+            sa.Column("jti", sa.String(length=32), nullable=False),
+            sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+            sa.PrimaryKeyConstraint("jti"),
+        )
+    op.create_index(
+        "ix_revoked_tokens_expires_at",
+        "revoked_tokens",
+        ["expires_at"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_revoked_tokens_expires_at", table_name="revoked_tokens", if_exists=True
+    )
+    op.drop_table("revoked_tokens")
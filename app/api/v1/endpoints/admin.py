@@ -1,11 +1,45 @@
-from typing import Any, List, Optional
+import tempfile
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from app import crud, models, schemas
-from app.core.security import get_current_active_superuser
-from app.db.session import get_db
+from app import crud, schemas
+from app.config import settings
+from app.core.cache import cache
+from app.core.cdn import purge_pet, purge_pets
+from app.core.conditional import (
+    etag_matches,
+    has_conditions,
+    make_etag,
+    not_modified_response,
+    validator_headers,
+)
+from app.core.export import iter_csv, iter_ndjson
+from app.core.imports import import_jobs, run_import
+from app.core.pagination import InvalidCursorError
+from app.core.serialization import dump_models_json
+from app.core.suggest import SUGGEST_FIELDS, suggest_index
+from app.core.security import get_current_active_superuser, token_cache
+from app.crud.pet import EXPORT_COLUMNS, StaleVersionError, schema_columns
+from app.db.base import engine
+from app.db.pool import pool_stats
+from app.db.session import get_read_db, get_session_factory, get_write_db, replicas
+from app.dependencies import get_pet_search_params
 
 router = APIRouter()
 
@@ -13,25 +47,216 @@ router = APIRouter()
 @router.post("/pets", response_model=schemas.PetAdmin)
 async def create_pet(
     pet_in: schemas.PetCreate,
-    db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_superuser),
+    db: AsyncSession = Depends(get_write_db),
+    current_user: schemas.Principal = Depends(get_current_active_superuser),
 ) -> Any:
     """
     Создать нового питомца (только для администраторов).
     """
-    pet = await crud.pet.create(db=db, obj_in=pet_in)
+    pet = await crud.pet.create_row(
+        db=db, obj_in=pet_in, returning=schema_columns(schemas.PetAdmin)
+    )
+    await purge_pet(pet.id)
+    suggest_index.add_values(pet_in.model_dump())
     return pet
 
 
+@router.post("/pets/bulk", response_model=schemas.PetBulkCreateResult)
+async def create_pets_bulk(
+    pets_in: List[Dict[str, Any]] = Body(..., description="Список питомцев в формате PetCreate"),
+    db: AsyncSession = Depends(get_write_db),
+    current_user: schemas.Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Массовое создание питомцев (только для администраторов).
+
+    Каждый питомец проверяется отдельно: прошедшие проверку вставляются
+    многострочными INSERT в одной транзакции, для остальных возвращаются
+    ошибки с позицией во входном списке.
+    """
+    if len(pets_in) > settings.PET_BULK_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Можно создать не более {settings.PET_BULK_MAX_SIZE} питомцев за раз"
+        )
+
+    valid: List[schemas.PetCreate] = []
+    indexes: List[int] = []
+    errors = []
+    for index, item in enumerate(pets_in):
+        try:
+            valid.append(schemas.PetCreate.model_validate(item))
+        except ValidationError as e:
+            errors.append({"index": index, "errors": e.errors(include_url=False)})
+            continue
+        indexes.append(index)
+
+    rows = await crud.pet.create_many(
+        db=db, objs_in=valid, batch_size=settings.PET_BULK_INSERT_BATCH_SIZE
+    )
+    if rows:
+        await purge_pets(row.id for row in rows)
+        for pet_in in valid:
+            suggest_index.add_values(pet_in.model_dump())
+    return {
+        "created": [{"index": index, "id": row.id} for index, row in zip(indexes, rows)],
+        "errors": jsonable_encoder(errors),
+    }
+
+
+# Размер фрагмента при сохранении загружаемого файла
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+@router.post("/pets/import", response_model=schemas.PetImportJob, status_code=202)
+async def import_pets(
+    file: UploadFile = File(..., description="CSV с заголовком, колонки как в PetCreate"),
+    session_factory: sessionmaker = Depends(get_session_factory),
+    current_user: schemas.Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Импорт питомцев из CSV, например выгрузки поставщика (только для администраторов).
+
+    Файл обрабатывается в фоне порциями: строки проверяются схемой PetCreate,
+    загружаются через COPY во временную таблицу и сливаются с каталогом.
+    Питомец с той же кличкой, видом и породой обновляется, остальные
+    создаются. Ход выполнения - в `GET /admin/pets/import/{job_id}`.
+    """
+    # Загруженный файл закрывается вместе с запросом, поэтому задача
+    # получает собственную копию
+    spool = tempfile.TemporaryFile()
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            spool.write(chunk)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+
+    job = await import_jobs.create(file.filename)
+    import_jobs.start(
+        run_import(
+            job,
+            spool,
+            session_factory,
+            chunk_size=settings.PET_IMPORT_CHUNK_SIZE,
+            on_progress=import_jobs.save,
+        )
+    )
+    return job.as_dict()
+
+
+@router.get("/pets/import/{job_id}", response_model=schemas.PetImportJob)
+async def read_import_job(
+    job_id: str,
+    current_user: schemas.Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Состояние задачи импорта: счетчики строк и первые ошибки проверки.
+    """
+    job = await import_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Задача импорта не найдена"
+        )
+    return job
+
+
+async def _after_bulk_change(
+    db: AsyncSession, pet_ids: List[int], *, suggest_changed: bool
+) -> None:
+    """
+    Сбросить производные данные после массового изменения каталога.
+    """
+    if not pet_ids:
+        return
+    await purge_pets(pet_ids)
+    if suggest_changed:
+        # Прежние значения не читались, поэтому индекс подсказок строится заново
+        suggest_index.load(
+            await crud.pet.distinct_value_counts(db, fields=SUGGEST_FIELDS)
+        )
+
+
+@router.post("/pets/bulk-update", response_model=schemas.PetBulkResult)
+async def update_pets_by_filter(
+    bulk_in: schemas.PetBulkUpdate,
+    dry_run: bool = Query(False, description="Только посчитать затрагиваемых питомцев"),
+    db: AsyncSession = Depends(get_write_db),
+    current_user: schemas.Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Изменить всех питомцев, подходящих под фильтр, одним запросом
+    (только для администраторов).
+
+    Фильтры работают так же, как в поиске (строки - по подстроке), поэтому
+    перед изменением стоит проверить количество с `dry_run=true`.
+    """
+    # Версия относится к одному питомцу, при массовом изменении она не проверяется
+    values = bulk_in.patch.model_dump(exclude_unset=True, exclude={"version"})
+    if not values:
+        raise HTTPException(
+            status_code=400,
+            detail="Не указаны изменяемые поля"
+        )
+    if not crud.pet.has_filters(bulk_in.filter):
+        raise HTTPException(
+            status_code=400,
+            detail="Укажите хотя бы один фильтр"
+        )
+    if dry_run:
+        count = await crud.pet.count_exact(db=db, params=bulk_in.filter)
+        return {"count": count, "dry_run": True}
+
+    pet_ids = await crud.pet.update_by_filter(db=db, params=bulk_in.filter, values=values)
+    await _after_bulk_change(
+        db, pet_ids, suggest_changed=not values.keys().isdisjoint(SUGGEST_FIELDS)
+    )
+    return {"count": len(pet_ids), "dry_run": False}
+
+
+@router.post("/pets/bulk-delete", response_model=schemas.PetBulkResult)
+async def delete_pets_by_filter(
+    bulk_in: schemas.PetBulkDelete,
+    dry_run: bool = Query(False, description="Только посчитать затрагиваемых питомцев"),
+    db: AsyncSession = Depends(get_write_db),
+    current_user: schemas.Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Удалить всех питомцев, подходящих под фильтр, одним запросом
+    (только для администраторов).
+    """
+    if not crud.pet.has_filters(bulk_in.filter):
+        raise HTTPException(
+            status_code=400,
+            detail="Укажите хотя бы один фильтр"
+        )
+    if dry_run:
+        count = await crud.pet.count_exact(db=db, params=bulk_in.filter)
+        return {"count": count, "dry_run": True}
+
+    pet_ids = await crud.pet.delete_by_filter(db=db, params=bulk_in.filter)
+    await _after_bulk_change(db, pet_ids, suggest_changed=True)
+    return {"count": len(pet_ids), "dry_run": False}
+
+
 @router.put("/pets/{pet_id}", response_model=schemas.PetAdmin)
 async def update_pet(
+    request: Request,
+    response: Response,
     pet_id: int,
     pet_in: schemas.PetUpdate,
-    db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_superuser),
+    db: AsyncSession = Depends(get_write_db),
+    current_user: schemas.Principal = Depends(get_current_active_superuser),
 ) -> Any:
     """
     Обновить данные питомца (только для администраторов).
+
+    Оптимистичная блокировка: клиент передает ETag из заголовка If-Match
+    или поле `version`, полученные при чтении питомца. Если питомец с тех пор
+    изменился, возвращается 409 - нужно перечитать его и повторить правку.
+    Без If-Match и `version` последнее изменение перезаписывает предыдущие.
     """
     pet = await crud.pet.get(db=db, id=pet_id)
     if not pet:
@@ -39,75 +264,185 @@ async def update_pet(
             status_code=404,
             detail="Питомец не найден"
         )
-    pet = await crud.pet.update(db=db, db_obj=pet, obj_in=pet_in)
+    version = pet_in.version
+    if_match = request.headers.get("if-match")
+    if if_match is not None:
+        if not etag_matches(if_match, make_etag(pet.id, pet.updated_at)):
+            raise HTTPException(
+                status_code=409,
+                detail="Питомец был изменен, получите актуальную версию"
+            )
+        # ETag совпал с прочитанной записью: ее версия и есть условие обновления
+        version = pet.version if version is None else version
+    old_values = {field: getattr(pet, field) for field in SUGGEST_FIELDS}
+    try:
+        pet = await crud.pet.update(db=db, db_obj=pet, obj_in=pet_in, version=version)
+    except StaleVersionError:
+        raise HTTPException(
+            status_code=409,
+            detail="Питомец был изменен, получите актуальную версию"
+        )
+    await purge_pet(pet.id)
+    suggest_index.discard_values(old_values)
+    suggest_index.add_values({field: getattr(pet, field) for field in SUGGEST_FIELDS})
+    response.headers.update(validator_headers(pet.id, pet.updated_at))
     return pet
 
 
 @router.delete("/pets/{pet_id}", response_model=schemas.PetAdmin)
 async def delete_pet(
     pet_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_superuser),
+    db: AsyncSession = Depends(get_write_db),
+    current_user: schemas.Principal = Depends(get_current_active_superuser),
 ) -> Any:
     """
     Удалить питомца (только для администраторов).
     """
-    pet = await crud.pet.get(db=db, id=pet_id)
+    pet = await crud.pet.remove_row(
+        db=db, id=pet_id, returning=schema_columns(schemas.PetAdmin)
+    )
     if not pet:
         raise HTTPException(
             status_code=404,
             detail="Питомец не найден"
         )
-    pet = await crud.pet.remove(db=db, id=pet_id)
+    await purge_pet(pet_id)
+    suggest_index.discard_values({field: getattr(pet, field) for field in SUGGEST_FIELDS})
     return pet
 
 
 @router.get("/pets", response_model=List[schemas.PetAdmin])
 async def read_pets(
-    name: Optional[str] = None,
-    type: Optional[str] = None,
-    breed: Optional[str] = None,
-    color: Optional[str] = None,
-    min_age: Optional[float] = None,
-    max_age: Optional[float] = None,
-    is_available: Optional[bool] = None,
+    search_params: schemas.PetSearchParams = Depends(get_pet_search_params),
+    sort: schemas.PetSort = Query(schemas.PetSort.id, description="Порядок сортировки"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_superuser),
+    cursor: Optional[str] = Query(
+        None, description="Курсор следующей страницы из заголовка X-Next-Cursor"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: schemas.Principal = Depends(get_current_active_superuser),
 ) -> Any:
     """
     Получить список питомцев с возможностью фильтрации (только для администраторов).
+
+    Строки из БД сериализуются напрямую по схеме PetAdmin, без повторной
+    валидации каждого питомца.
     """
-    search_params = schemas.PetSearchParams(
-        name=name,
-        type=type,
-        breed=breed,
-        color=color,
-        min_age=min_age,
-        max_age=max_age,
-        is_available=is_available,
+    try:
+        pets = await crud.pet.search_rows(
+            db=db,
+            params=search_params,
+            columns=schema_columns(schemas.PetAdmin),
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {}
+    next_cursor = crud.pet.next_cursor(pets, limit=limit, sort=sort)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return Response(
+        content=dump_models_json(pets, schemas.PetAdmin),
+        media_type="application/json",
+        headers=headers,
     )
-    
-    pets = await crud.pet.search(
-        db=db, params=search_params, skip=skip, limit=limit
+
+
+@router.get("/pets/export", response_class=StreamingResponse)
+async def export_pets(
+    search_params: schemas.PetSearchParams = Depends(get_pet_search_params),
+    format: schemas.ExportFormat = Query(
+        schemas.ExportFormat.ndjson, description="Формат выгрузки"
+    ),
+    session_factory: sessionmaker = Depends(get_session_factory),
+    current_user: schemas.Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Потоковая выгрузка каталога в NDJSON или CSV (только для администраторов).
+
+    Поддерживает те же фильтры, что и поиск. Строки отправляются по мере
+    чтения из БД, поэтому выгрузка не накапливает каталог в памяти.
+    """
+    async def content():
+        # Сессия живет столько же, сколько передача ответа
+        async with session_factory() as session:
+            batches = crud.pet.stream_rows(session, params=search_params)
+            if format == schemas.ExportFormat.csv:
+                chunks = iter_csv(batches, [column.key for column in EXPORT_COLUMNS])
+            else:
+                chunks = iter_ndjson(batches)
+            async for chunk in chunks:
+                yield chunk
+
+    if format == schemas.ExportFormat.csv:
+        media_type = "text/csv; charset=utf-8"
+    else:
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        content(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="pets.{format.value}"'},
     )
-    return pets
 
 
 @router.get("/pets/{pet_id}", response_model=schemas.PetAdmin)
 async def read_pet(
+    request: Request,
+    response: Response,
     pet_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_superuser),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: schemas.Principal = Depends(get_current_active_superuser),
 ) -> Any:
     """
     Получить детальную информацию о питомце, включая секретные поля (только для администраторов).
+
+    Поддерживает условные запросы (If-None-Match, If-Modified-Since).
     """
+    if has_conditions(request.headers):
+        updated_at = await crud.pet.get_updated_at(db=db, id=pet_id)
+        not_modified = not_modified_response(request.headers, pet_id, updated_at)
+        if not_modified is not None:
+            return not_modified
     pet = await crud.pet.get(db=db, id=pet_id)
     if not pet:
         raise HTTPException(
             status_code=404,
             detail="Питомец не найден"
         )
-    return pet
\ No newline at end of file
+    response.headers.update(validator_headers(pet.id, pet.updated_at))
+    return pet
+
+
+@router.get("/cache/stats")
+async def read_cache_stats(
+    current_user: schemas.Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Статистика кешей в текущем воркере (только для администраторов).
+    """
+    return {
+        "cache": cache.stats(),
+        "tokens": token_cache.stats(),
+    }
+
+
+@router.get("/db/pool")
+async def read_pool_stats(
+    current_user: schemas.Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Пулы соединений с БД в текущем воркере (только для администраторов).
+
+    Показывает занятые соединения, переполнение, время получения соединения
+    и сколько соединений пул открыл и закрыл, чтобы подобрать размер пула.
+    """
+    return {
+        "profile": settings.DB_PROFILE,
+        "primary": pool_stats(engine),
+        "replicas": [pool_stats(replica) for replica in replicas.engines],
+    }
@@ -1,18 +1,51 @@
 from datetime import timedelta
-from typing import Any
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, schemas
+from app import crud, models, schemas
 from app.config import settings
-from app.core.security import create_access_token
+from app.core.security import (
+    REFRESH_TOKEN_TYPE,
+    create_access_token,
+    create_refresh_token,
+    get_token_payload,
+    revoke_token,
+    role_claims,
+    verify_token,
+)
 from app.db.session import get_db
 
 router = APIRouter()
 
 
+def issue_tokens(user: models.User) -> Dict[str, Any]:
+    """
+    Токен доступа и токен обновления для пользователя.
+
+    При AUTH_ROLE_CLAIMS права пользователя записываются в токен доступа,
+    а сам он живет ROLE_CLAIMS_ACCESS_TOKEN_EXPIRE_MINUTES минут.
+    """
+    if settings.AUTH_ROLE_CLAIMS:
+        access_token = create_access_token(
+            user.id,
+            expires_delta=timedelta(minutes=settings.ROLE_CLAIMS_ACCESS_TOKEN_EXPIRE_MINUTES),
+            claims=role_claims(user),
+        )
+    else:
+        access_token = create_access_token(
+            user.id,
+            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        )
+    return {
+        "access_token": access_token,
+        "refresh_token": create_refresh_token(user.id),
+        "token_type": "bearer",
+    }
+
+
 @router.post("/token", response_model=schemas.Token)
 async def login_access_token(
     db: AsyncSession = Depends(get_db),
@@ -32,14 +65,48 @@ async def login_access_token(
         raise HTTPException(
             status_code=400, detail="Неактивный пользователь"
         )
-    
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    return {
-        "access_token": create_access_token(
-            user.id, expires_delta=access_token_expires
-        ),
-        "token_type": "bearer",
-    }
+
+    return issue_tokens(user)
+
+
+@router.post("/refresh", response_model=schemas.Token)
+async def refresh_access_token(
+    token_in: schemas.TokenRefresh,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Получить новые токены по токену обновления.
+
+    Права пользователя читаются из БД, поэтому изменения прав попадают в
+    новый токен доступа. Использованный токен обновления отзывается.
+    """
+    payload = verify_token(token_in.refresh_token, REFRESH_TOKEN_TYPE)
+    user = await crud.user.get(db, id=int(payload["sub"]))
+    if not user:
+        raise HTTPException(
+            status_code=401, detail="Не удалось подтвердить учетные данные"
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=400, detail="Неактивный пользователь"
+        )
+    await revoke_token(db, payload)
+    return issue_tokens(user)
+
+
+@router.post("/revoke", status_code=204)
+async def revoke_tokens(
+    token_in: Optional[schemas.TokenRefresh] = Body(None),
+    payload: Dict[str, Any] = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db),
+) -> None:
+    """
+    Выход: отозвать текущий токен доступа и, если передан, токен обновления.
+    """
+    if token_in is not None:
+        refresh_payload = verify_token(token_in.refresh_token, REFRESH_TOKEN_TYPE)
+        await revoke_token(db, refresh_payload)
+    await revoke_token(db, payload)
 
 
 @router.post("/register-test-superuser", response_model=schemas.User, tags=["tests"])
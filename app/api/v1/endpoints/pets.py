@@ -1,60 +1,214 @@
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
-from app.db.session import get_db
+from app.config import settings
+from app.core.cdn import (
+    CATALOG_POLICY,
+    CATALOG_SURROGATE_KEY,
+    DETAILS_POLICY,
+    pet_surrogate_key,
+)
+from app.core.conditional import (
+    has_conditions,
+    not_modified_response,
+    validator_headers,
+)
+from app.core.pagination import InvalidCursorError
+from app.core.suggest import suggest_index
+from app.crud.pet import FACET_FIELDS
+from app.db.session import get_read_db
+from app.dependencies import get_pet_search_params
 
 router = APIRouter()
 
 
-@router.get("/find", response_model=List[schemas.Pet])
+@router.get("/find", response_model=Union[List[schemas.Pet], schemas.PetSearchPage])
 async def find_pets(
-    name: Optional[str] = None,
-    type: Optional[str] = None,
-    breed: Optional[str] = None,
-    color: Optional[str] = None,
-    min_age: Optional[float] = None,
-    max_age: Optional[float] = None,
-    is_available: Optional[bool] = None,
+    response: Response,
+    search_params: schemas.PetSearchParams = Depends(get_pet_search_params),
+    sort: schemas.PetSort = Query(schemas.PetSort.id, description="Порядок сортировки"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="Курсор следующей страницы из заголовка X-Next-Cursor"
+    ),
+    facets: Optional[str] = Query(
+        None,
+        description="Фасеты через запятую (type, breed, color, is_available); "
+        "если указаны, ответ содержит items и facets",
+    ),
+    count: schemas.CountMode = Query(
+        schemas.CountMode.none,
+        description="Подсчет общего количества в заголовке X-Total-Count: "
+        "exact - точный (кешируется), estimated - оценка планировщика, "
+        "none - без подсчета",
+    ),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Any:
     """
     Поиск питомцев с фильтрами по всем полям.
     """
-    # Создаем объект с параметрами поиска
-    search_params = schemas.PetSearchParams(
-        name=name,
-        type=type,
-        breed=breed,
-        color=color,
-        min_age=min_age,
-        max_age=max_age,
-        is_available=is_available,
-    )
-    
+    facet_names = []
+    if facets:
+        facet_names = list(
+            dict.fromkeys(facet.strip() for facet in facets.split(",") if facet.strip())
+        )
+        unknown = [facet for facet in facet_names if facet not in FACET_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Неизвестные фасеты: {', '.join(unknown)}"
+            )
+
+    headers = CATALOG_POLICY.headers([CATALOG_SURROGATE_KEY])
+    total = await crud.pet.count(db=db, params=search_params, mode=count)
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+        if count == schemas.CountMode.estimated:
+            headers["X-Total-Count-Estimated"] = "true"
+
     # Выполняем поиск
-    pets = await crud.pet.search(
-        db=db, params=search_params, skip=skip, limit=limit
+    try:
+        if not facet_names:
+            # Обычная страница берется из кеша уже сериализованной
+            page = await crud.pet.search_json(
+                db=db,
+                params=search_params,
+                schema=schemas.Pet,
+                skip=skip,
+                limit=limit,
+                cursor=cursor,
+                sort=sort,
+            )
+            if page.next_cursor:
+                headers["X-Next-Cursor"] = page.next_cursor
+            return Response(
+                content=page.body, media_type="application/json", headers=headers
+            )
+
+        pets = await crud.pet.search_rows(
+            db=db,
+            params=search_params,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    next_cursor = crud.pet.next_cursor(pets, limit=limit, sort=sort)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    response.headers.update(headers)
+
+    facet_counts = await crud.pet.facet_counts(
+        db=db, params=search_params, facets=facet_names
     )
+    return {"items": pets, "facets": facet_counts}
+
+
+@router.get("/search", response_model=List[schemas.Pet])
+async def search_pets(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковый запрос"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db),
+) -> Any:
+    """
+    Полнотекстовый поиск питомцев с сортировкой по релевантности.
+    """
+    pets = await crud.pet.full_text_search(db=db, query=q, skip=skip, limit=limit)
+    response.headers.update(CATALOG_POLICY.headers([CATALOG_SURROGATE_KEY]))
     return pets
 
 
+@router.get("/suggest", response_model=List[str])
+async def suggest_values(
+    response: Response,
+    field: schemas.SuggestField,
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+) -> Any:
+    """
+    Подсказки для строки поиска: значения вида, породы или цвета по префиксу.
+
+    Отвечает из индекса в памяти, без обращения к базе данных.
+    """
+    response.headers.update(CATALOG_POLICY.headers([CATALOG_SURROGATE_KEY]))
+    return suggest_index.suggest(field.value, prefix, limit=limit)
+
+
+@router.get("/details", response_model=schemas.PetBatch)
+async def get_pets_details(
+    response: Response,
+    ids: str = Query(..., description="ID питомцев через запятую, например 1,2,3"),
+    db: AsyncSession = Depends(get_read_db),
+) -> Any:
+    """
+    Получить детальную информацию о нескольких питомцах одним запросом.
+
+    Питомцы возвращаются в порядке запрошенных ID, ненайденные ID
+    перечисляются в поле missing.
+    """
+    try:
+        pet_ids = list(dict.fromkeys(int(id) for id in ids.split(",") if id.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="ID питомцев должны быть целыми числами через запятую"
+        )
+    if not pet_ids:
+        raise HTTPException(
+            status_code=400,
+            detail="Не указаны ID питомцев"
+        )
+    if len(pet_ids) > settings.PET_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Можно запросить не более {settings.PET_BATCH_MAX_SIZE} питомцев за раз"
+        )
+
+    pets = await crud.pet.get_public_many(db=db, ids=pet_ids)
+    # Ключи и отсутствующих питомцев: при их создании ответ тоже устареет
+    response.headers.update(
+        DETAILS_POLICY.headers(pet_surrogate_key(id) for id in pet_ids)
+    )
+    found = {pet.id for pet in pets}
+    return {"items": pets, "missing": [id for id in pet_ids if id not in found]}
+
+
 @router.get("/details/{pet_id}", response_model=schemas.Pet)
 async def get_pet_details(
+    request: Request,
+    response: Response,
     pet_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Any:
     """
     Получить детальную информацию о питомце по его ID.
+
+    Поддерживает условные запросы: с If-None-Match или If-Modified-Since
+    сначала читается только время изменения, и если копия клиента
+    актуальна, возвращается 304 без тела.
     """
-    pet = await crud.pet.get(db=db, id=pet_id)
+    cache_headers = DETAILS_POLICY.headers([pet_surrogate_key(pet_id)])
+    if has_conditions(request.headers):
+        updated_at = await crud.pet.get_updated_at(db=db, id=pet_id)
+        not_modified = not_modified_response(request.headers, pet_id, updated_at)
+        if not_modified is not None:
+            not_modified.headers.update(cache_headers)
+            return not_modified
+    pet = await crud.pet.get_public(db=db, id=pet_id)
     if not pet:
         raise HTTPException(
             status_code=404,
             detail="Питомец не найден"
         )
+    response.headers.update(cache_headers)
+    response.headers.update(validator_headers(pet.id, pet.updated_at))
     return pet
\ No newline at end of file
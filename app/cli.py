@@ -0,0 +1,65 @@
+"""
+Команды обслуживания каталога.
+
+Запуск::
+
+    docker-compose exec api python -m app.cli import-pets supplier.csv
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+from app import schemas
+from app.config import settings
+from app.core.cache import cache
+from app.core.imports import ImportJob, run_import
+from app.db.base import engine
+from app.db.session import SessionLocal
+
+
+async def print_progress(job: ImportJob) -> None:
+    print(
+        f"строк: {job.processed}, создано: {job.created}, "
+        f"обновлено: {job.updated}, ошибок: {job.failed}",
+        file=sys.stderr,
+    )
+
+
+async def import_pets(path: str, chunk_size: int) -> int:
+    """
+    Импортировать питомцев из CSV тем же конвейером, что и
+    `POST /admin/pets/import`. Итог задачи выводится в stdout в JSON.
+    """
+    job = ImportJob(os.path.basename(path), max_errors=settings.PET_IMPORT_MAX_ERRORS)
+    try:
+        await run_import(
+            job,
+            open(path, "rb"),
+            SessionLocal,
+            chunk_size=chunk_size,
+            on_progress=print_progress,
+        )
+    finally:
+        await cache.close()
+        await engine.dispose()
+    print(schemas.PetImportJob.model_validate(job.as_dict()).model_dump_json(indent=2))
+    return 0 if job.status == schemas.ImportStatus.finished else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Команды обслуживания каталога")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import-pets", help="Импорт питомцев из CSV")
+    import_parser.add_argument("path", help="CSV с заголовком, колонки как в PetCreate")
+    import_parser.add_argument(
+        "--chunk-size", type=int, default=settings.PET_IMPORT_CHUNK_SIZE
+    )
+    args = parser.parse_args()
+    if args.command == "import-pets":
+        return asyncio.run(import_pets(args.path, args.chunk_size))
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,44 @@
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Literal, Optional, Union
 
 from pydantic import AnyHttpUrl, PostgresDsn, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+# Профили движка БД: dev - лог запросов, небольшой пул; prod - без лога,
+# проверка и переоткрытие соединений, быстрый отказ при исчерпании пула;
+# bench - без лога и проверок, пул без переполнения, чтобы замеры не
+# искажались открытием соединений
+DB_PROFILES: Dict[str, Dict[str, Any]] = {
+    "dev": {
+        "DB_ECHO": True,
+        "DB_POOL_SIZE": 5,
+        "DB_MAX_OVERFLOW": 10,
+        "DB_POOL_TIMEOUT_SECONDS": 30.0,
+        "DB_POOL_RECYCLE_SECONDS": -1,
+        "DB_POOL_PRE_PING": False,
+        "DB_STATEMENT_CACHE_SIZE": 100,
+    },
+    "prod": {
+        "DB_ECHO": False,
+        "DB_POOL_SIZE": 10,
+        "DB_MAX_OVERFLOW": 5,
+        "DB_POOL_TIMEOUT_SECONDS": 5.0,
+        "DB_POOL_RECYCLE_SECONDS": 1800,
+        "DB_POOL_PRE_PING": True,
+        "DB_STATEMENT_CACHE_SIZE": 500,
+    },
+    "bench": {
+        "DB_ECHO": False,
+        "DB_POOL_SIZE": 20,
+        "DB_MAX_OVERFLOW": 0,
+        "DB_POOL_TIMEOUT_SECONDS": 30.0,
+        "DB_POOL_RECYCLE_SECONDS": -1,
+        "DB_POOL_PRE_PING": False,
+        "DB_STATEMENT_CACHE_SIZE": 500,
+    },
+}
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
@@ -43,11 +78,150 @@ class Settings(BaseSettings):
             path=f"{values.data.get('POSTGRES_DB') or ''}",
         )
 
+    # Движок и пул соединений. DB_PROFILE задает набор значений по умолчанию
+    # (см. DB_PROFILES), отдельные переменные DB_* переопределяют его.
+    # Пул у каждого воркера свой: при N воркерах к серверу БД открывается до
+    # N * (DB_POOL_SIZE + DB_MAX_OVERFLOW) соединений
+    DB_PROFILE: Literal["dev", "prod", "bench"] = "dev"
+    # Логировать каждый SQL-запрос
+    DB_ECHO: Optional[bool] = None
+    # Постоянных соединений и сколько еще можно открыть сверх них при пиках
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    # Сколько секунд ждать свободного соединения, затем ошибка
+    DB_POOL_TIMEOUT_SECONDS: Optional[float] = None
+    # Переоткрывать соединения старше этого (-1 - не переоткрывать)
+    DB_POOL_RECYCLE_SECONDS: Optional[int] = None
+    # Проверять соединение перед выдачей из пула
+    DB_POOL_PRE_PING: Optional[bool] = None
+    # Подготовленных запросов на соединение (0 - не кешировать, нужно при
+    # pgbouncer в режиме transaction)
+    DB_STATEMENT_CACHE_SIZE: Optional[int] = None
+
+    @property
+    def db_engine_options(self) -> Dict[str, Any]:
+        """
+        Параметры create_async_engine: профиль DB_PROFILE с переопределениями.
+        """
+        options = dict(DB_PROFILES[self.DB_PROFILE])
+        for name in options:
+            value = getattr(self, name)
+            if value is not None:
+                options[name] = value
+        return {
+            "echo": options["DB_ECHO"],
+            "pool_size": options["DB_POOL_SIZE"],
+            "max_overflow": options["DB_MAX_OVERFLOW"],
+            "pool_timeout": options["DB_POOL_TIMEOUT_SECONDS"],
+            "pool_recycle": options["DB_POOL_RECYCLE_SECONDS"],
+            "pool_pre_ping": options["DB_POOL_PRE_PING"],
+            "connect_args": {
+                # Кеш подготовленных запросов SQLAlchemy и собственный кеш asyncpg
+                "prepared_statement_cache_size": options["DB_STATEMENT_CACHE_SIZE"],
+                "statement_cache_size": options["DB_STATEMENT_CACHE_SIZE"],
+            },
+        }
+
+    # Реплики только для чтения: через запятую, "host" или "host:port".
+    # Пользователь, пароль и база те же, что у основного сервера.
+    # Если реплик нет, все запросы идут на основной сервер
+    POSTGRES_REPLICA_SERVERS: str = ""
+    # Интервал проверки реплик; недоступная реплика исключается до следующей
+    # успешной проверки
+    REPLICA_HEALTH_CHECK_SECONDS: float = 5.0
+    # Сколько секунд после изменения администратор читает с основного сервера,
+    # чтобы сразу видеть свои изменения несмотря на отставание реплик (0 - нет)
+    READ_YOUR_WRITES_SECONDS: float = 10.0
+
+    @property
+    def replica_database_uris(self) -> List[str]:
+        uris = []
+        for server in self.POSTGRES_REPLICA_SERVERS.split(","):
+            server = server.strip()
+            if not server:
+                continue
+            host, _, port = server.partition(":")
+            uris.append(
+                str(
+                    PostgresDsn.build(
+                        scheme="postgresql+asyncpg",
+                        username=self.POSTGRES_USER,
+                        password=self.POSTGRES_PASSWORD,
+                        host=host,
+                        port=int(port) if port else None,
+                        path=self.POSTGRES_DB,
+                    )
+                )
+            )
+        return uris
+
     # Настройки JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     # 60 минут * 24 часа * 7 дней = 7 дней
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    # Права (is_active, is_superuser) в самом токене доступа: проверка прав
+    # без обращения к БД. Изменение прав вступает в силу с новым токеном,
+    # поэтому такие токены живут недолго и обновляются refresh-токеном
+    AUTH_ROLE_CLAIMS: bool = False
+    ROLE_CLAIMS_ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 30
+    # Отозванные токены: фильтр Блума (размер в битах, число хеш-функций)
+    # и период загрузки отзывов, сделанных другими воркерами
+    REVOCATION_BLOOM_BITS: int = 1 << 20
+    REVOCATION_BLOOM_HASHES: int = 7
+    REVOCATION_REFRESH_SECONDS: int = 30
+
+    # Хеширование паролей (bcrypt) вне цикла событий: thread - пул потоков
+    # (bcrypt отпускает GIL), process - пул процессов. Если в работе и в
+    # очереди уже PASSWORD_HASH_MAX_PENDING операций, новые отклоняются с 503
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+
+    # Кеширование
+    # memory - в памяти воркера, shared_memory - общий для воркеров узла,
+    # redis - общий для всех узлов (любой сервер с протоколом Redis)
+    CACHE_BACKEND: Literal["memory", "shared_memory", "redis"] = "memory"
+    CACHE_MEMORY_MAXSIZE: int = 10000
+    CACHE_SHARED_MEMORY_PATH: str = "/dev/shm/pet_shop_cache.sqlite3"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_REDIS_POOL_SIZE: int = 10
+    # Время жизни записей по разделам кеша
+    SEARCH_CACHE_TTL_SECONDS: int = 30
+    PET_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_TTL_SECONDS: int = 60
+    COUNT_CACHE_TTL_SECONDS: int = 60
+    FACET_CACHE_TTL_SECONDS: int = 60
+    # Проверенные токены (в памяти воркера)
+    TOKEN_CACHE_MAXSIZE: int = 10000
+    SUGGEST_INDEX_REFRESH_SECONDS: int = 300
+
+    # HTTP-кеширование публичных ответов обратным прокси / CDN
+    CATALOG_CACHE_MAX_AGE_SECONDS: int = 30
+    CATALOG_CACHE_STALE_SECONDS: int = 60
+    DETAILS_CACHE_MAX_AGE_SECONDS: int = 60
+    DETAILS_CACHE_STALE_SECONDS: int = 300
+    # Адрес сброса кеша прокси по ключам (Surrogate-Key); пусто - не сбрасывать
+    CDN_PURGE_URL: Optional[str] = None
+    CDN_PURGE_TOKEN: Optional[str] = None
+    # Ключей в одном запросе сброса (у Fastly не более 256)
+    CDN_PURGE_BATCH_SIZE: int = 256
+    # При изменении большего числа питомцев сбрасывается только каталог
+    CDN_PURGE_MAX_PET_KEYS: int = 1000
+
+    # Максимальное число питомцев в одном пакетном запросе деталей
+    PET_BATCH_MAX_SIZE: int = 100
+    # Массовое создание: максимум питомцев в запросе и строк в одном INSERT
+    PET_BULK_MAX_SIZE: int = 10000
+    PET_BULK_INSERT_BATCH_SIZE: int = 1000
+    # Импорт CSV: строк в одной порции (проверка, COPY и слияние в одной
+    # транзакции), сколько ошибок хранить в задаче и сколько помнить задачи
+    # (состояние задач хранится в общем кеше)
+    PET_IMPORT_CHUNK_SIZE: int = 5000
+    PET_IMPORT_MAX_ERRORS: int = 100
+    PET_IMPORT_JOB_TTL_SECONDS: int = 60 * 60 * 24
 
     # Суперпользователь
     FIRST_SUPERUSER: str
@@ -0,0 +1,627 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple, TypeVar
+from urllib.parse import unquote, urlparse
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class TTLCache:
+    """
+    Ограниченный по размеру LRU кеш с временем жизни записей.
+
+    Хранится в памяти процесса, поэтому у каждого воркера свой экземпляр.
+    Счетчики попаданий и промахов помогают подобрать размер кеша.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Получить значение по ключу или None, если его нет или оно устарело.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Сохранить значение, вытесняя самые давно использованные записи.
+
+        `ttl` переопределяет время жизни по умолчанию для этой записи.
+        """
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """
+        Удалить запись, если она есть.
+        """
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Удалить все записи (счетчики сохраняются).
+        """
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Статистика использования кеша.
+        """
+        requests = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+        }
+
+
+
+class CacheBackend(ABC):
+    """
+    Хранилище кеша: байтовые значения по строковым ключам с временем жизни.
+
+    Общий кеш (разделяемая память, Redis) позволяет воркерам и узлам
+    использовать результаты друг друга.
+    """
+
+    @abstractmethod
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """
+        Значения ключей в том же порядке; None для отсутствующих.
+        """
+
+    @abstractmethod
+    async def set_many(self, items: Mapping[str, bytes], ttl: Optional[float]) -> None:
+        """
+        Сохранить значения; `ttl` None - без ограничения времени жизни.
+        """
+
+    @abstractmethod
+    async def delete(self, keys: Sequence[str]) -> None:
+        """
+        Удалить ключи.
+        """
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        """
+        Атомарно увеличить целочисленное значение ключа и вернуть новое.
+        """
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """
+        Удалить все записи хранилища.
+        """
+
+    async def close(self) -> None:
+        """
+        Освободить ресурсы хранилища.
+        """
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Кеш в памяти процесса: самый быстрый, но у каждого воркера свой.
+
+    Счетчики (`incr`, например версии разделов) хранятся отдельно от LRU и
+    не вытесняются: вытесненная версия начиналась бы заново с нуля, и под
+    ней снова стали бы доступны записи, сохраненные до сброса раздела.
+    """
+
+    def __init__(self, maxsize: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=float("inf"))
+        self._counters: Dict[str, int] = {}
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return [
+            str(self._counters[key]).encode() if key in self._counters else self._cache.get(key)
+            for key in keys
+        ]
+
+    async def set_many(self, items: Mapping[str, bytes], ttl: Optional[float]) -> None:
+        for key, value in items.items():
+            self._counters.pop(key, None)
+            self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, keys: Sequence[str]) -> None:
+        for key in keys:
+            self._counters.pop(key, None)
+            self._cache.delete(key)
+
+    async def incr(self, key: str) -> int:
+        if key not in self._counters:
+            self._counters[key] = int(self._cache.get(key) or 0)
+            self._cache.delete(key)
+        self._counters[key] += 1
+        return self._counters[key]
+
+    async def clear(self) -> None:
+        self._cache.clear()
+        self._counters.clear()
+
+
+class SharedMemoryCacheBackend(CacheBackend):
+    """
+    Кеш, общий для всех воркеров одного узла.
+
+    Данные лежат в SQLite базе в режиме WAL на tmpfs (по умолчанию /dev/shm),
+    то есть в разделяемой памяти. Обычно операции занимают микросекунды, но
+    при конкурентной записи SQLite ждет блокировку до `timeout`, поэтому они
+    выполняются в отдельном потоке, а не в цикле событий. Поток один: через
+    него последовательно проходят все обращения к соединению.
+    """
+
+    # Через сколько записанных значений удалять устаревшие записи
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache")
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self.path, isolation_level=None, timeout=1.0, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        return await self._run(self._get_many, keys)
+
+    def _get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        placeholders = ",".join("?" * len(keys))
+        rows = self.conn.execute(
+            f"SELECT key, value FROM cache WHERE key IN ({placeholders}) "
+            "AND (expires_at IS NULL OR expires_at > ?)",
+            (*keys, time.time()),
+        ).fetchall()
+        found = dict(rows)
+        return [found.get(key) for key in keys]
+
+    async def set_many(self, items: Mapping[str, bytes], ttl: Optional[float]) -> None:
+        await self._run(self._set_many, items, ttl)
+
+    def _set_many(self, items: Mapping[str, bytes], ttl: Optional[float]) -> None:
+        expires_at = None if ttl is None else time.time() + ttl
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            [(key, value, expires_at) for key, value in items.items()],
+        )
+        self._writes += len(items)
+        if self._writes >= self.PURGE_EVERY:
+            self._writes = 0
+            self.conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    async def delete(self, keys: Sequence[str]) -> None:
+        await self._run(self._delete, keys)
+
+    def _delete(self, keys: Sequence[str]) -> None:
+        self.conn.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in keys])
+
+    async def incr(self, key: str) -> int:
+        return await self._run(self._incr, key)
+
+    def _incr(self, key: str) -> int:
+        row = self.conn.execute(
+            "INSERT INTO cache (key, value, expires_at) VALUES (?, '1', NULL) "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1 "
+            "RETURNING value",
+            (key,),
+        ).fetchone()
+        return int(row[0])
+
+    async def clear(self) -> None:
+        await self._run(self._clear)
+
+    def _clear(self) -> None:
+        self.conn.execute("DELETE FROM cache")
+
+    async def close(self) -> None:
+        await self._run(self._close)
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class CacheBackendError(Exception):
+    """
+    Ошибка, возвращенная сервером кеша.
+    """
+
+
+class _RedisConnection:
+    """
+    Соединение с сервером по протоколу Redis (RESP2).
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def execute_many(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        """
+        Отправить команды одним пакетом (pipelining) и прочитать ответы.
+        """
+        self.writer.write(b"".join(self._encode(command) for command in commands))
+        await self.writer.drain()
+        return [await self._read_reply() for _ in commands]
+
+    @staticmethod
+    def _encode(command: Sequence[Any]) -> bytes:
+        parts = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def _read_reply(self) -> Any:
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Сервер кеша закрыл соединение")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            raise CacheBackendError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = await self.reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+        raise CacheBackendError(f"Неизвестный ответ сервера кеша: {line!r}")
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Кеш на сервере с протоколом Redis, общий для всех воркеров и узлов.
+
+    Соединения открываются по требованию и переиспользуются (до `pool_size`).
+    """
+
+    def __init__(self, url: str, pool_size: int = 10):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.pool_size = pool_size
+        self._idle: List[_RedisConnection] = []
+        self._slots = asyncio.Semaphore(pool_size)
+
+    async def _connect(self) -> _RedisConnection:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        conn = _RedisConnection(reader, writer)
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            await conn.execute_many(setup)
+        return conn
+
+    async def _execute(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else await self._connect()
+            try:
+                replies = await conn.execute_many(commands)
+            except BaseException:
+                # После ошибки в потоке могут остаться непрочитанные ответы
+                # пакета, поэтому соединение не переиспользуется
+                conn.close()
+                raise
+            self._idle.append(conn)
+            return replies
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        (values,) = await self._execute([("MGET", *keys)])
+        return values
+
+    async def set_many(self, items: Mapping[str, bytes], ttl: Optional[float]) -> None:
+        if not items:
+            return
+        if ttl is None:
+            commands = [("SET", key, value) for key, value in items.items()]
+        else:
+            milliseconds = max(1, int(ttl * 1000))
+            commands = [
+                ("SET", key, value, "PX", milliseconds) for key, value in items.items()
+            ]
+        await self._execute(commands)
+
+    async def delete(self, keys: Sequence[str]) -> None:
+        if keys:
+            await self._execute([("DEL", *keys)])
+
+    async def incr(self, key: str) -> int:
+        (value,) = await self._execute([("INCR", key)])
+        return value
+
+    async def clear(self) -> None:
+        # Очищается вся база Redis (номер из CACHE_REDIS_URL), поэтому
+        # для кеша стоит выделять отдельную базу
+        await self._execute([("FLUSHDB",)])
+
+    async def close(self) -> None:
+        while self._idle:
+            conn = self._idle.pop()
+            conn.close()
+            try:
+                await conn.writer.wait_closed()
+            except (OSError, ConnectionError):
+                pass
+
+
+# Ошибки хранилища кеша. Раздел кеша считает их промахом: запросы
+# обслуживаются из БД, пока хранилище недоступно
+CACHE_ERRORS = (CacheBackendError, OSError, asyncio.IncompleteReadError, sqlite3.Error)
+
+
+class CacheNamespace:
+    """
+    Раздел кеша со своим префиксом ключей и временем жизни записей.
+
+    Раздел с `versioned=True` можно целиком сбросить через `invalidate`:
+    номер версии хранится в том же хранилище и входит в ключи, поэтому
+    сброс виден всем воркерам, а старые записи просто истекают.
+
+    Значение, вычисленное по БД, записывается в раздел с версией с той
+    версией, которая прочитана до запроса к БД (`current_version`). Если
+    изменение сбросит версию, пока запрос выполняется, результат окажется
+    под старой версией и никем не будет прочитан.
+
+    Ошибки хранилища не выходят за пределы раздела: чтение возвращает
+    промах, запись пропускается.
+    """
+
+    # Версия, когда хранилище недоступно: чтение - промах, запись пропускается
+    UNAVAILABLE = -1
+
+    def __init__(self, backend: CacheBackend, name: str, ttl: float, versioned: bool):
+        self.backend = backend
+        self.name = name
+        self.ttl = ttl
+        self.versioned = versioned
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Компактный ключ из произвольных частей (например, параметров запроса).
+        """
+        return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+    async def current_version(self) -> Optional[int]:
+        """
+        Текущая версия раздела (None для раздела без версии).
+        """
+        if not self.versioned:
+            return None
+        try:
+            return await self._read_version()
+        except CACHE_ERRORS as e:
+            logger.warning(f"Кеш {self.name} недоступен: {e}")
+            return self.UNAVAILABLE
+
+    async def _read_version(self) -> int:
+        (version,) = await self.backend.get_many([f"{self.name}:version"])
+        return int(version or 0)
+
+    async def _prefix(self, version: Optional[int] = None) -> str:
+        if not self.versioned:
+            return f"{self.name}:"
+        if version is None:
+            version = await self._read_version()
+        return f"{self.name}:{version}:"
+
+    async def get(self, key: str, *, version: Optional[int] = None) -> Optional[bytes]:
+        """
+        Значение по ключу или None.
+        """
+        return (await self.get_many([key], version=version))[key]
+
+    async def get_many(
+        self, keys: Sequence[str], *, version: Optional[int] = None
+    ) -> Dict[str, Optional[bytes]]:
+        """
+        Значения нескольких ключей за одно обращение к хранилищу.
+
+        `version` - версия из `current_version`; если не указана, читается
+        текущая.
+        """
+        values: List[Optional[bytes]] = [None] * len(keys)
+        if version != self.UNAVAILABLE:
+            try:
+                prefix = await self._prefix(version)
+                values = await self.backend.get_many([prefix + key for key in keys])
+            except CACHE_ERRORS as e:
+                logger.warning(f"Кеш {self.name} недоступен: {e}")
+        found = sum(value is not None for value in values)
+        self.hits += found
+        self.misses += len(values) - found
+        return dict(zip(keys, values))
+
+    async def set(
+        self,
+        key: str,
+        value: bytes,
+        ttl: Optional[float] = None,
+        *,
+        version: Optional[int] = None,
+    ) -> None:
+        """
+        Сохранить значение.
+        """
+        await self.set_many({key: value}, ttl=ttl, version=version)
+
+    async def set_many(
+        self,
+        items: Mapping[str, bytes],
+        ttl: Optional[float] = None,
+        *,
+        version: Optional[int] = None,
+    ) -> None:
+        """
+        Сохранить несколько значений за одно обращение к хранилищу.
+
+        Для раздела с версией `version` обязательна: это версия, прочитанная
+        до вычисления значений.
+        """
+        if self.versioned and version is None:
+            raise ValueError(f"Для записи в раздел кеша {self.name} нужна версия")
+        if version == self.UNAVAILABLE:
+            return
+        try:
+            prefix = await self._prefix(version)
+            await self.backend.set_many(
+                {prefix + key: value for key, value in items.items()},
+                ttl=self.ttl if ttl is None else ttl,
+            )
+        except CACHE_ERRORS as e:
+            logger.warning(f"Кеш {self.name} недоступен: {e}")
+
+    async def delete(self, *keys: str) -> None:
+        """
+        Удалить ключи.
+        """
+        try:
+            prefix = await self._prefix()
+            await self.backend.delete([prefix + key for key in keys])
+        except CACHE_ERRORS as e:
+            logger.error(f"Не удалось удалить ключи из кеша {self.name}: {e}")
+
+    async def invalidate(self) -> None:
+        """
+        Сбросить все записи раздела (только для разделов с версией).
+        """
+        if not self.versioned:
+            raise ValueError(f"Раздел кеша {self.name} не поддерживает сброс версии")
+        try:
+            await self.backend.incr(f"{self.name}:version")
+        except CACHE_ERRORS as e:
+            # Данные в БД уже изменены, поэтому запись не отклоняется; старые
+            # страницы истекут через TTL раздела
+            logger.error(f"Не удалось сбросить кеш {self.name}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Статистика попаданий в текущем воркере.
+        """
+        requests = self.hits + self.misses
+        return {
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+        }
+
+
+class Cache:
+    """
+    Точка доступа к кешу приложения: хранилище и его разделы.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._namespaces: Dict[str, CacheNamespace] = {}
+
+    def namespace(self, name: str, *, ttl: float, versioned: bool = False) -> CacheNamespace:
+        """
+        Получить (и при первом обращении создать) раздел кеша.
+        """
+        if name not in self._namespaces:
+            self._namespaces[name] = CacheNamespace(self.backend, name, ttl, versioned)
+        return self._namespaces[name]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "namespaces": {
+                name: namespace.stats() for name, namespace in self._namespaces.items()
+            },
+        }
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def create_cache_backend() -> CacheBackend:
+    """
+    Хранилище кеша, выбранное в настройках (CACHE_BACKEND).
+    """
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.CACHE_REDIS_URL, settings.CACHE_REDIS_POOL_SIZE)
+    if settings.CACHE_BACKEND == "shared_memory":
+        return SharedMemoryCacheBackend(settings.CACHE_SHARED_MEMORY_PATH)
+    return MemoryCacheBackend(settings.CACHE_MEMORY_MAXSIZE)
+
+
+cache = Cache(create_cache_backend())
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import urllib.request
+from typing import Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Ключ всех ответов, зависящих от состава каталога (поиск, подсказки)
+CATALOG_SURROGATE_KEY = "catalog"
+
+PurgeHook = Callable[[Sequence[str]], Awaitable[None]]
+
+_purge_hooks: List[PurgeHook] = []
+
+
+def pet_surrogate_key(pet_id: int) -> str:
+    """
+    Ключ ответов с данными одного питомца.
+    """
+    return f"pet-{pet_id}"
+
+
+class CachePolicy(NamedTuple):
+    """
+    Политика HTTP-кеширования публичного ответа.
+    """
+
+    max_age: int
+    stale_while_revalidate: int
+
+    def headers(self, surrogate_keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Заголовки Cache-Control и Surrogate-Key для ответа.
+        """
+        return {
+            "Cache-Control": (
+                f"public, max-age={self.max_age}, "
+                f"stale-while-revalidate={self.stale_while_revalidate}"
+            ),
+            "Surrogate-Key": " ".join(dict.fromkeys(surrogate_keys)),
+        }
+
+
+CATALOG_POLICY = CachePolicy(
+    settings.CATALOG_CACHE_MAX_AGE_SECONDS, settings.CATALOG_CACHE_STALE_SECONDS
+)
+DETAILS_POLICY = CachePolicy(
+    settings.DETAILS_CACHE_MAX_AGE_SECONDS, settings.DETAILS_CACHE_STALE_SECONDS
+)
+
+
+def register_purge_hook(hook: PurgeHook) -> PurgeHook:
+    """
+    Зарегистрировать обработчик сброса кеша прокси по ключам.
+
+    Можно использовать как декоратор. Обработчик получает список ключей
+    (Surrogate-Key), ответы с которыми больше не актуальны.
+    """
+    _purge_hooks.append(hook)
+    return hook
+
+
+async def purge(keys: Sequence[str]) -> None:
+    """
+    Сбросить кеш прокси по ключам через все зарегистрированные обработчики.
+
+    Обработчик получает ключи пачками по `CDN_PURGE_BATCH_SIZE`: заголовок
+    запроса сброса и число ключей в нем у прокси ограничены. Ошибки
+    обработчиков записываются в лог и не прерывают изменение данных:
+    устаревшие ответы в худшем случае живут до истечения max-age.
+    """
+    size = settings.CDN_PURGE_BATCH_SIZE
+    batches = [keys[start:start + size] for start in range(0, len(keys), size)]
+    for hook in _purge_hooks:
+        for batch in batches:
+            try:
+                await hook(batch)
+            except Exception as e:
+                logger.error(f"Ошибка при сбросе кеша прокси ({len(batch)} ключей): {e}")
+
+
+async def purge_pet(pet_id: int) -> None:
+    """
+    Сбросить кеш прокси после изменения питомца: его детали и весь каталог.
+    """
+    await purge_pets([pet_id])
+
+
+async def purge_pets(pet_ids: Iterable[int]) -> None:
+    """
+    Сбросить кеш прокси после изменения нескольких питомцев.
+
+    Если питомцев больше `CDN_PURGE_MAX_PET_KEYS` (массовые изменения,
+    импорт), сбрасывается только каталог: тысячи запросов сброса обошлись
+    бы дороже, а детали питомцев устареют не дольше их max-age.
+    """
+    keys = [pet_surrogate_key(pet_id) for pet_id in pet_ids]
+    if len(keys) > settings.CDN_PURGE_MAX_PET_KEYS:
+        logger.info(f"Изменено {len(keys)} питомцев, сбрасывается только каталог")
+        keys = []
+    await purge([*keys, CATALOG_SURROGATE_KEY])
+
+
+def http_purge_hook(url: str, token: Optional[str] = None, timeout: float = 5.0) -> PurgeHook:
+    """
+    Обработчик сброса, отправляющий POST на `url` с ключами в заголовке
+    Surrogate-Key (через пробел), как принято у Fastly и Varnish (xkey).
+    """
+
+    def send(keys: Sequence[str]) -> None:
+        request = urllib.request.Request(
+            url, method="POST", headers={"Surrogate-Key": " ".join(keys)}
+        )
+        if token:
+            request.add_header("Authorization", f"Bearer {token}")
+        with urllib.request.urlopen(request, timeout=timeout):
+            pass
+
+    async def hook(keys: Sequence[str]) -> None:
+        await asyncio.to_thread(send, keys)
+
+    return hook
+
+
+if settings.CDN_PURGE_URL:
+    register_purge_hook(http_purge_hook(settings.CDN_PURGE_URL, settings.CDN_PURGE_TOKEN))
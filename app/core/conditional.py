@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def make_etag(id: Any, updated_at: datetime) -> str:
+    """
+    Сильный ETag записи: идентификатор и время последнего изменения с точностью
+    до микросекунды.
+    """
+    version = (_as_utc(updated_at) - _EPOCH) // _MICROSECOND
+    return f'"{id}-{version:x}"'
+
+
+def format_http_date(value: datetime) -> str:
+    """
+    Дата в формате HTTP (RFC 7231), например `Wed, 21 Oct 2015 07:28:00 GMT`.
+    """
+    return format_datetime(_as_utc(value), usegmt=True)
+
+
+def validator_headers(id: Any, updated_at: Optional[datetime]) -> Dict[str, str]:
+    """
+    Заголовки ETag и Last-Modified для записи. Без времени изменения - пусто.
+    """
+    if updated_at is None:
+        return {}
+    return {
+        "ETag": make_etag(id, updated_at),
+        "Last-Modified": format_http_date(updated_at),
+    }
+
+
+def has_conditions(headers: Headers) -> bool:
+    """
+    Запрос содержит условные заголовки If-None-Match или If-Modified-Since.
+    """
+    return "if-none-match" in headers or "if-modified-since" in headers
+
+
+def etag_matches(if_match: str, etag: str) -> bool:
+    """
+    Проверить заголовок If-Match: сильное сравнение, слабые ETag не подходят
+    (RFC 7232, раздел 3.1). `*` совпадает с любой существующей записью.
+    """
+    if if_match.strip() == "*":
+        return True
+    return any(tag.strip() == etag for tag in if_match.split(","))
+
+
+def is_not_modified(headers: Headers, etag: str, last_modified: datetime) -> bool:
+    """
+    Проверить, что у клиента актуальная копия и можно ответить 304.
+
+    If-None-Match имеет приоритет: If-Modified-Since учитывается только если
+    первого заголовка нет (RFC 7232, раздел 6).
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Для If-None-Match используется слабое сравнение
+        candidates = (tag.strip() for tag in if_none_match.split(","))
+        return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            # Некорректная дата игнорируется
+            return False
+        # В HTTP-дате нет долей секунды
+        modified = _as_utc(last_modified).replace(microsecond=0)
+        return modified <= _as_utc(since)
+    return False
+
+
+def not_modified_response(
+    headers: Headers, id: Any, updated_at: Optional[datetime]
+) -> Optional[Response]:
+    """
+    Ответ 304 Not Modified, если копия клиента актуальна, иначе None.
+    """
+    if updated_at is None:
+        return None
+    if not is_not_modified(headers, make_etag(id, updated_at), updated_at):
+        return None
+    return Response(status_code=304, headers=validator_headers(id, updated_at))
@@ -43,4 +43,16 @@ class BadRequestError(HTTPException):
         super().__init__(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=detail
-        )
\ No newline at end of file
+        )
+
+
+class ServiceUnavailableError(HTTPException):
+    """
+    Исключение для случаев, когда сервер временно перегружен.
+    """
+    def __init__(self, detail: str = "Сервис перегружен, повторите запрос позже", retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
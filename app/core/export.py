@@ -0,0 +1,49 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Mapping, Sequence
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в JSON")
+
+
+async def iter_ndjson(
+    batches: AsyncIterator[Sequence[Mapping[str, Any]]]
+) -> AsyncIterator[bytes]:
+    """
+    Преобразовать порции строк в NDJSON: один JSON объект на строку,
+    одна порция - один фрагмент ответа.
+    """
+    async for batch in batches:
+        yield "".join(
+            json.dumps(dict(row), default=_json_default, ensure_ascii=False) + "\n"
+            for row in batch
+        ).encode("utf-8")
+
+
+async def iter_csv(
+    batches: AsyncIterator[Sequence[Mapping[str, Any]]], columns: Sequence[str]
+) -> AsyncIterator[bytes]:
+    """
+    Преобразовать порции строк в CSV с заголовком, одна порция - один фрагмент ответа.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        for row in batch:
+            writer.writerow(
+                [
+                    value.isoformat() if isinstance(value, datetime) else value
+                    for value in (row[column] for column in columns)
+                ]
+            )
+        yield buffer.getvalue().encode("utf-8")
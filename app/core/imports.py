@@ -0,0 +1,287 @@
+import asyncio
+import csv
+import io
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+)
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, schemas
+from app.config import settings
+from app.core.cache import CacheNamespace, cache
+from app.core.cdn import purge_pets
+from app.core.suggest import SUGGEST_FIELDS, suggest_index
+
+logger = logging.getLogger(__name__)
+
+# Обязательные колонки файла импорта
+REQUIRED_COLUMNS = tuple(
+    name for name, field in schemas.PetCreate.model_fields.items() if field.is_required()
+)
+
+# Строка файла: номер строки и значения колонок
+CsvRow = Tuple[int, Dict[str, str]]
+ValidRow = Tuple[int, schemas.PetCreate]
+
+
+class ImportFileError(ValueError):
+    """
+    Файл импорта не удается прочитать как CSV с питомцами.
+    """
+
+
+class ImportJob:
+    """
+    Задача импорта: состояние, счетчики и первые `max_errors` ошибок проверки.
+    """
+
+    def __init__(self, filename: Optional[str] = None, max_errors: int = 100):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.status = schemas.ImportStatus.pending
+        self.processed = 0
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.detail: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.max_errors = max_errors
+
+    @property
+    def done(self) -> bool:
+        return self.status in (schemas.ImportStatus.finished, schemas.ImportStatus.failed)
+
+    def add_errors(self, errors: List[Dict[str, Any]]) -> None:
+        self.failed += len(errors)
+        room = self.max_errors - len(self.errors)
+        if room > 0:
+            self.errors.extend(errors[:room])
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "processed": self.processed,
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "detail": self.detail,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class ImportJobRegistry:
+    """
+    Задачи импорта: состояние хранится в разделе общего кеша.
+
+    Задача выполняется в воркере, принявшем файл, а ее состояние сохраняется
+    в кеш после каждой порции, поэтому запрос состояния может прийти в любой
+    воркер (с хранилищем shared_memory или redis). Задачи забываются через
+    TTL раздела. Запущенные задачи текущего процесса держатся здесь же,
+    чтобы их не собрал сборщик мусора и их можно было отменить при остановке.
+
+    Задачи, созданные в текущем процессе, кроме того хранятся локально до
+    истечения TTL после завершения: кеш может вытеснить запись (хранилище
+    memory ограничено по размеру), а состояние своей задачи теряться не должно.
+    """
+
+    def __init__(self, namespace: CacheNamespace):
+        self.namespace = namespace
+        self._tasks: Set[asyncio.Task] = set()
+        self._jobs: Dict[str, ImportJob] = {}
+
+    async def create(self, filename: Optional[str] = None) -> ImportJob:
+        self._forget_expired()
+        job = ImportJob(filename, max_errors=settings.PET_IMPORT_MAX_ERRORS)
+        self._jobs[job.id] = job
+        await self.save(job)
+        return job
+
+    def _forget_expired(self) -> None:
+        now = datetime.now(timezone.utc)
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and (
+                (now - job.finished_at).total_seconds() > self.namespace.ttl
+            ):
+                del self._jobs[job_id]
+
+    async def save(self, job: ImportJob) -> None:
+        """
+        Сохранить текущее состояние задачи.
+        """
+        state = schemas.PetImportJob.model_validate(job.as_dict())
+        await self.namespace.set(job.id, state.model_dump_json().encode())
+
+    async def get(self, job_id: str) -> Optional[schemas.PetImportJob]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return schemas.PetImportJob.model_validate(job.as_dict())
+        state = await self.namespace.get(job_id)
+        if state is None:
+            return None
+        return schemas.PetImportJob.model_validate_json(state)
+
+    def start(self, coro: Coroutine[Any, Any, None]) -> asyncio.Task:
+        """
+        Запустить задачу в фоне.
+        """
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def close(self) -> None:
+        """
+        Прервать незавершенные задачи.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+def read_chunks(text: TextIO, chunk_size: int) -> Iterator[List[CsvRow]]:
+    """
+    Читать CSV с заголовком порциями по `chunk_size` строк.
+
+    Пустые значения пропускаются, поэтому для них действуют значения по
+    умолчанию схемы. Без обязательных колонок - ImportFileError.
+    """
+    reader = csv.DictReader(text)
+    columns = reader.fieldnames or []
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ImportFileError(f"В файле нет обязательных колонок: {', '.join(missing)}")
+
+    chunk: List[CsvRow] = []
+    for row in reader:
+        values = {
+            name: value
+            for name, value in row.items()
+            if name is not None and value not in ("", None)
+        }
+        chunk.append((reader.line_num, values))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_rows(rows: List[CsvRow]) -> Tuple[List[ValidRow], List[Dict[str, Any]]]:
+    """
+    Проверить строки схемой PetCreate: (прошедшие проверку, ошибки по строкам).
+    """
+    valid: List[ValidRow] = []
+    errors: List[Dict[str, Any]] = []
+    for line, values in rows:
+        try:
+            valid.append((line, schemas.PetCreate.model_validate(values)))
+        except ValidationError as e:
+            errors.append(
+                {"line": line, "errors": jsonable_encoder(e.errors(include_url=False))}
+            )
+    return valid, errors
+
+
+def _next_chunk(
+    chunks: Iterator[List[CsvRow]],
+) -> Optional[Tuple[int, List[ValidRow], List[Dict[str, Any]]]]:
+    rows = next(chunks, None)
+    if rows is None:
+        return None
+    return (len(rows), *validate_rows(rows))
+
+
+async def run_import(
+    job: ImportJob,
+    file: BinaryIO,
+    session_factory: sessionmaker,
+    *,
+    chunk_size: int,
+    on_progress: Optional[Callable[[ImportJob], Awaitable[None]]] = None,
+) -> None:
+    """
+    Импортировать CSV из `file` (байты, UTF-8) и закрыть его.
+
+    Чтение и проверка порции выполняются в отдельном потоке, чтобы не
+    задерживать цикл событий. Каждая порция загружается через COPY и
+    сливается с каталогом в своей транзакции (`crud.pet.copy_upsert`), поэтому
+    при сбое уже загруженные порции остаются в каталоге. Ход выполнения
+    и ошибки записываются в `job`, после каждой порции и по завершении
+    вызывается `on_progress`.
+    """
+    job.status = schemas.ImportStatus.running
+    job.started_at = datetime.now(timezone.utc)
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        chunks = read_chunks(text, chunk_size)
+        while True:
+            chunk = await asyncio.to_thread(_next_chunk, chunks)
+            if chunk is None:
+                break
+            count, valid, errors = chunk
+            job.add_errors(errors)
+            if valid:
+                async with session_factory() as db:
+                    result = await crud.pet.copy_upsert(db, rows=valid)
+                job.created += len(result.created)
+                job.updated += len(result.updated)
+                if result.created or result.updated:
+                    # Созданные тоже: ответы деталей с их ID помечены как
+                    # "не найден" под теми же ключами
+                    await purge_pets([*result.created, *result.updated])
+            job.processed += count
+            if on_progress is not None:
+                await on_progress(job)
+
+        if job.created or job.updated:
+            async with session_factory() as db:
+                counts = await crud.pet.distinct_value_counts(db, fields=SUGGEST_FIELDS)
+            suggest_index.load(counts)
+        job.status = schemas.ImportStatus.finished
+    except asyncio.CancelledError:
+        job.status = schemas.ImportStatus.failed
+        job.detail = "Импорт прерван"
+        raise
+    except (ImportFileError, UnicodeDecodeError, csv.Error) as e:
+        job.status = schemas.ImportStatus.failed
+        job.detail = f"Некорректный файл: {e}"
+    except Exception as e:
+        logger.exception(f"Ошибка импорта {job.id}")
+        job.status = schemas.ImportStatus.failed
+        job.detail = f"Ошибка импорта: {e}"
+    finally:
+        job.finished_at = datetime.now(timezone.utc)
+        text.close()
+        if on_progress is not None:
+            await on_progress(job)
+        logger.info(
+            f"Импорт {job.id}: {job.status.value}, строк {job.processed}, "
+            f"создано {job.created}, обновлено {job.updated}, ошибок {job.failed}"
+        )
+
+
+import_jobs = ImportJobRegistry(
+    cache.namespace("import_jobs", ttl=settings.PET_IMPORT_JOB_TTL_SECONDS)
+)
@@ -0,0 +1,32 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Sequence
+
+
+class InvalidCursorError(ValueError):
+    """
+    Курсор пагинации поврежден или не подходит к запросу.
+    """
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Упаковать значения ключа сортировки последней записи страницы в непрозрачный курсор.
+    """
+    raw = json.dumps(list(values), separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """
+    Распаковать курсор, полученный из `encode_cursor`.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidCursorError("Некорректный курсор") from e
+    if not isinstance(values, list) or not values:
+        raise InvalidCursorError("Некорректный курсор")
+    return values
@@ -0,0 +1,88 @@
+import hashlib
+import time
+from typing import Dict, Iterable, Iterator, Tuple
+
+from app.config import settings
+
+
+class BloomFilter:
+    """
+    Фильтр Блума: компактная проверка принадлежности без ложных отрицаний.
+
+    `might_contain` может ошибочно ответить True, но никогда не ответит False
+    для добавленного значения.
+    """
+
+    def __init__(self, bits: int, hashes: int):
+        self.bits = bits
+        self.hashes = hashes
+        self._array = bytearray((bits + 7) // 8)
+
+    def _positions(self, value: str) -> Iterator[int]:
+        # Двойное хеширование: k позиций из двух половин одного дайджеста
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, value: str) -> bool:
+        return all(
+            self._array[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class RevocationSet:
+    """
+    Отозванные токены (их jti) со сроком действия.
+
+    Проверка выполняется при каждом запросе: почти все токены не отозваны,
+    и для них достаточно фильтра Блума. Только при его срабатывании
+    сверяется точное множество, поэтому ложных отказов не бывает. Токены
+    с истекшим сроком забываются при перестроении.
+    """
+
+    def __init__(self, bits: int, hashes: int):
+        self._bits = bits
+        self._hashes = hashes
+        self._bloom = BloomFilter(bits, hashes)
+        self._expires: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def __contains__(self, jti: object) -> bool:
+        if not isinstance(jti, str) or not self._bloom.might_contain(jti):
+            return False
+        return jti in self._expires
+
+    def add(self, jti: str, expires_at: float) -> None:
+        """
+        Отозвать токен до `expires_at` (unix time).
+        """
+        self._expires[jti] = expires_at
+        self._bloom.add(jti)
+
+    def load(self, items: Iterable[Tuple[str, float]]) -> None:
+        """
+        Заменить содержимое (jti, срок действия) и перестроить фильтр,
+        отбросив истекшие токены. Локально отозванные токены, которых еще
+        нет в `items`, сохраняются.
+        """
+        now = time.time()
+        expires = {jti: expires_at for jti, expires_at in self._expires.items() if expires_at > now}
+        expires.update((jti, expires_at) for jti, expires_at in items if expires_at > now)
+        bloom = BloomFilter(self._bits, self._hashes)
+        for jti in expires:
+            bloom.add(jti)
+        self._bloom, self._expires = bloom, expires
+
+
+revoked_tokens = RevocationSet(
+    bits=settings.REVOCATION_BLOOM_BITS, hashes=settings.REVOCATION_BLOOM_HASHES
+)
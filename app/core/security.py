@@ -1,5 +1,9 @@
-from datetime import datetime, timedelta
-from typing import Any, Union
+import asyncio
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, TypeVar, Union
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -7,16 +11,31 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, models, schemas
+from app import crud, schemas
 from app.config import settings
+from app.core.cache import TTLCache
+from app.core.exceptions import ServiceUnavailableError
+from app.core.revocation import revoked_tokens
 from app.db.session import get_db
 
+T = TypeVar("T")
+
+# Тип токена (claim typ): токеном обновления нельзя обращаться к API
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/token"
 )
 
+# Уже проверенные токены и их полезная нагрузка: повторный запрос с тем же
+# токеном не пересчитывает HMAC подписи. Запись живет не дольше самого токена
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAXSIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Проверка пароля по хешу."""
@@ -28,51 +47,229 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHashingPool:
+    """
+    Пул для хеширования паролей вне цикла событий.
+
+    Одна операция bcrypt занимает 100-300 мс процессора; вызванная прямо в
+    обработчике, она останавливает все запросы воркера. Пул выполняет ее
+    в `workers` потоках или процессах. Ограничение `max_pending` (в работе
+    и в очереди) не дает шторму входов занять пул надолго: лишние операции
+    сразу получают 503 с заголовком Retry-After.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        max_pending: int,
+        use_processes: bool = False,
+        retry_after: int = 1,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self.retry_after = retry_after
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        # Пул создается при первой операции: процессы не должны
+        # запускаться при импорте модуля
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Выполнить `func(*args)` в пуле или отклонить, если пул переполнен.
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ServiceUnavailableError(retry_after=self.retry_after)
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hashing = PasswordHashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    use_processes=settings.PASSWORD_HASH_EXECUTOR == "process",
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Проверка пароля по хешу в пуле хеширования."""
+    return await password_hashing.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Получение хеша пароля в пуле хеширования."""
+    return await password_hashing.run(get_password_hash, password)
+
+
+def _encode_token(
+    subject: Union[str, Any], expires_delta: timedelta, token_type: str, claims: Dict[str, Any]
+) -> str:
+    to_encode = {
+        **claims,
+        "exp": datetime.utcnow() + expires_delta,
+        "sub": str(subject),
+        "typ": token_type,
+        # Идентификатор токена для отзыва
+        "jti": uuid.uuid4().hex,
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
 def create_access_token(
-    subject: Union[str, Any], expires_delta: timedelta = None
+    subject: Union[str, Any],
+    expires_delta: timedelta = None,
+    *,
+    claims: Optional[Dict[str, Any]] = None,
 ) -> str:
-    """Создание JWT токена."""
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
-    return encoded_jwt
+    """
+    Создание JWT токена.
 
+    `claims` добавляются в полезную нагрузку, например права пользователя
+    из `role_claims`: с ними проверка прав не обращается к БД.
+    """
+    if not expires_delta:
+        expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return _encode_token(subject, expires_delta, ACCESS_TOKEN_TYPE, claims or {})
 
-async def get_current_user(
-    db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> models.User:
-    """Получение текущего пользователя по JWT токену."""
-    credentials_exception = HTTPException(
+
+def create_refresh_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+    """Создание токена обновления для получения новых токенов доступа."""
+    if not expires_delta:
+        expires_delta = timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    return _encode_token(subject, expires_delta, REFRESH_TOKEN_TYPE, {})
+
+
+def role_claims(user: Any) -> Dict[str, bool]:
+    """Права пользователя для полезной нагрузки токена доступа."""
+    return {"is_active": bool(user.is_active), "is_superuser": bool(user.is_superuser)}
+
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """
+    Проверить подпись и срок действия JWT токена и вернуть его полезную нагрузку.
+
+    Результат проверки запоминается в `token_cache` до истечения токена.
+    Отзыв токена здесь не проверяется.
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        token_cache.set(token, payload, ttl=min(expires_in, token_cache.ttl))
+    return payload
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Не удалось подтвердить учетные данные",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def verify_token(token: str, token_type: str = ACCESS_TOKEN_TYPE) -> Dict[str, Any]:
+    """
+    Полезная нагрузка действующего токена типа `token_type`.
+
+    Токены без типа (выданные до появления токенов обновления) считаются
+    токенами доступа. Отозванный, просроченный или поддельный токен - 401.
+    """
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        token_data = schemas.TokenPayload(sub=int(user_id))
+        payload = decode_token(token)
     except JWTError:
-        raise credentials_exception
-    user = await crud.user.get(db, id=token_data.sub)
-    if not user:
-        raise credentials_exception
-    return user
+        raise _credentials_exception()
+    if payload.get("typ", ACCESS_TOKEN_TYPE) != token_type:
+        raise _credentials_exception()
+    if payload.get("jti") in revoked_tokens:
+        raise _credentials_exception()
+    return payload
+
+
+async def revoke_token(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """
+    Отозвать токен до истечения его срока: сразу в этом воркере, в остальных -
+    при следующей загрузке отзывов из БД.
+    """
+    jti = payload.get("jti")
+    if jti is None:
+        return
+    expires_at = float(payload["exp"])
+    await crud.revoked_token.revoke(
+        db, jti=jti, expires_at=datetime.fromtimestamp(expires_at, timezone.utc)
+    )
+    revoked_tokens.add(jti, expires_at)
+
+
+async def get_token_payload(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
+    """Полезная нагрузка действующего токена доступа из заголовка Authorization."""
+    return verify_token(token)
+
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
+    payload: Dict[str, Any] = Depends(get_token_payload),
+) -> schemas.Principal:
+    """
+    Получение текущего пользователя по JWT токену.
+
+    Возвращаются только сведения для проверки прав (id, is_active,
+    is_superuser). При AUTH_ROLE_CLAIMS права берутся из самого токена без
+    БД, иначе - из кеша и только при промахе из БД. Права в токенах,
+    выданных до отключения AUTH_ROLE_CLAIMS, не учитываются.
+    """
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        raise _credentials_exception()
+    token_data = schemas.TokenPayload(sub=int(user_id))
+    has_claims = "is_active" in payload and "is_superuser" in payload
+    if settings.AUTH_ROLE_CLAIMS and has_claims:
+        return schemas.Principal(
+            id=token_data.sub,
+            is_active=payload["is_active"],
+            is_superuser=payload["is_superuser"],
+        )
+    principal = await crud.user.get_principal(db, id=token_data.sub)
+    if not principal:
+        raise _credentials_exception()
+    return principal
 
 
 async def get_current_active_user(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: schemas.Principal = Depends(get_current_user),
+) -> schemas.Principal:
     """Проверка, что текущий пользователь активен."""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Неактивный пользователь")
@@ -80,8 +277,8 @@ async def get_current_active_user(
 
 
 async def get_current_active_superuser(
-    current_user: models.User = Depends(get_current_active_user),
-) -> models.User:
+    current_user: schemas.Principal = Depends(get_current_active_user),
+) -> schemas.Principal:
     """Проверка, что текущий пользователь является суперпользователем."""
     if not current_user.is_superuser:
         raise HTTPException(
@@ -0,0 +1,105 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+# Поля, для которых строятся подсказки
+SUGGEST_FIELDS = ("type", "breed", "color")
+
+
+def _normalize(value: str) -> str:
+    return value.casefold().replace("ё", "е")
+
+
+class SuggestIndex:
+    """
+    Индекс различных значений полей для автодополнения по префиксу.
+
+    Для каждого поля хранится отсортированный список нормализованных значений,
+    поэтому поиск по префиксу - это двоичный поиск без обращения к БД.
+    Счетчик ссылок на значение позволяет убрать его, когда последний
+    питомец с этим значением удален или изменен.
+    """
+
+    def __init__(self, fields: Iterable[str] = SUGGEST_FIELDS):
+        self.fields = tuple(fields)
+        self._keys: Dict[str, List[str]] = {field: [] for field in self.fields}
+        self._entries: Dict[str, Dict[str, Tuple[str, int]]] = {
+            field: {} for field in self.fields
+        }
+
+    def load(self, counts: Mapping[str, Mapping[str, int]]) -> None:
+        """
+        Полностью заменить содержимое индекса: {поле: {значение: количество}}.
+        """
+        for field in self.fields:
+            entries: Dict[str, Tuple[str, int]] = {}
+            for value, count in counts.get(field, {}).items():
+                if value is None or count <= 0:
+                    continue
+                key = _normalize(value)
+                _, previous = entries.get(key, (value, 0))
+                entries[key] = (value, previous + count)
+            self._entries[field] = entries
+            self._keys[field] = sorted(entries)
+
+    def add(self, field: str, value: str) -> None:
+        """
+        Учесть еще одного питомца со значением `value` поля `field`.
+        """
+        key = _normalize(value)
+        entries = self._entries[field]
+        if key in entries:
+            display, count = entries[key]
+            entries[key] = (display, count + 1)
+        else:
+            entries[key] = (value, 1)
+            insort(self._keys[field], key)
+
+    def discard(self, field: str, value: str) -> None:
+        """
+        Убрать одного питомца со значением `value` поля `field`.
+        """
+        key = _normalize(value)
+        entries = self._entries[field]
+        if key not in entries:
+            return
+        display, count = entries[key]
+        if count > 1:
+            entries[key] = (display, count - 1)
+            return
+        del entries[key]
+        keys = self._keys[field]
+        del keys[bisect_left(keys, key)]
+
+    def add_values(self, values: Mapping[str, str]) -> None:
+        """
+        Учесть значения полей нового питомца.
+        """
+        for field in self.fields:
+            if values.get(field):
+                self.add(field, values[field])
+
+    def discard_values(self, values: Mapping[str, str]) -> None:
+        """
+        Убрать значения полей удаленного питомца.
+        """
+        for field in self.fields:
+            if values.get(field):
+                self.discard(field, values[field])
+
+    def suggest(self, field: str, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Значения поля, начинающиеся с `prefix` (без учета регистра), по алфавиту.
+        """
+        key_prefix = _normalize(prefix)
+        keys = self._keys[field]
+        entries = self._entries[field]
+        suggestions = []
+        for index in range(bisect_left(keys, key_prefix), len(keys)):
+            key = keys[index]
+            if not key.startswith(key_prefix) or len(suggestions) >= limit:
+                break
+            suggestions.append(entries[key][0])
+        return suggestions
+
+
+suggest_index = SuggestIndex()
@@ -1,4 +1,5 @@
 from app.crud.pet import pet
+from app.crud.revoked_token import revoked_token
 from app.crud.user import user
 
-__all__ = ["pet", "user"]
\ No newline at end of file
+__all__ = ["pet", "revoked_token", "user"]
\ No newline at end of file
@@ -1,10 +1,12 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from datetime import datetime
+from typing import Any, Dict, Generic, List, Optional, Sequence, Type, TypeVar, Union
 
-from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import Row, Select, any_, bindparam, delete, insert, inspect, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import CacheNamespace
 from app.db.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -23,15 +25,96 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         * `schema`: Pydantic модель (схема) для чтения/создания/обновления
         """
         self.model = model
+        # Счетчик изменений: увеличивается при каждой записи через этот объект,
+        # кеши чтения включают его в ключ и так узнают об устаревании
+        self.generation = 0
+        # Разделы общего кеша, которые сбрасываются при каждой записи
+        self.invalidates: List[CacheNamespace] = []
+        # Опции загрузки ORM объектов (например, undefer для отложенных колонок)
+        self.load_options: Sequence[Any] = ()
+
+    async def _after_write(self) -> None:
+        """
+        Отметить изменение данных для кешей чтения.
+        """
+        self.generation += 1
+        for namespace in self.invalidates:
+            await namespace.invalidate()
+
+    @staticmethod
+    def _id_of(db_obj: ModelType) -> Any:
+        """
+        ID объекта из ключа identity map.
+
+        Чтение атрибута `db_obj.id` у объекта, устаревшего после commit,
+        потребовало бы неявной загрузки из БД, недоступной в async сессии.
+        """
+        (id,) = inspect(db_obj).identity
+        return id
 
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         """
         Получить запись по ID.
         """
-        stmt = select(self.model).where(self.model.id == id)
+        stmt = select(self.model).options(*self.load_options).where(self.model.id == id)
         result = await db.execute(stmt)
         return result.scalars().first()
 
+    async def get_row(
+        self, db: AsyncSession, id: Any, *, columns: Sequence[Any]
+    ) -> Optional[Row]:
+        """
+        Получить только колонки `columns` записи по ID, без создания ORM объекта.
+        """
+        stmt = select(*columns).where(self.model.id == id)
+        result = await db.execute(stmt)
+        return result.first()
+
+    async def get_many(self, db: AsyncSession, ids: Sequence[Any]) -> List[ModelType]:
+        """
+        Получить записи по списку ID одним запросом.
+
+        Записи возвращаются в порядке запрошенных ID, повторы схлопываются,
+        отсутствующие ID пропускаются.
+        """
+        stmt = select(self.model).options(*self.load_options)
+        return await self._select_many(db, stmt, ids, scalars=True)
+
+    async def get_many_rows(
+        self, db: AsyncSession, ids: Sequence[Any], *, columns: Sequence[Any]
+    ) -> List[Row]:
+        """
+        То же, что `get_many`, но только колонки `columns`, без ORM объектов.
+        """
+        return await self._select_many(db, select(*columns), ids, scalars=False)
+
+    async def _select_many(
+        self, db: AsyncSession, stmt: Select, ids: Sequence[Any], *, scalars: bool
+    ) -> List[Any]:
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return []
+        # Один параметр-массив вместо IN (...): текст запроса не зависит от
+        # количества ID, поэтому подготовленный запрос переиспользуется
+        id_column = self.model.id
+        stmt = stmt.where(
+            id_column == any_(bindparam("ids", ids, type_=ARRAY(id_column.type)))
+        )
+        result = await db.execute(stmt)
+        found = result.scalars().all() if scalars else result.all()
+        by_id = {obj.id: obj for obj in found}
+        return [by_id[id] for id in ids if id in by_id]
+
+    async def get_updated_at(self, db: AsyncSession, id: Any) -> Optional[datetime]:
+        """
+        Получить только время последнего изменения записи (для проверки версии).
+
+        Возвращает None, если запись не найдена.
+        """
+        stmt = select(self.model.updated_at).where(self.model.id == id)
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none()
+
     async def get_multi(
         self, db: AsyncSession, *, skip: int = 0, limit: int = 100
     ) -> List[ModelType]:
@@ -42,17 +125,89 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    def _column_values(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Оставить в данных только колонки модели.
+        """
+        columns = self.model.__table__.columns
+        return {key: value for key, value in data.items() if key in columns}
+
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         """
         Создать новую запись.
+
+        Один запрос INSERT ... RETURNING: значения по умолчанию со стороны БД
+        (id, время создания) возвращаются сразу, без повторного чтения.
         """
-        obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
+        return await self._insert(db, obj_in.model_dump())
+
+    async def _insert(self, db: AsyncSession, values: Dict[str, Any]) -> ModelType:
+        stmt = (
+            insert(self.model)
+            .values(**self._column_values(values))
+            .returning(self.model)
+            .options(*self.load_options)
+        )
+        result = await db.scalars(stmt)
+        db_obj = result.one()
         await db.commit()
-        await db.refresh(db_obj)
+        await self._after_write()
         return db_obj
 
+    async def create_row(
+        self, db: AsyncSession, *, obj_in: CreateSchemaType, returning: Sequence[Any] = ()
+    ) -> Row:
+        """
+        Создать запись без ORM объекта: INSERT ... RETURNING `returning`
+        (по умолчанию id).
+        """
+        stmt = (
+            insert(self.model)
+            .values(**self._column_values(obj_in.model_dump()))
+            .returning(*(returning or (self.model.id,)))
+        )
+        result = await db.execute(stmt)
+        row = result.one()
+        await db.commit()
+        await self._after_write()
+        return row
+
+    async def create_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[CreateSchemaType],
+        returning: Sequence[Any] = (),
+        batch_size: int = 1000,
+    ) -> List[Row]:
+        """
+        Создать несколько записей в одной транзакции.
+
+        Записи вставляются многострочными INSERT ... VALUES (...), (...)
+        RETURNING по `batch_size` строк, без ORM объектов. Возвращает строки
+        с колонками `returning` (по умолчанию id) в порядке `objs_in`.
+        """
+        if not objs_in:
+            return []
+        stmt = insert(self.model).returning(
+            *(returning or (self.model.id,)), sort_by_parameter_order=True
+        )
+        result = await db.execute(
+            stmt,
+            [self._column_values(obj_in.model_dump()) for obj_in in objs_in],
+            execution_options={"insertmanyvalues_page_size": batch_size},
+        )
+        rows = result.all()
+        await db.commit()
+        await self._after_write()
+        return rows
+
+    @staticmethod
+    def _update_data(obj_in: Union[UpdateSchemaType, Dict[str, Any]]) -> Dict[str, Any]:
+        if isinstance(obj_in, dict):
+            return obj_in
+        return obj_in.model_dump(exclude_unset=True)
+
     async def update(
         self,
         db: AsyncSession,
@@ -62,25 +217,91 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     ) -> ModelType:
         """
         Обновить запись.
+
+        Один запрос UPDATE ... RETURNING: `db_obj` получает значения из БД,
+        включая вычисляемые ею (например, время изменения).
         """
-        obj_data = jsonable_encoder(db_obj)
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.model_dump(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
+        values = self._column_values(self._update_data(obj_in))
+        if not values:
+            return db_obj
+        stmt = (
+            update(self.model)
+            .where(self.model.id == self._id_of(db_obj))
+            .values(**values)
+            .returning(self.model)
+            .options(*self.load_options)
+            .execution_options(populate_existing=True)
+        )
+        result = await db.scalars(stmt)
+        db_obj = result.one()
         await db.commit()
-        await db.refresh(db_obj)
+        await self._after_write()
         return db_obj
 
-    async def remove(self, db: AsyncSession, *, id: int) -> ModelType:
+    async def update_row(
+        self,
+        db: AsyncSession,
+        *,
+        id: Any,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        returning: Sequence[Any] = (),
+    ) -> Optional[Row]:
+        """
+        Обновить запись по ID без ORM объекта: UPDATE ... RETURNING `returning`
+        (по умолчанию id). Возвращает None, если записи нет.
+        """
+        returning = returning or (self.model.id,)
+        values = self._column_values(self._update_data(obj_in))
+        if not values:
+            return await self.get_row(db, id, columns=returning)
+        stmt = (
+            update(self.model)
+            .where(self.model.id == id)
+            .values(**values)
+            .returning(*returning)
+        )
+        result = await db.execute(stmt)
+        row = result.first()
+        await db.commit()
+        if row is not None:
+            await self._after_write()
+        return row
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[ModelType]:
         """
         Удалить запись.
+
+        Один запрос DELETE ... RETURNING, без предварительного чтения.
+        Возвращает удаленную запись или None, если ее не было.
         """
-        obj = await self.get(db=db, id=id)
-        await db.delete(obj)
+        stmt = (
+            delete(self.model)
+            .where(self.model.id == id)
+            .returning(self.model)
+            .options(*self.load_options)
+        )
+        result = await db.scalars(stmt)
+        obj = result.first()
+        await db.commit()
+        if obj is not None:
+            await self._after_write()
+        return obj
+
+    async def remove_row(
+        self, db: AsyncSession, *, id: Any, returning: Sequence[Any] = ()
+    ) -> Optional[Row]:
+        """
+        Удалить запись по ID без ORM объекта: DELETE ... RETURNING `returning`
+        (по умолчанию id). Возвращает None, если записи не было.
+        """
+        stmt = (
+            delete(self.model)
+            .where(self.model.id == id)
+            .returning(*(returning or (self.model.id,)))
+        )
+        result = await db.execute(stmt)
+        row = result.first()
         await db.commit()
-        return obj
\ No newline at end of file
+        if row is not None:
+            await self._after_write()
+        return row
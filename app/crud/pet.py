@@ -1,49 +1,855 @@
-from typing import List, Optional
+import json
+import math
+from datetime import datetime
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
-from sqlalchemy import and_, or_, select
+from pydantic import BaseModel
+
+from sqlalchemy import (
+    Column,
+    CompoundSelect,
+    Integer,
+    MetaData,
+    Row,
+    Select,
+    Table,
+    and_,
+    delete,
+    exists,
+    false,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    true,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.engine import RowMapping
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import undefer
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
+from app.config import settings
+from app.core.cache import cache
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.core.serialization import dump_models_json, schema_fields
 from app.crud.base import CRUDBase
-from app.models.pet import Pet
-from app.schemas.pet import PetCreate, PetSearchParams, PetUpdate
+from app.db.replicas import is_replica
+from app.models.pet import PRICE_ASC_SORT_SQL, PRICE_DESC_SORT_SQL, Pet
+from app.schemas.pet import (
+    CountMode,
+    Pet as PetSchema,
+    PetCreate,
+    PetSearchParams,
+    PetSort,
+    PetUpdate,
+)
+
+# Поля, по которым можно запросить фасетные счетчики
+FACET_FIELDS = {
+    "type": Pet.type,
+    "breed": Pet.breed,
+    "color": Pet.color,
+    "is_available": Pet.is_available,
+}
+
+
+# Колонки публичной схемы Pet (без секретных полей)
+PUBLIC_COLUMNS = (
+    Pet.id,
+    Pet.name,
+    Pet.type,
+    Pet.breed,
+    Pet.color,
+    Pet.age,
+    Pet.is_available,
+    Pet.price,
+    Pet.created_at,
+    Pet.updated_at,
+)
+
+
+# Колонки выгрузки каталога (все поля схемы PetAdmin)
+EXPORT_COLUMNS = (
+    Pet.id,
+    Pet.name,
+    Pet.type,
+    Pet.breed,
+    Pet.color,
+    Pet.age,
+    Pet.is_available,
+    Pet.price,
+    Pet.secret_notes,
+    Pet.version,
+    Pet.created_at,
+    Pet.updated_at,
+)
+
+# Импорт: ключ, по которому строка файла сопоставляется с питомцем (как в
+# get_by_unique_attributes), и загружаемые колонки
+IMPORT_KEY = (Pet.name, Pet.type, Pet.breed)
+IMPORT_COLUMNS = (
+    *IMPORT_KEY,
+    Pet.color,
+    Pet.age,
+    Pet.is_available,
+    Pet.price,
+    Pet.secret_notes,
+)
+
+# Промежуточная таблица импорта: временная, живет до конца транзакции.
+# line - номер строки файла, при повторах ключа побеждает последняя строка
+_import_staging = Table(
+    "pets_import",
+    MetaData(),
+    Column("line", Integer, nullable=False),
+    *(Column(column.name, column.type) for column in IMPORT_COLUMNS),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+# Ключ advisory-блокировки: слияния импортов выполняются по очереди, иначе
+# два импорта могли бы одновременно вставить питомца с одним ключом
+IMPORT_LOCK_KEY = 7_210_001
+
+
+class ImportResult(NamedTuple):
+    """
+    ID питомцев, созданных и обновленных при слиянии порции импорта.
+    """
+
+    created: List[int]
+    updated: List[int]
+
+
+class _SortKey(NamedTuple):
+    """
+    Ключ сортировки для keyset-пагинации: выражение, направление,
+    значение ключа у записи и разбор этого значения из курсора.
+    """
+
+    expression: Any
+    descending: bool
+    value: Callable[[Pet], Any]
+    parse: Callable[[Any], Any]
+
+
+def _price_or(default: float) -> Callable[[Pet], float]:
+    return lambda pet: pet.price if pet.price is not None else default
+
+
+# Выражения совпадают с индексами из модели Pet (ключ, id)
+SORT_KEYS = {
+    PetSort.id: _SortKey(Pet.id, False, lambda pet: pet.id, int),
+    PetSort.price: _SortKey(
+        literal_column(PRICE_ASC_SORT_SQL), False, _price_or(math.inf), float
+    ),
+    PetSort.price_desc: _SortKey(
+        literal_column(PRICE_DESC_SORT_SQL), True, _price_or(-math.inf), float
+    ),
+    PetSort.age: _SortKey(Pet.age, False, lambda pet: pet.age, float),
+    PetSort.created_at_desc: _SortKey(
+        Pet.created_at,
+        True,
+        lambda pet: pet.created_at.isoformat(),
+        datetime.fromisoformat,
+    ),
+}
+
+
+def _contains_pattern(value: str) -> str:
+    """
+    Шаблон ilike для поиска по подстроке.
+
+    Спецсимволы LIKE экранируются, чтобы пользовательский ввод искался
+    буквально. Такой шаблон обслуживается триграммными индексами pg_trgm.
+    """
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class SearchPage(NamedTuple):
+    """
+    Сериализованная страница результатов поиска.
+    """
+
+    body: bytes
+    next_cursor: Optional[str]
+
+
+@lru_cache(maxsize=None)
+def schema_columns(schema: Type[BaseModel]) -> Tuple[Any, ...]:
+    """
+    Колонки Pet, соответствующие полям схемы `schema`.
+    """
+    return tuple(getattr(Pet, name) for name in schema_fields(schema))
+
+
+class _Explain(Executable, ClauseElement):
+    """
+    EXPLAIN (FORMAT JSON) для запроса: план с оценками без выполнения.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Any):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler: Any, **kw: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+class StaleVersionError(ValueError):
+    """
+    Питомец изменен после того, как клиент прочитал его версию.
+    """
 
 
 class CRUDPet(CRUDBase[Pet, PetCreate, PetUpdate]):
+    def __init__(self, model: Type[Pet]):
+        super().__init__(model)
+        self.search_cache = cache.namespace(
+            "search", ttl=settings.SEARCH_CACHE_TTL_SECONDS, versioned=True
+        )
+        self.invalidates.append(self.search_cache)
+        self.pet_cache = cache.namespace(
+            "pets", ttl=settings.PET_CACHE_TTL_SECONDS, versioned=True
+        )
+        self.invalidates.append(self.pet_cache)
+        self.count_cache = cache.namespace(
+            "counts", ttl=settings.COUNT_CACHE_TTL_SECONDS, versioned=True
+        )
+        self.invalidates.append(self.count_cache)
+        self.facet_cache = cache.namespace(
+            "facets", ttl=settings.FACET_CACHE_TTL_SECONDS, versioned=True
+        )
+        self.invalidates.append(self.facet_cache)
+        # ORM объекты питомцев нужны только администраторским путям,
+        # поэтому секретные заметки загружаются вместе с ними
+        self.load_options = (undefer(Pet.secret_notes),)
+
+    def _update_data(self, obj_in: Union[PetUpdate, Dict[str, Any]]) -> Dict[str, Any]:
+        # Версия из запроса - условие обновления, а не новое значение:
+        # каждое изменение само увеличивает ее на единицу
+        data = dict(super()._update_data(obj_in))
+        data.pop("version", None)
+        if data:
+            data["version"] = Pet.version + 1
+        return data
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: Pet,
+        obj_in: Union[PetUpdate, Dict[str, Any]],
+        version: Optional[int] = None,
+    ) -> Pet:
+        """
+        Обновить питомца без блокировок (оптимистичная блокировка).
+
+        Если известна версия, которую видел клиент (`version` или поле
+        `version` в `obj_in`), выполняется условный
+        `UPDATE ... WHERE id = :id AND version = :version RETURNING ...`.
+        Если запись за это время изменилась, условию не подходит ни одна
+        строка и вызывается `StaleVersionError`. Без версии изменение
+        безусловное.
+        """
+        if version is None:
+            version = self._version_of(obj_in)
+        values = self._column_values(self._update_data(obj_in))
+        if not values:
+            if version is not None and db_obj.version != version:
+                raise StaleVersionError("Питомец был изменен")
+            return db_obj
+        conditions = [Pet.id == self._id_of(db_obj)]
+        if version is not None:
+            conditions.append(Pet.version == version)
+        stmt = (
+            update(Pet)
+            .where(*conditions)
+            .values(**values)
+            .returning(Pet)
+            .options(*self.load_options)
+            .execution_options(populate_existing=True)
+        )
+        result = await db.scalars(stmt)
+        pet = result.one_or_none()
+        if pet is None:
+            await db.rollback()
+            raise StaleVersionError("Питомец был изменен")
+        await db.commit()
+        await self._after_write()
+        return pet
+
+    @staticmethod
+    def _version_of(obj_in: Union[PetUpdate, Dict[str, Any]]) -> Optional[int]:
+        if isinstance(obj_in, dict):
+            return obj_in.get("version")
+        return obj_in.version
+
+    async def get_public(self, db: AsyncSession, id: int) -> Optional[PetSchema]:
+        """
+        Публичные данные питомца по ID или None.
+        """
+        pets = await self.get_public_many(db, [id])
+        return pets[0] if pets else None
+
+    async def get_public_many(
+        self, db: AsyncSession, ids: Sequence[int]
+    ) -> List[PetSchema]:
+        """
+        Публичные данные питомцев по списку ID (как `get_many_rows`).
+
+        Питомцы хранятся в общем кеше (раздел "pets"), из БД одним запросом
+        читаются только недостающие. Запись через CRUD сбрасывает версию
+        раздела во всех воркерах. Прочитанное с реплики в кеш не попадает.
+        """
+        ids = list(dict.fromkeys(ids))
+        version = await self.pet_cache.current_version()
+        cached = await self.pet_cache.get_many([str(id) for id in ids], version=version)
+        pets = {
+            id: PetSchema.model_validate_json(cached[str(id)])
+            for id in ids
+            if cached[str(id)] is not None
+        }
+        missing = [id for id in ids if id not in pets]
+        if missing:
+            rows = await self.get_many_rows(db, missing, columns=PUBLIC_COLUMNS)
+            loaded = {row.id: PetSchema.model_validate(row) for row in rows}
+            if loaded and not is_replica(db):
+                await self.pet_cache.set_many(
+                    {str(id): pet.model_dump_json().encode() for id, pet in loaded.items()},
+                    version=version,
+                )
+            pets.update(loaded)
+        return [pets[id] for id in ids if id in pets]
+
     async def search(
-        self, db: AsyncSession, *, params: PetSearchParams, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        params: PetSearchParams,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort: PetSort = PetSort.id,
     ) -> List[Pet]:
         """
         Поиск питомцев с фильтрами.
+
+        Результаты упорядочены по ключу `sort`, при равенстве - по id.
+        Если передан `cursor`, страница начинается сразу после записи,
+        из которой он построен (keyset-пагинация), и `skip` не используется.
+        Стоимость такой страницы не зависит от ее глубины.
+        """
+        query = self._search_query(
+            select(Pet).options(*self.load_options),
+            params=params,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+        )
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def search_rows(
+        self,
+        db: AsyncSession,
+        *,
+        params: PetSearchParams,
+        columns: Sequence[Any] = PUBLIC_COLUMNS,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort: PetSort = PetSort.id,
+    ) -> List[Row]:
+        """
+        То же, что `search`, но только колонки `columns` в виде строк Core.
+
+        Для публичных путей: не читает секретные заметки и не создает
+        ORM объекты. Строки поддерживают доступ к полям как к атрибутам.
+        """
+        query = self._search_query(
+            select(*columns),
+            params=params,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+        )
+        result = await db.execute(query)
+        return result.all()
+
+    def _search_query(
+        self,
+        query: Select,
+        *,
+        params: PetSearchParams,
+        skip: int,
+        limit: int,
+        cursor: Optional[str],
+        sort: PetSort,
+    ) -> Select:
+        sort_key = SORT_KEYS[sort]
+        conditions = self._filter_conditions(params, sort)
+        if cursor is not None:
+            conditions.append(self._after_cursor(cursor, sort))
+        
+        if conditions:
+            query = query.where(and_(*conditions))
+        
+        # Добавляем пагинацию: стабильный порядок (ключ сортировки, id)
+        if sort_key.descending:
+            query = query.order_by(sort_key.expression.desc(), Pet.id.desc())
+        elif sort == PetSort.id:
+            query = query.order_by(Pet.id)
+        else:
+            query = query.order_by(sort_key.expression, Pet.id)
+        if cursor is None:
+            query = query.offset(skip)
+        return query.limit(limit)
+
+    async def stream_rows(
+        self, db: AsyncSession, *, params: PetSearchParams, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        """
+        Все питомцы, подходящие под фильтры, порциями по `batch_size` строк.
+
+        Строки читаются через серверный курсор без создания ORM объектов,
+        поэтому расход памяти не зависит от размера таблицы.
+        """
+        conditions = self._filter_conditions(params)
+        query = select(*EXPORT_COLUMNS)
+        if conditions:
+            query = query.where(and_(*conditions))
+        query = query.order_by(Pet.id).execution_options(yield_per=batch_size)
+
+        result = await db.stream(query)
+        async for batch in result.mappings().partitions(batch_size):
+            yield batch
+
+    async def search_json(
+        self,
+        db: AsyncSession,
+        *,
+        params: PetSearchParams,
+        schema: Type[BaseModel],
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort: PetSort = PetSort.id,
+    ) -> SearchPage:
+        """
+        Результаты `search`, сериализованные в JSON по схеме `schema`.
+
+        Страницы хранятся в общем кеше (раздел "search") по нормализованным
+        параметрам поиска и пагинации. Запись через CRUD сбрасывает версию
+        раздела, поэтому ранее сохраненные страницы становятся недоступны
+        во всех воркерах. Страницы, прочитанные с реплики, не сохраняются.
+        """
+        key = self.search_cache.make_key(
+            schema.__name__,
+            self._normalized_params(params),
+            skip,
+            limit,
+            cursor,
+            sort.value,
+        )
+        # Версия читается до запроса к БД: страница, посчитанная до
+        # параллельного изменения, сохранится под уже сброшенной версией
+        version = await self.search_cache.current_version()
+        cached = await self.search_cache.get(key, version=version)
+        if cached is not None:
+            next_cursor, _, body = cached.partition(b"\n")
+            return SearchPage(body=body, next_cursor=next_cursor.decode() or None)
+
+        pets = await self.search_rows(
+            db,
+            params=params,
+            columns=schema_columns(schema),
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+        )
+        body = dump_models_json(pets, schema)
+        page = SearchPage(
+            body=body, next_cursor=self.next_cursor(pets, limit=limit, sort=sort)
+        )
+        # Курсор (base64url, без переводов строк) хранится перед телом ответа
+        if not is_replica(db):
+            await self.search_cache.set(
+                key, (page.next_cursor or "").encode() + b"\n" + body, version=version
+            )
+        return page
+
+    async def count(
+        self, db: AsyncSession, *, params: PetSearchParams, mode: CountMode
+    ) -> Optional[int]:
+        """
+        Общее количество результатов поиска.
+
+        * `none` - не считать;
+        * `estimated` - оценка планировщика (EXPLAIN), таблица не сканируется;
+        * `exact` - COUNT(*), результат хранится в общем кеше (раздел "counts")
+          для набора фильтров, так что полный подсчет выполняется один раз,
+          а не для каждой страницы и каждого воркера.
+        """
+        if mode == CountMode.none:
+            return None
+
+        conditions = self._filter_conditions(params)
+        if mode == CountMode.estimated:
+            query = select(Pet.id)
+            if conditions:
+                query = query.where(and_(*conditions))
+            result = await db.execute(_Explain(query))
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+
+        key = self.count_cache.make_key(self._normalized_params(params))
+        # Как и для страниц поиска, версия читается до подсчета
+        version = await self.count_cache.current_version()
+        cached = await self.count_cache.get(key, version=version)
+        if cached is not None:
+            return int(cached)
+        total = await self.count_exact(db, params=params)
+        if not is_replica(db):
+            await self.count_cache.set(key, str(total).encode(), version=version)
+        return total
+
+    async def count_exact(self, db: AsyncSession, *, params: PetSearchParams) -> int:
+        """
+        Точное количество питомцев, подходящих под фильтры, без кеша.
+        """
+        query = select(func.count()).select_from(Pet)
+        conditions = self._filter_conditions(params)
+        if conditions:
+            query = query.where(and_(*conditions))
+        result = await db.execute(query)
+        return result.scalar_one()
+
+    @staticmethod
+    def _normalized_params(params: PetSearchParams) -> Tuple[Tuple[str, Hashable], ...]:
+        # Фильтры по строкам регистронезависимы, поэтому "Кошка" и "кошка" - один ключ
+        return tuple(
+            (field, value.lower() if isinstance(value, str) else value)
+            for field, value in sorted(params.model_dump(exclude_none=True).items())
+        )
+
+    @staticmethod
+    def _filter_conditions(
+        params: PetSearchParams, sort: PetSort = PetSort.price
+    ) -> List[Any]:
+        """
+        Условия WHERE для параметров поиска.
+
+        Диапазон цен задается на выражении индекса сортировки `sort` (по
+        убыванию цены - своем, иначе - по возрастанию), поэтому сортировка
+        по цене читает только нужный диапазон индекса. Питомцы без цены
+        в диапазон не попадают.
         """
         conditions = []
         
         # Применяем фильтры
         if params.name:
-            conditions.append(Pet.name.ilike(f"%{params.name}%"))
+            conditions.append(Pet.name.ilike(_contains_pattern(params.name)))
         if params.type:
-            conditions.append(Pet.type.ilike(f"%{params.type}%"))
+            conditions.append(Pet.type.ilike(_contains_pattern(params.type)))
         if params.breed:
-            conditions.append(Pet.breed.ilike(f"%{params.breed}%"))
+            conditions.append(Pet.breed.ilike(_contains_pattern(params.breed)))
         if params.color:
-            conditions.append(Pet.color.ilike(f"%{params.color}%"))
+            conditions.append(Pet.color.ilike(_contains_pattern(params.color)))
         if params.min_age is not None:
             conditions.append(Pet.age >= params.min_age)
         if params.max_age is not None:
             conditions.append(Pet.age <= params.max_age)
         if params.is_available is not None:
             conditions.append(Pet.is_available == params.is_available)
-        
-        # Формируем запрос
-        query = select(Pet)
+        if params.min_price is not None or params.max_price is not None:
+            if sort == PetSort.price_desc:
+                price, no_price = SORT_KEYS[PetSort.price_desc].expression, -math.inf
+                conditions.append(price > no_price)
+            else:
+                price, no_price = SORT_KEYS[PetSort.price].expression, math.inf
+                conditions.append(price < no_price)
+            if params.min_price is not None:
+                conditions.append(price >= params.min_price)
+            if params.max_price is not None:
+                conditions.append(price <= params.max_price)
+        return conditions
+
+    def has_filters(self, params: PetSearchParams) -> bool:
+        """
+        Заданы ли фильтры, ограничивающие выборку.
+        """
+        return bool(self._filter_conditions(params))
+
+    async def update_by_filter(
+        self, db: AsyncSession, *, params: PetSearchParams, values: Dict[str, Any]
+    ) -> List[int]:
+        """
+        Изменить всех питомцев, подходящих под фильтры, одним UPDATE.
+
+        Возвращает ID измененных питомцев (UPDATE ... RETURNING id).
+        Время изменения (updated_at) обновляется самой БД, версия каждого
+        питомца увеличивается на единицу. Без фильтров изменяются все питомцы.
+        """
+        stmt = (
+            update(Pet)
+            .where(*self._filter_conditions(params))
+            .values(**values, version=Pet.version + 1)
+            .returning(Pet.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+        ids = result.scalars().all()
+        await db.commit()
+        await self._after_write()
+        return ids
+
+    async def delete_by_filter(
+        self, db: AsyncSession, *, params: PetSearchParams
+    ) -> List[int]:
+        """
+        Удалить всех питомцев, подходящих под фильтры, одним DELETE.
+
+        Возвращает ID удаленных питомцев (DELETE ... RETURNING id).
+        Без фильтров удаляются все питомцы.
+        """
+        stmt = (
+            delete(Pet)
+            .where(*self._filter_conditions(params))
+            .returning(Pet.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+        ids = result.scalars().all()
+        await db.commit()
+        await self._after_write()
+        return ids
+
+    async def copy_upsert(
+        self, db: AsyncSession, *, rows: Sequence[Tuple[int, PetCreate]]
+    ) -> ImportResult:
+        """
+        Загрузить порцию проверенных строк импорта и слить их с каталогом.
+
+        `rows` - пары (номер строки файла, питомец). Строки загружаются
+        протоколом COPY (asyncpg `copy_records_to_table`) во временную таблицу,
+        затем один запрос обновляет питомцев с тем же ключом (name, type,
+        breed) и вставляет остальных. Все выполняется в одной транзакции.
+        """
+        await db.execute(select(func.pg_advisory_xact_lock(IMPORT_LOCK_KEY)))
+        await db.execute(CreateTable(_import_staging))
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            _import_staging.name,
+            records=[
+                (line, *(getattr(pet_in, column.name) for column in IMPORT_COLUMNS))
+                for line, pet_in in rows
+            ],
+            columns=[column.name for column in _import_staging.columns],
+        )
+        result = await db.execute(self._merge_import_query())
+        created: List[int] = []
+        updated: List[int] = []
+        for pet_id, is_created in result:
+            (created if is_created else updated).append(pet_id)
+        await db.commit()
+        await self._after_write()
+        return ImportResult(created=created, updated=updated)
+
+    @staticmethod
+    def _merge_import_query() -> CompoundSelect:
+        # Последняя строка файла для каждого ключа
+        staging = _import_staging.c
+        source = (
+            select(*(staging[column.name] for column in IMPORT_COLUMNS))
+            .distinct(*(staging[column.name] for column in IMPORT_KEY))
+            .order_by(*(staging[column.name] for column in IMPORT_KEY), staging.line.desc())
+            .cte("source")
+        )
+        same_key = and_(*(column == source.c[column.name] for column in IMPORT_KEY))
+        fields = IMPORT_COLUMNS[len(IMPORT_KEY):]
+        updated = (
+            update(Pet)
+            # Питомцы, у которых ничего не поменялось, не перезаписываются
+            .where(
+                same_key,
+                tuple_(*fields).is_distinct_from(
+                    tuple_(*(source.c[column.name] for column in fields))
+                ),
+            )
+            .values(
+                **{column.name: source.c[column.name] for column in fields},
+                version=Pet.version + 1,
+            )
+            .returning(Pet.id)
+            .cte("updated")
+        )
+        # Все части запроса видят таблицу до изменений, поэтому NOT EXISTS
+        # отбирает ровно тех, кого не затронул UPDATE. Версия указывается
+        # явно: внутри CTE значение по умолчанию колонки не подставляется
+        inserted = (
+            insert(Pet)
+            .from_select(
+                [*(column.name for column in IMPORT_COLUMNS), Pet.version.name],
+                select(*source.c, literal(1)).where(~exists().where(same_key)),
+            )
+            .returning(Pet.id)
+            .cte("inserted")
+        )
+        return union_all(
+            select(inserted.c.id, true()),
+            select(updated.c.id, false()),
+        )
+
+    async def facet_counts(
+        self, db: AsyncSession, *, params: PetSearchParams, facets: Sequence[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Количество питомцев по значениям фасетов для текущего набора фильтров.
+
+        Все фасеты считаются одним запросом с GROUPING SETS.
+        Счетчики без фильтров хранятся в общем кеше (раздел "facets") до
+        ближайшего изменения каталога.
+        """
+        conditions = self._filter_conditions(params)
+        if conditions:
+            return await self._query_facet_counts(db, conditions, facets)
+
+        version = await self.facet_cache.current_version()
+        cached = await self.facet_cache.get("all", version=version)
+        if cached is not None:
+            counts = json.loads(cached)
+        else:
+            counts = await self._query_facet_counts(db, conditions, tuple(FACET_FIELDS))
+            if not is_replica(db):
+                await self.facet_cache.set(
+                    "all", json.dumps(counts).encode(), version=version
+                )
+        return {facet: counts[facet] for facet in facets}
+
+    @staticmethod
+    async def _query_facet_counts(
+        db: AsyncSession, conditions: List[Any], facets: Sequence[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        columns = [FACET_FIELDS[facet] for facet in facets]
+        count = func.count().label("count")
+        query = select(
+            *columns,
+            *[func.grouping(column) for column in columns],
+            count,
+        )
         if conditions:
             query = query.where(and_(*conditions))
-        
-        # Добавляем пагинацию
-        query = query.offset(skip).limit(limit)
-        
-        # Выполняем запрос
+        query = query.group_by(func.grouping_sets(*columns)).order_by(count.desc())
+
         result = await db.execute(query)
-        return result.scalars().all()
+        counts: Dict[str, List[Dict[str, Any]]] = {facet: [] for facet in facets}
+        for row in result:
+            # GROUPING() = 0 у колонки, по которой сгруппирована строка
+            grouping_flags = row[len(columns):-1]
+            index = grouping_flags.index(0)
+            counts[facets[index]].append({"value": row[index], "count": row[-1]})
+        return counts
+
+    async def distinct_value_counts(
+        self, db: AsyncSession, *, fields: Sequence[str]
+    ) -> Dict[str, Dict[Any, int]]:
+        """
+        Количество питомцев по каждому значению полей `fields` во всем каталоге.
+        """
+        counts = await self._query_facet_counts(db, [], tuple(fields))
+        return {
+            field: {item["value"]: item["count"] for item in values}
+            for field, values in counts.items()
+        }
+
+    async def full_text_search(
+        self, db: AsyncSession, *, query: str, skip: int = 0, limit: int = 100
+    ) -> List[Row]:
+        """
+        Полнотекстовый поиск по кличке, породе, виду и цвету с учетом морфологии.
+
+        Запрос разбирается как в поисковых системах (websearch_to_tsquery),
+        результаты упорядочены по релевантности (ts_rank). Возвращает
+        строки с публичными колонками.
+        """
+        ts_query = func.websearch_to_tsquery("russian", query)
+        rank = func.ts_rank(Pet.search_vector, ts_query)
+        stmt = (
+            select(*PUBLIC_COLUMNS)
+            .where(Pet.search_vector.bool_op("@@")(ts_query))
+            .order_by(rank.desc(), Pet.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await db.execute(stmt)
+        return result.all()
+
+    def next_cursor(
+        self, pets: Sequence[Any], *, limit: int, sort: PetSort = PetSort.id
+    ) -> Optional[str]:
+        """
+        Курсор следующей страницы или None, если страница последняя.
+        """
+        if len(pets) < limit:
+            return None
+        last = pets[-1]
+        return encode_cursor([sort.value, SORT_KEYS[sort].value(last), last.id])
+
+    @staticmethod
+    def _after_cursor(cursor: str, sort: PetSort) -> Any:
+        """
+        Условие "после записи из курсора" в порядке сортировки `sort`.
+
+        Сравнение кортежей (ключ, id) обслуживается составным индексом.
+        """
+        values = decode_cursor(cursor)
+        if len(values) != 3 or values[0] != sort.value or type(values[2]) is not int:
+            raise InvalidCursorError("Некорректный курсор")
+        sort_key = SORT_KEYS[sort]
+        try:
+            value = sort_key.parse(values[1])
+        except (TypeError, ValueError) as e:
+            raise InvalidCursorError("Некорректный курсор") from e
+        last_id = values[2]
+
+        if sort == PetSort.id:
+            return Pet.id > last_id
+        row = tuple_(sort_key.expression, Pet.id)
+        if sort_key.descending:
+            return row < tuple_(value, last_id)
+        return row > tuple_(value, last_id)
 
     async def get_by_id_or_name(self, db: AsyncSession, *, id: Optional[int] = None, name: Optional[str] = None) -> Optional[Pet]:
         """
@@ -56,9 +862,9 @@ class CRUDPet(CRUDBase[Pet, PetCreate, PetUpdate]):
         if id is not None:
             conditions.append(Pet.id == id)
         if name is not None:
-            conditions.append(Pet.name.ilike(f"%{name}%"))
+            conditions.append(Pet.name.ilike(_contains_pattern(name)))
         
-        query = select(Pet).where(or_(*conditions))
+        query = select(Pet).options(*self.load_options).where(or_(*conditions))
         result = await db.execute(query)
         return result.scalars().first()
 
@@ -66,7 +872,7 @@ class CRUDPet(CRUDBase[Pet, PetCreate, PetUpdate]):
         """
         Получить питомца по комбинации уникальных атрибутов.
         """
-        query = select(self.model).where(
+        query = select(self.model).options(*self.load_options).where(
             and_(
                 self.model.name == name,
                 self.model.type == type,
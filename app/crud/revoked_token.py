@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.revoked_token import RevokedToken
+
+
+class CRUDRevokedToken:
+    """
+    Отозванные токены. Хранятся в БД, чтобы отзыв увидели все воркеры,
+    а сами проверки идут по копии в памяти (app.core.revocation).
+    """
+
+    model = RevokedToken
+
+    async def revoke(self, db: AsyncSession, *, jti: str, expires_at: datetime) -> None:
+        """
+        Отозвать токен до истечения его срока. Повторный отзыв ничего не меняет.
+        """
+        stmt = (
+            insert(RevokedToken)
+            .values(jti=jti, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        )
+        await db.execute(stmt)
+        await db.commit()
+
+    async def get_active(self, db: AsyncSession) -> List[Tuple[str, float]]:
+        """
+        Неистекшие отозванные токены: пары (jti, срок действия в unix time).
+        """
+        stmt = select(RevokedToken.jti, RevokedToken.expires_at).where(
+            RevokedToken.expires_at > datetime.now(timezone.utc)
+        )
+        result = await db.execute(stmt)
+        return [(jti, expires_at.timestamp()) for jti, expires_at in result]
+
+    async def remove_expired(self, db: AsyncSession) -> int:
+        """
+        Удалить записи истекших токенов, вернуть их количество.
+        """
+        stmt = delete(RevokedToken).where(
+            RevokedToken.expires_at <= datetime.now(timezone.utc)
+        )
+        result = await db.execute(stmt)
+        await db.commit()
+        return result.rowcount
+
+
+revoked_token = CRUDRevokedToken()
@@ -1,15 +1,47 @@
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Optional, Type, Union
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
+from app.config import settings
+from app.core.cache import cache
+# Модуль целиком: app.core.security сам импортирует app.crud, поэтому
+# функции из него берутся при вызове, а не при импорте
+from app.core import security
 from app.crud.base import CRUDBase
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import Principal, UserCreate, UserUpdate
+
+# Колонки, из которых строятся сведения для проверки прав
+PRINCIPAL_COLUMNS = (User.id, User.is_active, User.is_superuser)
 
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
+    def __init__(self, model: Type[User]):
+        super().__init__(model)
+        # Права пользователя проверяются при каждом запросе с токеном, поэтому
+        # хранятся в общем кеше. Изменения через этот объект сбрасывают
+        # запись сразу, остальные видны через TTL
+        self.principal_cache = cache.namespace(
+            "principals", ttl=settings.USER_CACHE_TTL_SECONDS
+        )
+
+    async def get_principal(self, db: AsyncSession, id: int) -> Optional[Principal]:
+        """
+        Получить сведения о правах пользователя (id, is_active, is_superuser).
+
+        Сначала проверяется кеш, при промахе читаются только три колонки.
+        """
+        cached = await self.principal_cache.get(str(id))
+        if cached is not None:
+            return Principal.model_validate_json(cached)
+        row = await self.get_row(db, id, columns=PRINCIPAL_COLUMNS)
+        if row is None:
+            return None
+        principal = Principal.model_validate(row)
+        await self.principal_cache.set(str(id), principal.model_dump_json().encode())
+        return principal
+
     async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
         """
         Получить пользователя по email.
@@ -22,16 +54,19 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         """
         Создать нового пользователя с хешированным паролем.
         """
-        db_obj = User(
-            email=obj_in.email,
-            hashed_password=get_password_hash(obj_in.password),
-            is_superuser=obj_in.is_superuser,
-            is_active=obj_in.is_active
+        user = await self._insert(
+            db,
+            {
+                "email": obj_in.email,
+                "hashed_password": await security.get_password_hash_async(obj_in.password),
+                "is_superuser": obj_in.is_superuser,
+                "is_active": obj_in.is_active,
+            },
         )
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+        # ID удаленного пользователя может достаться новому (например, после
+        # пересоздания таблицы), поэтому старая запись не должна остаться
+        await self.principal_cache.delete(str(self._id_of(user)))
+        return user
 
     async def update(
         self, db: AsyncSession, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
@@ -45,11 +80,21 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             update_data = obj_in.model_dump(exclude_unset=True)
         
         if "password" in update_data and update_data["password"]:
-            hashed_password = get_password_hash(update_data["password"])
+            hashed_password = await security.get_password_hash_async(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
         
-        return await super().update(db, db_obj=db_obj, obj_in=update_data)
+        user = await super().update(db, db_obj=db_obj, obj_in=update_data)
+        await self.principal_cache.delete(str(self._id_of(user)))
+        return user
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[User]:
+        """
+        Удалить пользователя и забыть его права.
+        """
+        user = await super().remove(db, id=id)
+        await self.principal_cache.delete(str(id))
+        return user
 
     async def authenticate(self, db: AsyncSession, *, email: str, password: str) -> Optional[User]:
         """
@@ -58,7 +103,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         user = await self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await security.verify_password_async(password, user.hashed_password):
             return None
         return user
 
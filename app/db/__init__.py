@@ -1,6 +1,14 @@
 # app/db/__init__.py
 from app.db.init_db import init_db
 from app.db.base import Base, engine, SessionLocal
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db, get_write_db
 
-__all__ = ["Base", "engine", "SessionLocal", "get_db", "init_db"]
\ No newline at end of file
+__all__ = [
+    "Base",
+    "engine",
+    "SessionLocal",
+    "get_db",
+    "get_read_db",
+    "get_write_db",
+    "init_db",
+]
\ No newline at end of file
@@ -1,11 +1,26 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base  
 
 from app.config import settings
+from app.db.pool import MeteredQueuePool, watch_pool
 
-engine = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI), echo=True)
+
+def create_engine(uri: str) -> AsyncEngine:
+    """
+    Движок с параметрами пула из настроек (профиль DB_PROFILE) и метриками пула.
+    """
+    engine = create_async_engine(
+        uri, poolclass=MeteredQueuePool, **settings.db_engine_options
+    )
+    watch_pool(engine)
+    return engine
+
+
+engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+# Реплики только для чтения (пусто, если не настроены)
+replica_engines = [create_engine(uri) for uri in settings.replica_database_uris]
 SessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False, autocommit=False, autoflush=False
 )
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
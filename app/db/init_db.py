@@ -5,7 +5,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
 from app.config import settings
-from app.core.security import get_password_hash
 
 logger = logging.getLogger(__name__)
 
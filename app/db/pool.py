@@ -0,0 +1,111 @@
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+
+class PoolMetrics:
+    """
+    Счетчики пула соединений одного движка в текущем воркере.
+
+    Время получения соединения включает ожидание свободного, открытие нового
+    и проверку (pre-ping). Открытые и закрытые соединения показывают, как
+    часто пул их пересоздает: при подобранном размере оба счетчика почти не
+    растут после прогрева.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.checkouts = 0
+        self.opened = 0
+        self.closed = 0
+        self.invalidated = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def stats(self, pool: "MeteredQueuePool") -> Dict[str, Any]:
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": (
+                self.wait_seconds_total / self.checkouts * 1000 if self.checkouts else 0.0
+            ),
+            "wait_ms_max": self.wait_seconds_max * 1000,
+            "opened": self.opened,
+            "closed": self.closed,
+            "invalidated": self.invalidated,
+            "uptime_seconds": time.time() - self.started_at,
+        }
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений asyncio, замеряющий время получения соединения.
+
+    Счетчики переживают пересоздание пула (`engine.dispose()`).
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self) -> "MeteredQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def watch_pool(engine: AsyncEngine) -> None:
+    """
+    Считать открытия, закрытия и сбросы соединений пула движка.
+    """
+
+    def metrics() -> PoolMetrics:
+        # После dispose у движка новый пул, но счетчики у него те же
+        return engine.pool.metrics
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics().opened += 1
+
+    @event.listens_for(engine.sync_engine, "close")
+    def on_close(dbapi_connection, connection_record):
+        metrics().closed += 1
+
+    @event.listens_for(engine.sync_engine, "close_detached")
+    def on_close_detached(dbapi_connection):
+        metrics().closed += 1
+
+    @event.listens_for(engine.sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics().invalidated += 1
+
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    """
+    Состояние и счетчики пула движка.
+    """
+    pool = engine.pool
+    return {"host": engine.url.host, **pool.metrics.stats(pool)}
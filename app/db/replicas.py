@@ -0,0 +1,101 @@
+import logging
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Ошибки, после которых реплика считается недоступной
+CONNECTION_ERRORS = (OSError, DBAPIError)
+
+# Отметка в `Session.info` сессий, открытых к репликам
+REPLICA_SESSION = "replica"
+
+
+def is_replica(db: AsyncSession) -> bool:
+    """
+    Сессия читает с реплики, которая может отставать от основного сервера.
+
+    Прочитанное из нее не стоит класть в общие кеши: запись через CRUD уже
+    сбросила их версию, и устаревшие данные реплики сохранились бы под новой.
+    """
+    return bool(db.info.get(REPLICA_SESSION))
+
+
+class ReplicaRouter:
+    """
+    Выбор реплики для чтения: по кругу среди доступных.
+
+    Реплика, к которой не удалось подключиться, исключается из выбора до
+    следующей успешной проверки (`check`). Если доступных реплик нет,
+    `session` возвращает None и чтение идет на основной сервер.
+    """
+
+    def __init__(self, engines: Sequence[AsyncEngine]):
+        self.engines: List[AsyncEngine] = list(engines)
+        self._healthy: Dict[int, bool] = {id(engine): True for engine in self.engines}
+        self._next = 0
+        self._session_factory = sessionmaker(
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False,
+            info={REPLICA_SESSION: True},
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def is_healthy(self, engine: AsyncEngine) -> bool:
+        return self._healthy[id(engine)]
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        if self._healthy[id(engine)]:
+            logger.warning(f"Реплика {engine.url.host} недоступна, чтение без нее")
+        self._healthy[id(engine)] = False
+
+    def mark_up(self, engine: AsyncEngine) -> None:
+        if not self._healthy[id(engine)]:
+            logger.info(f"Реплика {engine.url.host} снова доступна")
+        self._healthy[id(engine)] = True
+
+    def candidates(self) -> List[AsyncEngine]:
+        """
+        Доступные реплики в порядке попыток; каждый вызов сдвигает начало круга.
+        """
+        if not self.engines:
+            return []
+        start = self._next
+        self._next = (start + 1) % len(self.engines)
+        ordered = self.engines[start:] + self.engines[:start]
+        return [engine for engine in ordered if self.is_healthy(engine)]
+
+    async def session(self) -> Optional[AsyncSession]:
+        """
+        Сессия к доступной реплике с уже открытым соединением или None.
+        """
+        for engine in self.candidates():
+            session = self._session_factory(bind=engine)
+            try:
+                await session.connection()
+            except CONNECTION_ERRORS:
+                await session.close()
+                self.mark_down(engine)
+                continue
+            return session
+        return None
+
+    async def check(self) -> None:
+        """
+        Проверить все реплики простым запросом и обновить их состояние.
+        """
+        for engine in self.engines:
+            try:
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            except CONNECTION_ERRORS:
+                self.mark_down(engine)
+            else:
+                self.mark_up(engine)
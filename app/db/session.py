@@ -1,16 +1,110 @@
+import hashlib
+import hmac
+import time
 from typing import AsyncGenerator
 
+from fastapi import Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from app.db.base import SessionLocal
+from app.config import settings
+from app.db.base import SessionLocal, replica_engines
+from app.db.replicas import ReplicaRouter
+
+# Cookie, пока действует которая, чтение идет с основного сервера
+PRIMARY_READS_COOKIE = "primary_reads_until"
+
+replicas = ReplicaRouter(replica_engines)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Зависимость для получения сессии базы данных.
+    Зависимость для получения сессии базы данных (основной сервер).
     """
     async with SessionLocal() as session:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+async def get_write_db(
+    response: Response, db: AsyncSession = Depends(get_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Зависимость для изменений данных: сессия основного сервера.
+
+    Если настроены реплики, клиенту выставляется cookie, и следующие
+    `READ_YOUR_WRITES_SECONDS` секунд его чтения тоже идут на основной
+    сервер, поэтому он сразу видит свои изменения.
+    """
+    window = settings.READ_YOUR_WRITES_SECONDS
+    if replicas and window > 0:
+        until = str(time.time() + window)
+        response.set_cookie(
+            PRIMARY_READS_COOKIE,
+            f"{until}:{_sign(until)}",
+            max_age=int(window) or 1,
+            httponly=True,
+            samesite="strict",
+        )
+    yield db
+
+
+def _sign(value: str) -> str:
+    return hmac.new(
+        settings.SECRET_KEY.encode(), value.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def reads_from_primary(request: Request) -> bool:
+    """
+    Клиент недавно изменял данные и должен читать с основного сервера.
+
+    Cookie подписана ключом приложения, а срок в ней не может превышать
+    `READ_YOUR_WRITES_SECONDS`: клиент не может сам направить свои чтения
+    на основной сервер или продлить окно.
+    """
+    value = request.cookies.get(PRIMARY_READS_COOKIE)
+    if value is None:
+        return False
+    until, _, signature = value.rpartition(":")
+    if not hmac.compare_digest(signature, _sign(until)):
+        return False
+    try:
+        remaining = float(until) - time.time()
+    except ValueError:
+        return False
+    return 0 < remaining <= settings.READ_YOUR_WRITES_SECONDS
+
+
+async def get_read_db(
+    request: Request, db: AsyncSession = Depends(get_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Зависимость для чтения: сессия реплики, выбранной по кругу.
+
+    Без реплик, если все реплики недоступны или клиент недавно изменял
+    данные, используется сессия основного сервера (она открывает соединение
+    только при первом запросе, поэтому без нужды не стоит ничего).
+    """
+    session = None
+    if replicas and not reads_from_primary(request):
+        session = await replicas.session()
+    if session is None:
+        yield db
+        return
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+def get_session_factory() -> sessionmaker:
+    """
+    Зависимость для получения фабрики сессий.
+
+    Нужна, когда работа с БД продолжается после выхода из обработчика,
+    например при потоковой выгрузке: сессия открывается внутри генератора ответа.
+    """
+    return SessionLocal
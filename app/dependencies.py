@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+
+from app import schemas
+
+
+def get_pet_search_params(
+    name: Optional[str] = None,
+    type: Optional[str] = None,
+    breed: Optional[str] = None,
+    color: Optional[str] = None,
+    min_age: Optional[float] = None,
+    max_age: Optional[float] = None,
+    is_available: Optional[bool] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+) -> schemas.PetSearchParams:
+    """
+    Параметры поиска питомцев из строки запроса.
+
+    Ошибки проверки (например, max_age < min_age) возвращаются клиенту как 422.
+    """
+    try:
+        return schemas.PetSearchParams(
+            name=name,
+            type=type,
+            breed=breed,
+            color=color,
+            min_age=min_age,
+            max_age=max_age,
+            is_available=is_available,
+            min_price=min_price,
+            max_price=max_price,
+        )
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
@@ -8,16 +10,76 @@ from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncConnection
 
+from app import crud
 from app.api.v1.router import api_router
 from app.config import settings
+from app.core.cache import cache
+from app.core.imports import import_jobs
+from app.core.revocation import revoked_tokens
+from app.core.security import password_hashing
+from app.core.suggest import SUGGEST_FIELDS, suggest_index
 from app.db.base import Base, engine
 from app.db.init_db import init_db
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, replicas
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+async def load_suggest_index() -> None:
+    """
+    Загрузить индекс подсказок значениями из каталога.
+    """
+    async with SessionLocal() as session:
+        counts = await crud.pet.distinct_value_counts(session, fields=SUGGEST_FIELDS)
+    suggest_index.load(counts)
+
+
+async def refresh_suggest_index() -> None:
+    """
+    Периодически перестраивать индекс подсказок, чтобы подхватить изменения,
+    сделанные через другие воркеры.
+    """
+    while True:
+        await asyncio.sleep(settings.SUGGEST_INDEX_REFRESH_SECONDS)
+        try:
+            await load_suggest_index()
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при обновлении индекса подсказок: {e}")
+
+
+async def load_revoked_tokens() -> None:
+    """
+    Загрузить отозванные токены из БД и удалить записи истекших.
+    """
+    async with SessionLocal() as session:
+        await crud.revoked_token.remove_expired(session)
+        revoked_tokens.load(await crud.revoked_token.get_active(session))
+
+
+async def refresh_revoked_tokens() -> None:
+    """
+    Периодически загружать отзывы токенов, сделанные через другие воркеры.
+    """
+    while True:
+        await asyncio.sleep(settings.REVOCATION_REFRESH_SECONDS)
+        try:
+            await load_revoked_tokens()
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при загрузке отозванных токенов: {e}")
+
+
+async def check_replicas() -> None:
+    """
+    Периодически проверять реплики: недоступные исключаются из чтения,
+    восстановившиеся возвращаются.
+    """
+    while True:
+        await asyncio.sleep(settings.REPLICA_HEALTH_CHECK_SECONDS)
+        await replicas.check()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Lifespan стартовал. Проверка базы данных...")
@@ -33,22 +95,49 @@ async def lifespan(app: FastAPI):
                 logger.info("Таблицы не найдены. Создаём...")
                 await conn.run_sync(Base.metadata.create_all)
 
-                async with SessionLocal() as session:
-                    await init_db(session)
-                logger.info("База данных успешно инициализирована.")
-            else:
-                logger.info("Таблицы уже существуют. Пропускаем инициализацию.")
+        # Начальные данные загружаются после фиксации транзакции с DDL,
+        # иначе отдельная сессия не увидит созданные таблицы
+        if not pets_table_exists:
+            async with SessionLocal() as session:
+                await init_db(session)
+            logger.info("База данных успешно инициализирована.")
+        else:
+            logger.info("Таблицы уже существуют. Пропускаем инициализацию.")
     except SQLAlchemyError as e:
         logger.error(f"Ошибка при инициализации базы данных: {e}")
 
+    try:
+        await load_suggest_index()
+        logger.info("Индекс подсказок загружен.")
+    except SQLAlchemyError as e:
+        logger.error(f"Ошибка при загрузке индекса подсказок: {e}")
+    refresh_task = asyncio.create_task(refresh_suggest_index())
+    try:
+        await load_revoked_tokens()
+    except SQLAlchemyError as e:
+        logger.error(f"Ошибка при загрузке отозванных токенов: {e}")
+    revocation_task = asyncio.create_task(refresh_revoked_tokens())
+    replicas_task = None
+    if replicas:
+        await replicas.check()
+        replicas_task = asyncio.create_task(check_replicas())
+
     yield  
 
+    refresh_task.cancel()
+    revocation_task.cancel()
+    if replicas_task is not None:
+        replicas_task.cancel()
+    await import_jobs.close()
+    password_hashing.shutdown()
+    await cache.close()
     logger.info("Lifespan завершён.")
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description=settings.DESCRIPTION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 
@@ -59,6 +148,12 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[
+            "ETag",
+            "X-Next-Cursor",
+            "X-Total-Count",
+            "X-Total-Count-Estimated",
+        ],
     )
 
 
@@ -1,5 +1,5 @@
 from app.models.pet import Pet
+from app.models.revoked_token import RevokedToken
 from app.models.user import User
-from app.models.pet import PetAdmin
 
-__all__ = ["Pet", "User", "PetAdmin"]
\ No newline at end of file
+__all__ = ["Pet", "RevokedToken", "User"]
\ No newline at end of file
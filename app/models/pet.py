@@ -1,31 +1,108 @@
-from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String, Text
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    Column,
+    Computed,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    Text,
+    event,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 
 from app.db.base import Base
 
+# Поля, по которым выполняется поиск по подстроке (ilike '%...%')
+TRGM_SEARCH_FIELDS = ("name", "type", "breed", "color")
+
+# Документ полнотекстового поиска: кличка важнее породы и вида, цвет - наименее важен
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian'::regconfig, name), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, breed), 'B') || "
+    "setweight(to_tsvector('russian'::regconfig, type), 'B') || "
+    "setweight(to_tsvector('russian'::regconfig, color), 'C')"
+)
+
+# Ключи сортировки по цене: питомцы без цены всегда оказываются в конце списка,
+# а выражения совпадают с индексами, поэтому страницы читаются в порядке индекса
+PRICE_ASC_SORT_SQL = "coalesce(price, 'Infinity'::double precision)"
+PRICE_DESC_SORT_SQL = "coalesce(price, '-Infinity'::double precision)"
+
 
 class Pet(Base):
     __tablename__ = "pets"
 
     id = Column(Integer, primary_key=True, index=True)
-    
+
     # Основные поля
     name = Column(String(255), nullable=False, index=True)
     type = Column(String(100), nullable=False, index=True)
     breed = Column(String(255), nullable=False, index=True)
     color = Column(String(100), nullable=False, index=True)
     age = Column(Float, nullable=False, index=True)
-    
-    # Секретное поле для администраторов
-    secret_notes = Column(Text, nullable=True)
-    
+
+    # Секретное поле для администраторов. Не загружается вместе с питомцем:
+    # администраторские запросы запрашивают его явно (undefer), а случайное
+    # обращение к незагруженному полю вызывает ошибку вместо скрытого запроса
+    secret_notes = deferred(Column(Text, nullable=True), raiseload=True)
+
     # Служебные поля
     is_available = Column(Boolean, default=True, index=True)
     price = Column(Float, nullable=True)
-    
+
+    # Версия записи для оптимистичной блокировки: увеличивается при каждом
+    # изменении, условный UPDATE по версии отклоняет устаревшие правки
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
     # Аудит
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
+    # Полнотекстовый поиск: генерируемая колонка пересчитывается самой БД
+    # при вставке и обновлении, в обычные запросы не загружается
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True))
+    )
+
+    # B-tree индексы не работают для ilike с ведущим '%',
+    # поэтому для поиска по подстроке используются триграммные GIN индексы
+    __table_args__ = tuple(
+        Index(
+            f"ix_pets_{field}_trgm",
+            field,
+            postgresql_using="gin",
+            postgresql_ops={field: "gin_trgm_ops"},
+        )
+        for field in TRGM_SEARCH_FIELDS
+    ) + (
+        Index("ix_pets_search_vector", "search_vector", postgresql_using="gin"),
+        # Составные индексы для сортировки с keyset-пагинацией: (ключ, id).
+        # Сортировка по убыванию читает те же индексы в обратном порядке
+        Index("ix_pets_price_asc_id", text(PRICE_ASC_SORT_SQL), "id"),
+        Index("ix_pets_price_desc_id", text(PRICE_DESC_SORT_SQL), "id"),
+        Index("ix_pets_age_id", "age", "id"),
+        Index("ix_pets_created_at_id", "created_at", "id"),
+        # Витрина: только доступные питомцы, отсортированные по цене
+        Index(
+            "ix_pets_is_available_price_id",
+            "is_available",
+            text(PRICE_ASC_SORT_SQL),
+            "id",
+        ),
+    )
+
+
+# Расширение pg_trgm должно существовать до создания триграммных индексов
+event.listen(
+    Pet.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, String
+
+from app.db.base import Base
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    # Идентификатор токена (claim jti) и срок его действия: после него
+    # запись больше не нужна и удаляется
+    jti = Column(String(32), primary_key=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
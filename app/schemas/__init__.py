@@ -1,5 +1,35 @@
-from app.schemas.pet import Pet, PetAdmin, PetCreate, PetSearchParams, PetUpdate
-from app.schemas.user import Token, TokenPayload, User, UserCreate, UserUpdate
+from app.schemas.pet import (
+    CountMode,
+    ExportFormat,
+    ImportStatus,
+    Pet,
+    PetAdmin,
+    PetBatch,
+    PetBulkCreateResult,
+    PetBulkDelete,
+    PetBulkError,
+    PetBulkItem,
+    PetBulkResult,
+    PetBulkUpdate,
+    PetCreate,
+    PetFacetValue,
+    PetImportError,
+    PetImportJob,
+    PetSearchPage,
+    PetSearchParams,
+    PetSort,
+    PetUpdate,
+    SuggestField,
+)
+from app.schemas.user import (
+    Principal,
+    Token,
+    TokenPayload,
+    TokenRefresh,
+    User,
+    UserCreate,
+    UserUpdate,
+)
 
 __all__ = [
     "Pet",
@@ -7,8 +37,26 @@ __all__ = [
     "PetCreate",
     "PetUpdate",
     "PetSearchParams",
+    "PetSort",
+    "PetBatch",
+    "PetBulkCreateResult",
+    "PetBulkError",
+    "PetBulkItem",
+    "PetBulkUpdate",
+    "PetBulkDelete",
+    "PetBulkResult",
+    "PetImportError",
+    "PetImportJob",
+    "PetFacetValue",
+    "PetSearchPage",
+    "CountMode",
+    "ExportFormat",
+    "ImportStatus",
+    "SuggestField",
+    "Principal",
     "Token",
     "TokenPayload",
+    "TokenRefresh",
     "User",
     "UserCreate",
     "UserUpdate",
@@ -1,5 +1,6 @@
 from datetime import datetime
-from typing import Optional
+from enum import Enum
+from typing import Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 
@@ -30,6 +31,9 @@ class PetUpdate(BaseModel):
     is_available: Optional[bool] = None
     price: Optional[float] = Field(None, ge=0.0)
     secret_notes: Optional[str] = None
+    # Версия, которую видел клиент: если запись с тех пор изменилась,
+    # обновление отклоняется (409). Само значение не изменяется
+    version: Optional[int] = Field(None, ge=1)
 
 
 # Схема питомца из БД (базовая)
@@ -49,6 +53,7 @@ class Pet(PetInDBBase):
 # Схема питомца для администраторов (с секретными полями)
 class PetAdmin(PetInDBBase):
     secret_notes: Optional[str] = None
+    version: int
 
 
 # Схема для поиска питомцев
@@ -60,6 +65,8 @@ class PetSearchParams(BaseModel):
     min_age: Optional[float] = Field(None, ge=0.0)
     max_age: Optional[float] = Field(None, ge=0.0)
     is_available: Optional[bool] = None
+    min_price: Optional[float] = Field(None, ge=0.0)
+    max_price: Optional[float] = Field(None, ge=0.0)
     
     @field_validator('max_age')
     @classmethod
@@ -67,4 +74,126 @@ class PetSearchParams(BaseModel):
         if v is not None and values.data.get('min_age') is not None:
             if v < values.data.get('min_age'):
                 raise ValueError('max_age должен быть больше или равен min_age')
-        return v
\ No newline at end of file
+        return v
+
+    @field_validator('max_price')
+    @classmethod
+    def check_max_price(cls, v, values):
+        if v is not None and values.data.get('min_price') is not None:
+            if v < values.data.get('min_price'):
+                raise ValueError('max_price должен быть больше или равен min_price')
+        return v
+
+
+# Порядок сортировки результатов поиска ("-" - по убыванию)
+class PetSort(str, Enum):
+    id = "id"
+    price = "price"
+    price_desc = "-price"
+    age = "age"
+    created_at_desc = "-created_at"
+
+
+# Значение фасета и количество питомцев с ним
+class PetFacetValue(BaseModel):
+    value: Union[bool, str, None]
+    count: int
+
+
+# Страница результатов поиска вместе со счетчиками фасетов
+class PetSearchPage(BaseModel):
+    items: List[Pet]
+    facets: Dict[str, List[PetFacetValue]]
+
+
+# Результат пакетного запроса деталей: найденные питомцы в порядке
+# запрошенных ID и список ID, которых нет в каталоге
+class PetBatch(BaseModel):
+    items: List[Pet]
+    missing: List[int]
+
+
+# Питомец, созданный массовым запросом: позиция во входном списке и ID
+class PetBulkItem(BaseModel):
+    index: int
+    id: int
+
+
+# Ошибки проверки питомца из массового запроса (в формате ошибок 422)
+class PetBulkError(BaseModel):
+    index: int
+    errors: List[Dict[str, Any]]
+
+
+# Результат массового создания питомцев
+class PetBulkCreateResult(BaseModel):
+    created: List[PetBulkItem]
+    errors: List[PetBulkError]
+
+
+# Массовое изменение: фильтр как у поиска и изменяемые поля
+class PetBulkUpdate(BaseModel):
+    filter: PetSearchParams
+    patch: PetUpdate
+
+
+# Массовое удаление по фильтру
+class PetBulkDelete(BaseModel):
+    filter: PetSearchParams
+
+
+# Результат массового изменения или удаления; при dry_run - сколько питомцев
+# было бы затронуто
+class PetBulkResult(BaseModel):
+    count: int
+    dry_run: bool
+
+
+# Состояние задачи импорта питомцев
+class ImportStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    finished = "finished"
+    failed = "failed"
+
+
+# Ошибки проверки строки импортируемого файла (в формате ошибок 422)
+class PetImportError(BaseModel):
+    line: int
+    errors: List[Dict[str, Any]]
+
+
+# Задача импорта: ход выполнения и ошибки. `failed` - число отклоненных
+# строк, в `errors` попадают только первые из них
+class PetImportJob(BaseModel):
+    id: str
+    filename: Optional[str]
+    status: ImportStatus
+    processed: int
+    created: int
+    updated: int
+    failed: int
+    errors: List[PetImportError]
+    detail: Optional[str]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+
+# Способ подсчета общего количества результатов поиска
+class CountMode(str, Enum):
+    exact = "exact"
+    estimated = "estimated"
+    none = "none"
+
+
+# Формат потоковой выгрузки каталога
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+# Поле для автодополнения в строке поиска
+class SuggestField(str, Enum):
+    type = "type"
+    breed = "breed"
+    color = "color"
\ No newline at end of file
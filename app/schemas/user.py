@@ -42,10 +42,25 @@ class UserInDB(UserInDBBase):
     hashed_password: str
 
 
+# Сведения о пользователе, нужные для проверки прав (кешируются по ID)
+class Principal(BaseModel):
+    id: int
+    is_active: bool
+    is_superuser: bool
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
 # Схема токена доступа
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+
+
+# Запрос на обновление или отзыв токена обновления
+class TokenRefresh(BaseModel):
+    refresh_token: str
 
 
 # Схема полезной нагрузки токена
@@ -0,0 +1,138 @@
+"""
+Бенчмарк пропускной способности административных изменений.
+
+Сравнивает прежнюю схему записи (add/commit/refresh, чтение перед удалением)
+с запросами INSERT/UPDATE/DELETE ... RETURNING через ORM (``create``,
+``update``, ``remove``) и через Core (``create_row``, ``update_row``,
+``remove_row``).
+
+Запуск::
+
+    docker-compose exec api python -m benchmarks.bench_admin_writes --ops 2000
+"""
+import argparse
+import asyncio
+import itertools
+import time
+from typing import Awaitable, Callable, Dict, Iterator, List
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, schemas
+from app.crud.pet import schema_columns
+from benchmarks.common import measure, print_table, recreate_bench_database, seed_pets
+
+PET_IN = schemas.PetCreate(
+    name="Рекс",
+    type="собака",
+    breed="Немецкая овчарка",
+    color="черно-подпалый",
+    age=2.0,
+    price=25000.0,
+    secret_notes="Заметка",
+)
+PATCH = schemas.PetUpdate(price=27000.0, is_available=False)
+ADMIN_COLUMNS = schema_columns(schemas.PetAdmin)
+
+
+async def legacy_create(db: AsyncSession, pet_id: int) -> None:
+    pet = crud.pet.model(**jsonable_encoder(PET_IN))
+    db.add(pet)
+    await db.commit()
+    await db.refresh(pet)
+
+
+async def legacy_update(db: AsyncSession, pet_id: int) -> None:
+    pet = await crud.pet.get(db, pet_id)
+    for field, value in PATCH.model_dump(exclude_unset=True).items():
+        setattr(pet, field, value)
+    db.add(pet)
+    await db.commit()
+    await db.refresh(pet)
+
+
+async def legacy_delete(db: AsyncSession, pet_id: int) -> None:
+    # Обработчик читал питомца для ответа, затем remove читал его еще раз
+    pet = await crud.pet.get(db, pet_id)
+    pet = await crud.pet.get(db, pet_id)
+    await db.delete(pet)
+    await db.commit()
+
+
+async def orm_update(db: AsyncSession, pet_id: int) -> None:
+    pet = await crud.pet.get(db, pet_id)
+    await crud.pet.update(db, db_obj=pet, obj_in=PATCH)
+
+
+Operation = Callable[[AsyncSession, int], Awaitable[None]]
+
+OPERATIONS: Dict[str, Dict[str, Operation]] = {
+    "create": {
+        "add/commit/refresh": legacy_create,
+        "ORM RETURNING": lambda db, pet_id: crud.pet.create(db, obj_in=PET_IN),
+        "Core RETURNING": lambda db, pet_id: crud.pet.create_row(
+            db, obj_in=PET_IN, returning=ADMIN_COLUMNS
+        ),
+    },
+    "update": {
+        "get/commit/refresh": legacy_update,
+        "ORM get + RETURNING": orm_update,
+        "Core RETURNING": lambda db, pet_id: crud.pet.update_row(
+            db, id=pet_id, obj_in=PATCH, returning=ADMIN_COLUMNS
+        ),
+    },
+    "delete": {
+        "get/get/delete": legacy_delete,
+        "ORM RETURNING": lambda db, pet_id: crud.pet.remove(db, id=pet_id),
+        "Core RETURNING": lambda db, pet_id: crud.pet.remove_row(
+            db, id=pet_id, returning=ADMIN_COLUMNS
+        ),
+    },
+}
+
+
+async def run_operation(
+    session_factory: sessionmaker, operation: Operation, ids: Iterator[int], ops: int
+) -> Dict[str, float]:
+    async with session_factory() as db:
+
+        async def call() -> None:
+            await operation(db, next(ids))
+            # Объекты разных итераций не должны накапливаться в сессии
+            db.expunge_all()
+
+        started = time.perf_counter()
+        stats = await measure(call, repeat=ops)
+        elapsed = time.perf_counter() - started
+    # measure выполняет еще 2 прогревочных вызова
+    return {"ops_per_s": (ops + 2) / elapsed, **stats}
+
+
+async def main(ops: int) -> None:
+    engine: AsyncEngine = await recreate_bench_database()
+    try:
+        paths = sum(len(variants) for variants in OPERATIONS.values())
+        print(f"Заполнение таблицы pets: {paths * (ops + 2)} строк...")
+        await seed_pets(engine, paths * (ops + 2))
+        # Каждый вариант изменяет и удаляет собственный диапазон питомцев
+        ids = iter(range(1, paths * (ops + 2) + 1))
+
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        results: List[Dict[str, object]] = []
+        for name, variants in OPERATIONS.items():
+            for path, operation in variants.items():
+                chunk = itertools.islice(ids, ops + 2)
+                stats = await run_operation(session_factory, operation, iter(list(chunk)), ops)
+                results.append({"operation": name, "path": path, **stats})
+        print_table(f"Административные изменения, {ops} операций", results)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ops", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.ops))
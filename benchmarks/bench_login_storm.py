@@ -0,0 +1,156 @@
+"""
+Нагрузочный тест: задержка каталога во время шторма входов.
+
+Пока `--logins` клиентов непрерывно запрашивают токен (`POST /auth/token`,
+проверка bcrypt), отдельный клиент замеряет задержку `GET /pets/find`.
+Медиана, p95 и p99 каталога сравниваются с замером без входов. Если bcrypt
+выполняется прямо в обработчике, p99 каталога растет до сотен миллисекунд,
+а с пулом хеширования остается на уровне замера без нагрузки. Входы сверх
+PASSWORD_HASH_MAX_PENDING получают 503.
+
+Запуск против работающего сервера (один воркер uvicorn)::
+
+    docker-compose exec api python -m benchmarks.bench_login_storm \\
+        --url http://localhost:8000 --logins 50 --seconds 10
+
+С `--local` сервер не нужен: замеряется задержка цикла событий при
+хешировании прямо в корутине и через пул.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+from typing import Dict, List
+
+import httpx
+
+from app.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.core.security import PasswordHashingPool, pwd_context
+from benchmarks.common import print_table
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    cuts = statistics.quantiles(samples, n=100)
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": cuts[94],
+        "p99_ms": cuts[98],
+        "samples": len(samples),
+    }
+
+
+async def catalog_latencies(client: httpx.AsyncClient, seconds: float) -> List[float]:
+    samples: List[float] = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(
+            f"{settings.API_V1_STR}/pets/find", params={"type": "собака", "limit": 20}
+        )
+        response.raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def login_worker(
+    client: httpx.AsyncClient, stop: asyncio.Event, statuses: Counter, email: str, password: str
+) -> None:
+    while not stop.is_set():
+        response = await client.post(
+            f"{settings.API_V1_STR}/auth/token",
+            data={"username": email, "password": password},
+        )
+        statuses[response.status_code] += 1
+
+
+async def run_server(url: str, logins: int, seconds: float, email: str, password: str) -> None:
+    limits = httpx.Limits(max_connections=logins + 1)
+    async with httpx.AsyncClient(base_url=url, timeout=30, limits=limits) as client:
+        idle = await catalog_latencies(client, seconds)
+
+        stop = asyncio.Event()
+        statuses: Counter = Counter()
+        workers = [
+            asyncio.create_task(login_worker(client, stop, statuses, email, password))
+            for _ in range(logins)
+        ]
+        try:
+            storm = await catalog_latencies(client, seconds)
+        finally:
+            stop.set()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    print_table(
+        f"Каталог без нагрузки и во время {logins} параллельных входов",
+        [
+            {"phase": "idle", **percentiles(idle)},
+            {"phase": "login storm", **percentiles(storm)},
+        ],
+    )
+    print(f"\nОтветы на вход: {dict(sorted(statuses.items()))}")
+
+
+async def loop_lag(seconds: float, interval: float = 0.005) -> List[float]:
+    # Насколько позже запланированного просыпается корутина: столько же
+    # ждал бы в этот момент любой запрос каталога
+    samples: List[float] = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - started - interval) * 1000)
+    return samples
+
+
+async def run_local(logins: int, seconds: float) -> None:
+    hashed = pwd_context.hash("password")
+    pool = PasswordHashingPool(
+        workers=settings.PASSWORD_HASH_WORKERS,
+        max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    )
+
+    async def inline_login() -> None:
+        pwd_context.verify("password", hashed)
+        await asyncio.sleep(0)
+
+    async def pooled_login() -> None:
+        try:
+            await pool.run(pwd_context.verify, "password", hashed)
+        except ServiceUnavailableError:
+            # Клиент, получивший 503, повторяет вход позже
+            await asyncio.sleep(0.01)
+
+    results = [{"mode": "idle", **percentiles(await loop_lag(seconds))}]
+    for mode, login in (("inline bcrypt", inline_login), ("hashing pool", pooled_login)):
+        stop = asyncio.Event()
+
+        async def worker() -> None:
+            while not stop.is_set():
+                await login()
+
+        workers = [asyncio.create_task(worker()) for _ in range(logins)]
+        try:
+            results.append({"mode": mode, **percentiles(await loop_lag(seconds))})
+        finally:
+            stop.set()
+            await asyncio.gather(*workers)
+    pool.shutdown()
+    print_table(f"Задержка цикла событий, {logins} параллельных входов", results)
+    print(f"\nОтклонено пулом: {pool.rejected}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--email", default=settings.FIRST_SUPERUSER)
+    parser.add_argument("--password", default=settings.FIRST_SUPERUSER_PASSWORD)
+    parser.add_argument("--local", action="store_true")
+    args = parser.parse_args()
+    if args.local:
+        asyncio.run(run_local(args.logins, args.seconds))
+    else:
+        asyncio.run(run_server(args.url, args.logins, args.seconds, args.email, args.password))
@@ -0,0 +1,97 @@
+"""
+Микробенчмарк сериализации страницы питомцев.
+
+Сравнивает путь FastAPI по умолчанию (валидация ORM-объектов через схему,
+``jsonable_encoder`` и ``json.dumps``), валидацию с ``TypeAdapter.dump_json``
+и быстрый путь ``dump_models_json`` без повторной валидации.
+База данных не нужна: объекты ``Pet`` создаются в памяти.
+
+Запуск::
+
+    docker-compose exec api python -m benchmarks.bench_serialization --rows 1000
+"""
+import argparse
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Type
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
+
+from app import crud, schemas
+from app.core.serialization import dump_models_json
+from app.models.pet import Pet
+from benchmarks.common import measure, print_table
+
+
+def make_pets(rows: int) -> List[Pet]:
+    now = datetime.now(timezone.utc)
+    return [
+        crud.pet.model(
+            id=i,
+            name=f"Рекс {i}",
+            type="собака",
+            breed="Немецкая овчарка",
+            color="черно-подпалый",
+            age=round(i % 150 / 10, 1),
+            is_available=i % 4 != 0,
+            price=None if i % 10 == 0 else 1000.0 + i,
+            secret_notes=f"Заметка {i}",
+            version=1,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(1, rows + 1)
+    ]
+
+
+def fastapi_default(pets: List[Pet], schema: Type[BaseModel]) -> bytes:
+    # То же, что делает FastAPI для response_model: валидация, jsonable_encoder,
+    # затем JSONResponse
+    adapter = TypeAdapter(List[schema])
+    content = jsonable_encoder(adapter.validate_python(pets, from_attributes=True))
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def validate_and_dump(pets: List[Pet], schema: Type[BaseModel]) -> bytes:
+    adapter = TypeAdapter(List[schema])
+    return adapter.dump_json(adapter.validate_python(pets, from_attributes=True))
+
+
+PATHS: Dict[str, Callable[[List[Pet], Type[BaseModel]], bytes]] = {
+    "fastapi_default": fastapi_default,
+    "validate+dump_json": validate_and_dump,
+    "dump_models_json": dump_models_json,
+}
+
+
+async def run(rows: int, repeat: int) -> None:
+    pets = make_pets(rows)
+    results: List[Dict[str, Any]] = []
+    for schema in (schemas.Pet, schemas.PetAdmin):
+        expected = json.loads(validate_and_dump(pets, schema))
+        for name, path in PATHS.items():
+            # Все пути должны давать одинаковый документ
+            assert json.loads(path(pets, schema)) == expected, name
+
+            async def call() -> None:
+                path(pets, schema)
+
+            timing = await measure(call, repeat=repeat)
+            results.append({"schema": schema.__name__, "path": name, **timing})
+    print_table(f"Сериализация {rows} питомцев", results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Бенчмарк поиска по подстроке до и после триграммных индексов.
+
+Заполняет отдельную базу сгенерированным каталогом, затем замеряет
+``CRUDPet.search`` сначала без индексов pg_trgm, потом с ними.
+
+Запуск::
+
+    docker-compose exec api python -m benchmarks.bench_trgm_search --rows 1000000
+"""
+import argparse
+import asyncio
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, schemas
+from app.models.pet import TRGM_SEARCH_FIELDS
+from benchmarks.common import measure, print_table, recreate_bench_database, seed_pets
+
+QUERIES: Dict[str, schemas.PetSearchParams] = {
+    "name=арс": schemas.PetSearchParams(name="арс"),
+    "breed=овчар": schemas.PetSearchParams(breed="овчар"),
+    "color=подпал": schemas.PetSearchParams(color="подпал"),
+    "type=кош&breed=перс": schemas.PetSearchParams(type="кош", breed="перс"),
+    "name=Рекс 777": schemas.PetSearchParams(name="Рекс 777"),
+}
+
+
+async def drop_trgm_indexes(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        for field in TRGM_SEARCH_FIELDS:
+            await conn.execute(text(f"DROP INDEX IF EXISTS ix_pets_{field}_trgm"))
+        await conn.execute(text("ANALYZE pets"))
+
+
+async def create_trgm_indexes(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        for field in TRGM_SEARCH_FIELDS:
+            await conn.execute(
+                text(
+                    f"CREATE INDEX IF NOT EXISTS ix_pets_{field}_trgm "
+                    f"ON pets USING gin ({field} gin_trgm_ops)"
+                )
+            )
+        await conn.execute(text("ANALYZE pets"))
+
+
+async def run_queries(engine: AsyncEngine, phase: str, repeat: int) -> List[Dict[str, object]]:
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    rows = []
+    async with session_factory() as db:
+        for label, params in QUERIES.items():
+            stats = await measure(
+                lambda: crud.pet.search(db, params=params, limit=20), repeat=repeat
+            )
+            rows.append({"phase": phase, "query": label, **stats})
+    return rows
+
+
+async def main(rows: int, repeat: int) -> None:
+    engine = await recreate_bench_database()
+    try:
+        print(f"Заполнение таблицы pets: {rows} строк...")
+        await seed_pets(engine, rows)
+
+        await drop_trgm_indexes(engine)
+        before = await run_queries(engine, "без pg_trgm", repeat)
+
+        await create_trgm_indexes(engine)
+        after = await run_queries(engine, "с pg_trgm", repeat)
+
+        print_table(f"CRUDPet.search, {rows} строк, limit=20", before + after)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
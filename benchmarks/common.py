@@ -0,0 +1,122 @@
+"""
+Общие утилиты для бенчмарков.
+
+Бенчмарки работают с отдельной базой данных (по умолчанию ``pet_shop_bench``
+на сервере из настроек приложения), которую пересоздают при каждом запуске.
+Адрес можно переопределить переменной окружения ``BENCH_DATABASE_URL``.
+"""
+import os
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import asyncpg
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.db.base import Base
+
+BENCH_DB_NAME = "pet_shop_bench"
+
+
+def bench_database_url() -> str:
+    """URL базы данных для бенчмарков."""
+    url = os.environ.get("BENCH_DATABASE_URL")
+    if url:
+        return url
+    return (
+        f"postgresql+asyncpg://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
+        f"@{settings.POSTGRES_SERVER}/{BENCH_DB_NAME}"
+    )
+
+
+async def recreate_bench_database() -> AsyncEngine:
+    """Пересоздает базу для бенчмарков со схемой приложения."""
+    url = bench_database_url()
+    db_name = url.rsplit("/", 1)[-1]
+    conn = await asyncpg.connect(
+        host=settings.POSTGRES_SERVER,
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        database="postgres",
+    )
+    try:
+        await conn.execute(f"DROP DATABASE IF EXISTS {db_name}")
+        await conn.execute(f"CREATE DATABASE {db_name}")
+    finally:
+        await conn.close()
+
+    engine = create_async_engine(url, poolclass=NullPool)
+    async with engine.begin() as db_conn:
+        await db_conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+# SQL для генерации каталога: значения берутся циклически из небольших словарей,
+# а к имени добавляется номер, чтобы имена были уникальными
+SEED_PETS_SQL = """
+INSERT INTO pets (name, type, breed, color, age, is_available, price, secret_notes)
+SELECT
+    (ARRAY['Мухтар','Барсик','Кеша','Рекс','Пушок','Шарик','Мурка','Гоша'])[1 + i % 8]
+        || ' ' || i,
+    (ARRAY['собака','кошка','попугай','хомяк','кролик'])[1 + i % 5],
+    (ARRAY['Алабай','Шотландская вислоухая','Волнистый','Немецкая овчарка',
+           'Персидская','Сирийский','Мейн-кун','Лабрадор','Бигль'])[1 + i % 9],
+    (ARRAY['серый','белый','черный','рыжий','зеленый','черно-подпалый'])[1 + i % 6],
+    round((random() * 15)::numeric, 1),
+    i % 4 <> 0,
+    round((1000 + random() * 49000)::numeric, 0),
+    'Заметка ' || i
+FROM generate_series(1, $1) AS s(i)
+"""
+
+
+async def seed_pets(engine: AsyncEngine, rows: int) -> None:
+    """Заполняет таблицу pets сгенерированными записями и обновляет статистику."""
+    url = engine.url.set(drivername="postgresql")
+    conn = await asyncpg.connect(url.render_as_string(hide_password=False))
+    try:
+        await conn.execute(SEED_PETS_SQL, rows)
+        await conn.execute("VACUUM ANALYZE pets")
+    finally:
+        await conn.close()
+
+
+async def measure(
+    func: Callable[[], Awaitable[object]], *, repeat: int = 20, warmup: int = 2
+) -> Dict[str, float]:
+    """Замеряет задержку корутины, возвращает медиану и p95 в миллисекундах."""
+    for _ in range(warmup):
+        await func()
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[max(0, int(len(samples) * 0.95) - 1)],
+    }
+
+
+def print_table(title: str, rows: List[Dict[str, object]]) -> None:
+    """Печатает результаты бенчмарка простой таблицей."""
+    print(f"\n{title}")
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    widths = {
+        column: max(len(column), *(len(_fmt(row[column])) for row in rows))
+        for column in columns
+    }
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print("  ".join(_fmt(row[column]).ljust(widths[column]) for column in columns))
+
+
+def _fmt(value: object) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
@@ -11,9 +11,11 @@ from sqlalchemy.pool import NullPool
 
 from app.api.v1.router import api_router
 from app.config import settings
-from app.core.security import create_access_token
+from app.core.cache import cache
+from app.core.security import create_access_token, token_cache
+from app.core.suggest import suggest_index
 from app.db.base import Base
-from app.db.session import get_db
+from app.db.session import get_db, get_session_factory
 from app.main import app
 import asyncpg
 
@@ -81,6 +83,20 @@ async def create_test_database():
     await conn.close()
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def clear_caches():
+    """
+    Сбрасывает кеши уровня модуля перед каждым тестом.
+
+    Таблицы пересоздаются для каждого теста и ID начинаются заново, поэтому
+    записи, оставшиеся от предыдущего теста, относились бы к другим данным.
+    """
+    await cache.backend.clear()
+    token_cache.clear()
+    suggest_index.load({})
+    yield
+
+
 @pytest_asyncio.fixture(scope="function")
 async def db_engine(create_test_database):
     """Создает движок базы данных."""
@@ -101,11 +117,14 @@ async def db_session(db_engine) -> AsyncGenerator[AsyncSession, None]:
         await conn.run_sync(Base.metadata.create_all)
     
     # Создаем сессию
+    # Как и SessionLocal, объекты не устаревают после commit: методы CRUD
+    # возвращают их после фиксации транзакции
     TestingSessionLocal = sessionmaker(
         autocommit=False, 
         autoflush=False, 
         bind=db_engine, 
-        class_=AsyncSession
+        class_=AsyncSession,
+        expire_on_commit=False,
     )
     
     async with TestingSessionLocal() as session:
@@ -126,6 +145,10 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    # Потоковые эндпоинты открывают собственные сессии к тестовой БД
+    app.dependency_overrides[get_session_factory] = lambda: sessionmaker(
+        bind=db_session.bind, class_=AsyncSession, expire_on_commit=False
+    )
     
     async with AsyncClient(app=app, base_url="http://test") as client:
         yield client
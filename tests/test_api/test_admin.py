@@ -0,0 +1,235 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+
+
+@pytest.mark.asyncio
+async def test_export_pets(client: AsyncClient, superuser_token_headers):
+    """
+    Тест потоковой выгрузки каталога в NDJSON и CSV с фильтрами.
+    """
+    for name, pet_type in (("Мухтар", "собака"), ("Барсик", "кошка"), ("Рекс", "собака")):
+        await client.post(
+            f"{settings.API_V1_STR}/admin/pets",
+            headers=superuser_token_headers,
+            json={"name": name, "type": pet_type, "breed": "Дворняжка", "color": "серый", "age": 1.0, "secret_notes": "заметка"},
+        )
+
+    response = await client.get(
+        f"{settings.API_V1_STR}/admin/pets/export?format=ndjson&type=собака",
+        headers=superuser_token_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["name"] for row in rows] == ["Мухтар", "Рекс"]
+    assert rows[0]["secret_notes"] == "заметка"
+
+    response = await client.get(
+        f"{settings.API_V1_STR}/admin/pets/export?format=csv",
+        headers=superuser_token_headers,
+    )
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["name"] for row in rows] == ["Мухтар", "Барсик", "Рекс"]
+
+    response = await client.get(f"{settings.API_V1_STR}/admin/pets/export")
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_create_pets_bulk(client: AsyncClient, superuser_token_headers):
+    """
+    Тест массового создания: корректные питомцы создаются, для остальных
+    возвращаются ошибки с позицией во входном списке.
+    """
+    pets = [
+        {"name": f"Оптовый {i}", "type": "хомяк", "breed": "Сирийский", "color": "рыжий", "age": 0.5}
+        for i in range(3)
+    ]
+    pets.insert(1, {"name": "", "type": "хомяк", "breed": "Сирийский", "color": "рыжий", "age": -1})
+
+    response = await client.post(
+        f"{settings.API_V1_STR}/admin/pets/bulk",
+        headers=superuser_token_headers,
+        json=pets,
+    )
+
+    assert response.status_code == 200
+    content = response.json()
+    assert [item["index"] for item in content["created"]] == [0, 2, 3]
+    assert [error["index"] for error in content["errors"]] == [1]
+    assert {error["loc"][0] for error in content["errors"][0]["errors"]} == {"name", "age"}
+
+    response = await client.get(
+        f"{settings.API_V1_STR}/admin/pets/{content['created'][1]['id']}",
+        headers=superuser_token_headers,
+    )
+    assert response.json()["name"] == "Оптовый 1"
+
+
+@pytest.mark.asyncio
+async def test_update_and_delete_pets_by_filter(client: AsyncClient, superuser_token_headers):
+    """
+    Тест массового изменения и удаления по фильтру с предварительным подсчетом.
+    """
+    pets = [
+        {"name": f"Уценка {i}", "type": "кошка", "breed": "Британская", "color": "серый", "age": 2.0, "price": 5000.0}
+        for i in range(3)
+    ]
+    await client.post(f"{settings.API_V1_STR}/admin/pets/bulk", headers=superuser_token_headers, json=pets)
+    bulk_in = {"filter": {"breed": "британ"}, "patch": {"price": 4000.0, "is_available": False}}
+
+    response = await client.post(
+        f"{settings.API_V1_STR}/admin/pets/bulk-update?dry_run=true",
+        headers=superuser_token_headers,
+        json=bulk_in,
+    )
+    assert response.json() == {"count": 3, "dry_run": True}
+
+    response = await client.post(
+        f"{settings.API_V1_STR}/admin/pets/bulk-update",
+        headers=superuser_token_headers,
+        json=bulk_in,
+    )
+    assert response.json() == {"count": 3, "dry_run": False}
+
+    response = await client.get(
+        f"{settings.API_V1_STR}/pets/find?breed=британ&is_available=false",
+    )
+    assert {pet["price"] for pet in response.json()} == {4000.0}
+
+    response = await client.post(
+        f"{settings.API_V1_STR}/admin/pets/bulk-delete",
+        headers=superuser_token_headers,
+        json={"filter": {"breed": "британ"}},
+    )
+    assert response.json() == {"count": 3, "dry_run": False}
+
+    # Без фильтра массовые операции запрещены
+    response = await client.post(
+        f"{settings.API_V1_STR}/admin/pets/bulk-delete",
+        headers=superuser_token_headers,
+        json={"filter": {}},
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_update_pet_rejects_stale_version(client: AsyncClient, superuser_token_headers):
+    """
+    Тест оптимистичной блокировки: правка по устаревшей версии или ETag
+    получает 409, актуальная - проходит и увеличивает версию.
+    """
+    response = await client.post(
+        f"{settings.API_V1_STR}/admin/pets",
+        headers=superuser_token_headers,
+        json={"name": "Версия", "type": "попугай", "breed": "Ара", "color": "синий", "age": 3.0},
+    )
+    pet = response.json()
+    assert pet["version"] == 1
+    url = f"{settings.API_V1_STR}/admin/pets/{pet['id']}"
+    etag = (await client.get(url, headers=superuser_token_headers)).headers["etag"]
+
+    response = await client.put(
+        url, headers=superuser_token_headers, json={"price": 9000.0, "version": 1}
+    )
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.headers["etag"] != etag
+
+    # Обе правки сделаны по уже устаревшему состоянию
+    response = await client.put(
+        url, headers=superuser_token_headers, json={"price": 8000.0, "version": 1}
+    )
+    assert response.status_code == 409
+    response = await client.put(
+        url, headers={**superuser_token_headers, "If-Match": etag}, json={"price": 8000.0}
+    )
+    assert response.status_code == 409
+
+    response = await client.get(url, headers=superuser_token_headers)
+    assert response.json()["price"] == 9000.0
+    response = await client.put(
+        url,
+        headers={**superuser_token_headers, "If-Match": response.headers["etag"]},
+        json={"price": 8500.0},
+    )
+    assert response.status_code == 200
+    assert response.json()["version"] == 3
+
+
+@pytest.mark.asyncio
+async def test_import_pets_csv(client: AsyncClient, superuser_token_headers):
+    """
+    Тест импорта CSV: новые питомцы создаются, питомец с той же кличкой,
+    видом и породой обновляется (побеждает последняя строка), ошибки
+    проверки доступны в состоянии задачи.
+    """
+    await client.post(
+        f"{settings.API_V1_STR}/admin/pets",
+        headers=superuser_token_headers,
+        json={"name": "Импорт", "type": "кошка", "breed": "Мейн-кун", "color": "рыжий", "age": 3.0, "price": 30000.0},
+    )
+    data = (
+        "name,type,breed,color,age,price\n"
+        "Импорт,кошка,Мейн-кун,рыжий,3,31000\n"
+        "Импорт,кошка,Мейн-кун,рыжий,3,32000\n"
+        "Новый импорт,собака,Бигль,трехцветный,1,\n"
+        "Без возраста,собака,Бигль,белый,,\n"
+    )
+
+    response = await client.post(
+        f"{settings.API_V1_STR}/admin/pets/import",
+        headers=superuser_token_headers,
+        files={"file": ("supplier.csv", data.encode("utf-8"), "text/csv")},
+    )
+    assert response.status_code == 202
+    job_url = f"{settings.API_V1_STR}/admin/pets/import/{response.json()['id']}"
+    for _ in range(50):
+        job = (await client.get(job_url, headers=superuser_token_headers)).json()
+        if job["status"] in ("finished", "failed"):
+            break
+        await asyncio.sleep(0.1)
+
+    assert job["status"] == "finished"
+    assert (job["processed"], job["created"], job["updated"], job["failed"]) == (4, 1, 1, 1)
+    assert job["errors"][0]["line"] == 5
+
+    response = await client.get(
+        f"{settings.API_V1_STR}/admin/pets?name=Импорт&type=кошка",
+        headers=superuser_token_headers,
+    )
+    assert [(pet["price"], pet["version"]) for pet in response.json()] == [(32000.0, 2)]
+    response = await client.get(
+        f"{settings.API_V1_STR}/admin/pets?name=Новый импорт",
+        headers=superuser_token_headers,
+    )
+    assert [pet["version"] for pet in response.json()] == [1]
+
+
+@pytest.mark.asyncio
+async def test_read_pool_stats(client: AsyncClient, superuser_token_headers):
+    """
+    Тест метрик пула соединений: доступны только администраторам.
+    """
+    response = await client.get(
+        f"{settings.API_V1_STR}/admin/db/pool", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["profile"] == settings.DB_PROFILE
+    assert {"checked_out", "overflow", "wait_ms_avg", "opened", "closed"} <= set(
+        content["primary"]
+    )
+
+    response = await client.get(f"{settings.API_V1_STR}/admin/db/pool")
+    assert response.status_code == 401
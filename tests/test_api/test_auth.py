@@ -113,4 +113,55 @@ async def test_access_admin_endpoints(client: AsyncClient, superuser_token_heade
         f"{settings.API_V1_STR}/admin/pets",
     )
     
-    assert response.status_code == 401  # Unauthorized
\ No newline at end of file
+    assert response.status_code == 401  # Unauthorized
+
+@pytest.mark.asyncio
+async def test_refresh_and_revoke_tokens(client: AsyncClient):
+    """
+    Тест обновления и отзыва токенов: токен обновления одноразовый,
+    отозванный токен доступа больше не принимается.
+    """
+    user_data = {
+        "email": "test-refresh@example.com",
+        "password": "testpassword123",
+    }
+    await client.post(
+        f"{settings.API_V1_STR}/auth/register-test-superuser",
+        json=user_data,
+    )
+    response = await client.post(
+        f"{settings.API_V1_STR}/auth/token",
+        data={"username": user_data["email"], "password": user_data["password"]},
+    )
+    tokens = response.json()
+
+    response = await client.post(
+        f"{settings.API_V1_STR}/auth/refresh",
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+
+    # Использованный токен обновления отозван
+    response = await client.post(
+        f"{settings.API_V1_STR}/auth/refresh",
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert response.status_code == 401
+
+    headers = {"Authorization": f"Bearer {refreshed['access_token']}"}
+    response = await client.post(
+        f"{settings.API_V1_STR}/auth/revoke",
+        json={"refresh_token": refreshed["refresh_token"]},
+        headers=headers,
+    )
+    assert response.status_code == 204
+
+    response = await client.get(f"{settings.API_V1_STR}/admin/pets", headers=headers)
+    assert response.status_code == 401
+    response = await client.post(
+        f"{settings.API_V1_STR}/auth/refresh",
+        json={"refresh_token": refreshed["refresh_token"]},
+    )
+    assert response.status_code == 401
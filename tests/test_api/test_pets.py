@@ -2,6 +2,7 @@ import pytest
 from httpx import AsyncClient
 
 from app.config import settings
+from app.core import cdn
 
 
 @pytest.mark.asyncio
@@ -156,4 +157,321 @@ async def test_search_pets(client: AsyncClient):
         assert pet["type"] == "собака"
         assert pet["age"] >= 1.0
         assert pet["age"] <= 3.0
-        assert pet["is_available"] is True
\ No newline at end of file
+        assert pet["is_available"] is True
+
+
+@pytest.mark.asyncio
+async def test_search_pets_cursor_pagination(client: AsyncClient, superuser_token_headers):
+    """
+    Тест постраничного обхода каталога по курсору.
+    """
+    created_ids = []
+    for i in range(5):
+        response = await client.post(
+            f"{settings.API_V1_STR}/admin/pets",
+            headers=superuser_token_headers,
+            json={
+                "name": f"Курсор {i}",
+                "type": "хомяк",
+                "breed": "Сирийский",
+                "color": "рыжий",
+                "age": 1.0,
+            },
+        )
+        created_ids.append(response.json()["id"])
+
+    seen_ids = []
+    url = f"{settings.API_V1_STR}/pets/find?type=хомяк&limit=2"
+    response = await client.get(url)
+    while True:
+        assert response.status_code == 200
+        seen_ids.extend(pet["id"] for pet in response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        response = await client.get(f"{url}&cursor={next_cursor}")
+
+    assert seen_ids == created_ids
+
+    response = await client.get(f"{url}&cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_full_text_search_pets(client: AsyncClient, superuser_token_headers):
+    """
+    Тест полнотекстового поиска с учетом словоформ и релевантности.
+    """
+    for pet_data in (
+        {"name": "Шарик", "type": "собака", "breed": "Лабрадор", "color": "рыжий"},
+        {"name": "Рыжик", "type": "кошка", "breed": "Мейн-кун", "color": "рыжий"},
+    ):
+        await client.post(
+            f"{settings.API_V1_STR}/admin/pets",
+            headers=superuser_token_headers,
+            json={**pet_data, "age": 1.0},
+        )
+
+    # Запрос во множественном числе находит запись в единственном
+    response = await client.get(f"{settings.API_V1_STR}/pets/search?q=собаки")
+
+    assert response.status_code == 200
+    content = response.json()
+    assert [pet["name"] for pet in content] == ["Шарик"]
+    assert "secret_notes" not in content[0]
+
+    # Совпадение по кличке ранжируется выше совпадения по цвету
+    response = await client.get(f"{settings.API_V1_STR}/pets/search?q=рыжик")
+
+    assert response.status_code == 200
+    assert [pet["name"] for pet in response.json()][0] == "Рыжик"
+
+
+@pytest.mark.asyncio
+async def test_search_pets_facets(client: AsyncClient, superuser_token_headers):
+    """
+    Тест фасетных счетчиков в результатах поиска.
+    """
+    for name, breed in (("Бобик", "Бигль"), ("Тузик", "Бигль"), ("Дружок", "Лабрадор")):
+        await client.post(
+            f"{settings.API_V1_STR}/admin/pets",
+            headers=superuser_token_headers,
+            json={"name": name, "type": "собака", "breed": breed, "color": "белый", "age": 1.0},
+        )
+
+    response = await client.get(
+        f"{settings.API_V1_STR}/pets/find?type=собака&facets=breed,is_available"
+    )
+
+    assert response.status_code == 200
+    content = response.json()
+    assert len(content["items"]) == 3
+    assert content["facets"]["breed"] == [
+        {"value": "Бигль", "count": 2},
+        {"value": "Лабрадор", "count": 1},
+    ]
+    assert content["facets"]["is_available"] == [{"value": True, "count": 3}]
+
+    # Счетчики без фильтров сбрасываются после изменения каталога
+    response = await client.get(f"{settings.API_V1_STR}/pets/find?facets=type")
+    assert response.json()["facets"]["type"] == [{"value": "собака", "count": 3}]
+
+    await client.post(
+        f"{settings.API_V1_STR}/admin/pets",
+        headers=superuser_token_headers,
+        json={"name": "Мурка", "type": "кошка", "breed": "Мейн-кун", "color": "белый", "age": 1.0},
+    )
+    response = await client.get(f"{settings.API_V1_STR}/pets/find?facets=type")
+    assert sorted(
+        (facet["value"], facet["count"]) for facet in response.json()["facets"]["type"]
+    ) == [("кошка", 1), ("собака", 3)]
+
+    response = await client.get(f"{settings.API_V1_STR}/pets/find?facets=price")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_pets_total_count(client: AsyncClient, superuser_token_headers):
+    """
+    Тест заголовка X-Total-Count в режимах подсчета.
+    """
+    for i in range(3):
+        await client.post(
+            f"{settings.API_V1_STR}/admin/pets",
+            headers=superuser_token_headers,
+            json={"name": f"Кролик {i}", "type": "кролик", "breed": "Рекс", "color": "серый", "age": 1.0},
+        )
+
+    url = f"{settings.API_V1_STR}/pets/find?type=кролик&limit=1"
+
+    response = await client.get(url)
+    assert "X-Total-Count" not in response.headers
+
+    response = await client.get(f"{url}&count=exact")
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert response.headers["X-Total-Count"] == "3"
+
+    response = await client.get(f"{url}&count=estimated")
+    assert response.status_code == 200
+    assert int(response.headers["X-Total-Count"]) >= 0
+    assert response.headers["X-Total-Count-Estimated"] == "true"
+
+    # Точное значение из общего кеша сбрасывается изменением каталога
+    await client.post(
+        f"{settings.API_V1_STR}/admin/pets",
+        headers=superuser_token_headers,
+        json={"name": "Кролик 3", "type": "кролик", "breed": "Рекс", "color": "серый", "age": 1.0},
+    )
+    response = await client.get(f"{url}&count=exact")
+    assert response.headers["X-Total-Count"] == "4"
+
+
+@pytest.mark.asyncio
+async def test_search_pets_sort_by_price(client: AsyncClient, superuser_token_headers):
+    """
+    Тест сортировки по цене, фильтра по цене и обхода отсортированных страниц.
+    """
+    for name, price in (("Гоша", 700.0), ("Кеша", 300.0), ("Яша", None), ("Паша", 500.0)):
+        await client.post(
+            f"{settings.API_V1_STR}/admin/pets",
+            headers=superuser_token_headers,
+            json={"name": name, "type": "попугай", "breed": "Волнистый", "color": "зеленый", "age": 1.0, "price": price},
+        )
+
+    url = f"{settings.API_V1_STR}/pets/find?type=попугай&limit=3"
+
+    # Питомцы без цены оказываются в конце в обоих направлениях
+    for sort, expected in (
+        ("price", ["Кеша", "Паша", "Гоша", "Яша"]),
+        ("-price", ["Гоша", "Паша", "Кеша", "Яша"]),
+    ):
+        response = await client.get(f"{url}&sort={sort}")
+        names = [pet["name"] for pet in response.json()]
+        response = await client.get(
+            f"{url}&sort={sort}&cursor={response.headers['X-Next-Cursor']}"
+        )
+        names.extend(pet["name"] for pet in response.json())
+        assert names == expected
+
+    response = await client.get(f"{url}&sort=price&min_price=400&max_price=800")
+    assert [pet["name"] for pet in response.json()] == ["Паша", "Гоша"]
+
+    # Границы с одной стороны тоже не пропускают питомцев без цены
+    response = await client.get(f"{url}&sort=price&min_price=400")
+    assert [pet["name"] for pet in response.json()] == ["Паша", "Гоша"]
+    response = await client.get(f"{url}&sort=-price&max_price=600")
+    assert [pet["name"] for pet in response.json()] == ["Паша", "Кеша"]
+
+    response = await client.get(f"{url}&min_price=800&max_price=400")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_suggest_values(client: AsyncClient, superuser_token_headers):
+    """
+    Тест подсказок по префиксу, обновляемых при изменениях каталога.
+    """
+    response = await client.post(
+        f"{settings.API_V1_STR}/admin/pets",
+        headers=superuser_token_headers,
+        json={"name": "Снежок", "type": "кошка", "breed": "Шотландская вислоухая", "color": "белый", "age": 1.0},
+    )
+    pet_id = response.json()["id"]
+
+    response = await client.get(f"{settings.API_V1_STR}/pets/suggest?field=breed&prefix=шот")
+
+    assert response.status_code == 200
+    assert "Шотландская вислоухая" in response.json()
+
+    await client.put(
+        f"{settings.API_V1_STR}/admin/pets/{pet_id}",
+        headers=superuser_token_headers,
+        json={"breed": "Шотландская прямоухая"},
+    )
+    response = await client.get(f"{settings.API_V1_STR}/pets/suggest?field=breed&prefix=шотландская п")
+    assert response.json() == ["Шотландская прямоухая"]
+
+    response = await client.get(f"{settings.API_V1_STR}/pets/suggest?field=price&prefix=1")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_pet_details_conditional_get(client: AsyncClient, superuser_token_headers):
+    """
+    Тест условного запроса деталей питомца: 304, пока питомец не изменился.
+    """
+    pet_id = await test_create_pet(client, superuser_token_headers)
+    url = f"{settings.API_V1_STR}/pets/details/{pet_id}"
+
+    response = await client.get(url)
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    response = await client.get(url, headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    await client.put(
+        f"{settings.API_V1_STR}/admin/pets/{pet_id}",
+        headers=superuser_token_headers,
+        json={"price": 2000.0},
+    )
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["price"] == 2000.0
+
+    response = await client.get(
+        f"{settings.API_V1_STR}/admin/pets/{pet_id}",
+        headers={**superuser_token_headers, "If-None-Match": response.headers["etag"]},
+    )
+    assert response.status_code == 304
+
+    response = await client.get(
+        f"{settings.API_V1_STR}/pets/details/999999", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_pets_details_batch(client: AsyncClient, superuser_token_headers):
+    """
+    Тест пакетного получения деталей питомцев.
+    """
+    first_id = await test_create_pet(client, superuser_token_headers)
+    second_id = await test_create_pet(client, superuser_token_headers)
+
+    response = await client.get(
+        f"{settings.API_V1_STR}/pets/details?ids={second_id},999999,{first_id}",
+    )
+
+    assert response.status_code == 200
+    content = response.json()
+    assert [pet["id"] for pet in content["items"]] == [second_id, first_id]
+    assert content["missing"] == [999999]
+    assert "secret_notes" not in content["items"][0]
+
+    response = await client.get(f"{settings.API_V1_STR}/pets/details?ids=1,abc")
+    assert response.status_code == 400
+
+    too_many = ",".join(str(id) for id in range(settings.PET_BATCH_MAX_SIZE + 1))
+    response = await client.get(f"{settings.API_V1_STR}/pets/details?ids={too_many}")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_cache_headers_and_purge(client: AsyncClient, superuser_token_headers, monkeypatch):
+    """
+    Тест заголовков кеширования для прокси и сброса по ключам при изменениях.
+    """
+    purged = []
+
+    async def recording(keys):
+        purged.append(list(keys))
+
+    monkeypatch.setattr(cdn, "_purge_hooks", [recording])
+
+    pet_id = await test_create_pet(client, superuser_token_headers)
+    assert purged == [[f"pet-{pet_id}", "catalog"]]
+
+    response = await client.get(f"{settings.API_V1_STR}/pets/find?type=собака")
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert "stale-while-revalidate=" in response.headers["cache-control"]
+    assert response.headers["surrogate-key"] == "catalog"
+
+    response = await client.get(f"{settings.API_V1_STR}/pets/details/{pet_id}")
+    assert response.headers["surrogate-key"] == f"pet-{pet_id}"
+
+    response = await client.get(f"{settings.API_V1_STR}/pets/details?ids={pet_id},999999")
+    assert response.headers["surrogate-key"] == f"pet-{pet_id} pet-999999"
+
+    await client.delete(
+        f"{settings.API_V1_STR}/admin/pets/{pet_id}",
+        headers=superuser_token_headers,
+    )
+    assert purged[-1] == [f"pet-{pet_id}", "catalog"]
@@ -0,0 +1,60 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import crud
+from app.config import settings
+from app.db import session as db_session_module
+from app.db.replicas import ReplicaRouter
+
+
+@pytest.mark.asyncio
+async def test_reads_routed_to_replica(
+    client: AsyncClient, db_session: AsyncSession, superuser_token_headers, monkeypatch
+):
+    """
+    Тест маршрутизации чтения на реплику и чтения своих изменений.
+
+    Репликой служит второй движок к той же тестовой базе, который
+    запоминает выполненные через него запросы.
+    """
+    replica = create_async_engine(
+        db_session.bind.url.render_as_string(hide_password=False), poolclass=NullPool
+    )
+    served = []
+    event.listen(
+        replica.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: served.append(statement),
+    )
+    monkeypatch.setattr(db_session_module, "replicas", ReplicaRouter([replica]))
+
+    response = await client.post(
+        f"{settings.API_V1_STR}/admin/pets",
+        headers=superuser_token_headers,
+        json={"name": "Реплика", "type": "кошка", "breed": "Сиамская", "color": "белый", "age": 1.0},
+    )
+    assert response.status_code == 200
+    pet_id = response.json()["id"]
+    assert db_session_module.PRIMARY_READS_COOKIE in response.cookies
+
+    # Сразу после изменения администратор читает с основного сервера
+    response = await client.get(f"{settings.API_V1_STR}/pets/details/{pet_id}")
+    assert response.status_code == 200
+    assert served == []
+
+    # Остальные клиенты читают с реплики. Первое чтение уже положило
+    # питомца в общий кеш, поэтому кеш сбрасывается, чтобы дойти до БД
+    client.cookies.clear()
+    await crud.pet.pet_cache.invalidate()
+    response = await client.get(f"{settings.API_V1_STR}/pets/details/{pet_id}")
+    assert response.status_code == 200
+    assert response.json()["name"] == "Реплика"
+    assert any("FROM pets" in statement for statement in served)
+    # Реплика может отставать, поэтому прочитанное с нее не кешируется
+    version = await crud.pet.pet_cache.current_version()
+    assert await crud.pet.pet_cache.get(str(pet_id), version=version) is None
+
+    await replica.dispose()
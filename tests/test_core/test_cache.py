@@ -0,0 +1,328 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+
+from app import crud, schemas
+from app.core.cache import (
+    Cache,
+    CacheBackendError,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    SharedMemoryCacheBackend,
+    TTLCache,
+)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """
+    Тест вытеснения давно не использованных записей.
+    """
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    """
+    Тест устаревания записей по времени жизни.
+    """
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 5)
+
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_stats():
+    """
+    Тест счетчиков попаданий и промахов.
+    """
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    stats = cache.stats()
+
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+    assert stats["hit_rate"] == 2 / 3
+
+
+class FakeRedisServer:
+    """
+    Локальный сервер с подмножеством протокола Redis для тестов.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.server = None
+        self.port = None
+        self.connections = set()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        for task in self.connections:
+            task.cancel()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                writer.write(self.execute(args[0].decode().upper(), args[1:]))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+    def execute(self, command, args):
+        if command == "GET":
+            return self.bulk(self.data.get(args[0]))
+        if command == "MGET":
+            return b"*%d\r\n" % len(args) + b"".join(
+                self.bulk(self.data.get(key)) for key in args
+            )
+        if command == "SET":
+            self.data[args[0]] = args[1]
+            return b"+OK\r\n"
+        if command == "DEL":
+            removed = sum(self.data.pop(key, None) is not None for key in args)
+            return b":%d\r\n" % removed
+        if command == "FLUSHDB":
+            self.data.clear()
+            return b"+OK\r\n"
+        if command == "INCR":
+            value = int(self.data.get(args[0], b"0")) + 1
+            self.data[args[0]] = str(value).encode()
+            return b":%d\r\n" % value
+        return b"-ERR unknown command\r\n"
+
+    @staticmethod
+    def bulk(value):
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+@pytest_asyncio.fixture(params=["memory", "shared_memory", "redis"])
+async def cache_backend(request, tmp_path):
+    if request.param == "memory":
+        backend = MemoryCacheBackend(maxsize=100)
+        yield backend
+    elif request.param == "shared_memory":
+        backend = SharedMemoryCacheBackend(str(tmp_path / "cache.sqlite3"))
+        yield backend
+    else:
+        server = FakeRedisServer()
+        await server.start()
+        backend = RedisCacheBackend(f"redis://127.0.0.1:{server.port}/0")
+        yield backend
+        await backend.close()
+        await server.stop()
+        return
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_cache_namespace_bulk_operations(cache_backend):
+    """
+    Тест пакетного чтения и записи в разделе кеша на всех хранилищах.
+    """
+    pets = Cache(cache_backend).namespace("pets", ttl=60)
+
+    await pets.set_many({"1": b"first", "2": b"second"})
+
+    assert await pets.get_many(["1", "2", "3"]) == {
+        "1": b"first",
+        "2": b"second",
+        "3": None,
+    }
+    assert pets.hits == 2
+    assert pets.misses == 1
+
+    await pets.delete("1")
+    assert await pets.get("1") is None
+
+    await cache_backend.clear()
+    assert await pets.get("2") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_namespace_invalidate(cache_backend):
+    """
+    Тест сброса раздела кеша с версией, общего для нескольких воркеров.
+    """
+    worker_a = Cache(cache_backend).namespace("search", ttl=60, versioned=True)
+    worker_b = Cache(cache_backend).namespace("search", ttl=60, versioned=True)
+    users = Cache(cache_backend).namespace("users", ttl=60)
+    await worker_a.set("page", b"[]", version=await worker_a.current_version())
+    await users.set("1", b"user")
+
+    assert await worker_b.get("page") == b"[]"
+
+    await worker_b.invalidate()
+
+    assert await worker_a.get("page") is None
+    assert await users.get("1") == b"user"
+
+
+@pytest.mark.asyncio
+async def test_cache_namespace_keeps_version_read_before_query(cache_backend):
+    """
+    Тест гонки: значение, посчитанное до сброса версии, сохраняется под
+    старой версией и не читается после сброса.
+    """
+    search = Cache(cache_backend).namespace("search", ttl=60, versioned=True)
+
+    version = await search.current_version()
+    assert await search.get("page", version=version) is None
+    # Изменение данных, пока выполняется запрос к БД
+    await search.invalidate()
+    await search.set("page", b"stale", version=version)
+
+    assert await search.get("page") is None
+    with pytest.raises(ValueError):
+        await search.set("page", b"[]")
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_keeps_versions_out_of_lru():
+    """
+    Тест: версии разделов не вытесняются записями кеша, иначе после
+    вытеснения версия начиналась бы с нуля и открывала старые записи.
+    """
+    backend = MemoryCacheBackend(maxsize=2)
+    pets = Cache(backend).namespace("pets", ttl=60, versioned=True)
+
+    await pets.set("1", b"old", version=await pets.current_version())
+    await pets.invalidate()
+    for key in ("a", "b", "c"):
+        await backend.set_many({key: b"value"}, ttl=None)
+
+    assert await pets.current_version() == 1
+    assert await pets.get("1", version=await pets.current_version()) is None
+
+
+@pytest.mark.asyncio
+async def test_shared_memory_backend_runs_outside_event_loop(tmp_path):
+    """
+    Тест: запросы к SQLite выполняются в отдельном потоке, а не в цикле событий.
+    """
+    backend = SharedMemoryCacheBackend(str(tmp_path / "cache.sqlite3"))
+    threads = []
+    execute = backend._get_many
+
+    def get_many(keys):
+        threads.append(threading.get_ident())
+        return execute(keys)
+
+    backend._get_many = get_many
+    try:
+        await backend.set_many({"a": b"1"}, ttl=None)
+        assert await backend.get_many(["a"]) == [b"1"]
+        assert threads and threads[0] != threading.get_ident()
+    finally:
+        await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_search_json_does_not_cache_page_overtaken_by_write(monkeypatch):
+    """
+    Тест кеша страниц поиска: если запись произошла между чтением кеша и
+    сохранением страницы, следующий запрос снова идет в БД.
+    """
+    queries = []
+
+    async def search_rows(db, **kwargs):
+        queries.append(kwargs)
+        if len(queries) == 1:
+            # Параллельная запись через CRUD, пока первый запрос выполняется
+            await crud.pet._after_write()
+        return []
+
+    monkeypatch.setattr(crud.pet, "search_rows", search_rows)
+    params = schemas.PetSearchParams(name="гонка")
+    # Сессия основного сервера: запросы к БД подменены выше
+    db = SimpleNamespace(info={})
+
+    await crud.pet.search_json(db, params=params, schema=schemas.Pet)
+    await crud.pet.search_json(db, params=params, schema=schemas.Pet)
+    await crud.pet.search_json(db, params=params, schema=schemas.Pet)
+
+    assert len(queries) == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_connection_dropped_after_error_reply():
+    """
+    Тест: после ошибки сервера соединение закрывается, а не возвращается в
+    пул с непрочитанными ответами пакета.
+    """
+    server = FakeRedisServer()
+    await server.start()
+    backend = RedisCacheBackend(f"redis://127.0.0.1:{server.port}/0")
+    try:
+        with pytest.raises(CacheBackendError):
+            await backend._execute([("BOGUS",), ("SET", "a", b"1")])
+        assert backend._idle == []
+
+        assert await backend.get_many(["a"]) == [b"1"]
+        assert len(backend._idle) == 1
+    finally:
+        await backend.close()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_cache_namespace_treats_unavailable_backend_as_miss():
+    """
+    Тест: недоступное хранилище - промах при чтении, запись и сброс
+    пропускаются без ошибки.
+    """
+    server = FakeRedisServer()
+    await server.start()
+    port = server.port
+    await server.stop()
+    backend = RedisCacheBackend(f"redis://127.0.0.1:{port}/0")
+    search = Cache(backend).namespace("search", ttl=60, versioned=True)
+
+    version = await search.current_version()
+    assert version == search.UNAVAILABLE
+    assert await search.get("page", version=version) is None
+    assert await search.get("page") is None
+    await search.set("page", b"[]", version=version)
+    await search.invalidate()
+    await search.delete("page")
+    assert search.misses == 2
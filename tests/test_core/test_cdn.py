@@ -0,0 +1,96 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core import cdn
+from app.core.cdn import CachePolicy, http_purge_hook
+
+
+def test_cache_policy_headers():
+    """
+    Тест заголовков политики кеширования: ключи без повторов, через пробел.
+    """
+    headers = CachePolicy(30, 60).headers(["pet-1", "catalog", "pet-1"])
+
+    assert headers == {
+        "Cache-Control": "public, max-age=30, stale-while-revalidate=60",
+        "Surrogate-Key": "pet-1 catalog",
+    }
+
+
+@pytest.mark.asyncio
+async def test_purge_calls_hooks_and_logs_errors(monkeypatch):
+    """
+    Тест сброса: вызываются все обработчики, ошибка одного не мешает другим.
+    """
+    purged = []
+
+    async def failing(keys):
+        raise RuntimeError("CDN недоступен")
+
+    async def recording(keys):
+        purged.append(list(keys))
+
+    monkeypatch.setattr(cdn, "_purge_hooks", [])
+    cdn.register_purge_hook(failing)
+    cdn.register_purge_hook(recording)
+
+    await cdn.purge_pet(7)
+
+    assert purged == [["pet-7", "catalog"]]
+
+
+@pytest.mark.asyncio
+async def test_purge_pets_batches_keys_and_limits_bulk_changes(monkeypatch):
+    """
+    Тест сброса многих питомцев: ключи отправляются пачками, а при слишком
+    большом изменении сбрасывается только каталог.
+    """
+    purged = []
+
+    async def recording(keys):
+        purged.append(list(keys))
+
+    monkeypatch.setattr(cdn, "_purge_hooks", [recording])
+    monkeypatch.setattr(cdn.settings, "CDN_PURGE_BATCH_SIZE", 2)
+    monkeypatch.setattr(cdn.settings, "CDN_PURGE_MAX_PET_KEYS", 3)
+
+    await cdn.purge_pets([1, 2, 3])
+    assert purged == [["pet-1", "pet-2"], ["pet-3", "catalog"]]
+
+    purged.clear()
+    await cdn.purge_pets(range(10))
+    assert purged == [["catalog"]]
+
+
+@pytest.mark.asyncio
+async def test_http_purge_hook():
+    """
+    Тест HTTP-обработчика сброса: ключи и токен передаются в заголовках.
+    """
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(dict(self.headers))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        hook = http_purge_hook(
+            f"http://127.0.0.1:{server.server_address[1]}/purge", token="purge-token"
+        )
+        await hook(["pet-1", "catalog"])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert received[0]["Surrogate-Key"] == "pet-1 catalog"
+    assert received[0]["Authorization"] == "Bearer purge-token"
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta, timezone
+
+from starlette.datastructures import Headers
+
+from app.core.conditional import (
+    etag_matches,
+    format_http_date,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
+
+UPDATED_AT = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def test_etag_changes_with_updated_at():
+    """
+    Тест: ETag зависит от идентификатора и времени изменения до микросекунды.
+    """
+    etag = make_etag(1, UPDATED_AT)
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag(1, UPDATED_AT)
+    assert etag != make_etag(2, UPDATED_AT)
+    assert etag != make_etag(1, UPDATED_AT + timedelta(microseconds=1))
+
+
+def test_if_match_uses_strong_comparison():
+    """
+    Тест If-Match: слабые теги не совпадают, `*` подходит к любой записи.
+    """
+    etag = make_etag(1, UPDATED_AT)
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(f"W/{etag}", etag)
+    assert not etag_matches(make_etag(1, UPDATED_AT + timedelta(seconds=1)), etag)
+
+
+def test_if_none_match():
+    """
+    Тест сравнения If-None-Match со списком тегов и слабыми тегами.
+    """
+    etag = make_etag(1, UPDATED_AT)
+
+    assert is_not_modified(Headers({"if-none-match": etag}), etag, UPDATED_AT)
+    assert is_not_modified(Headers({"if-none-match": f'"x", W/{etag}'}), etag, UPDATED_AT)
+    assert is_not_modified(Headers({"if-none-match": "*"}), etag, UPDATED_AT)
+    assert not is_not_modified(Headers({"if-none-match": '"x"'}), etag, UPDATED_AT)
+
+
+def test_if_modified_since():
+    """
+    Тест If-Modified-Since: доли секунды отбрасываются, If-None-Match важнее.
+    """
+    etag = make_etag(1, UPDATED_AT)
+    same_second = format_http_date(UPDATED_AT)
+    earlier = format_http_date(UPDATED_AT - timedelta(seconds=1))
+
+    assert is_not_modified(Headers({"if-modified-since": same_second}), etag, UPDATED_AT)
+    assert not is_not_modified(Headers({"if-modified-since": earlier}), etag, UPDATED_AT)
+    assert not is_not_modified(Headers({"if-modified-since": "yesterday"}), etag, UPDATED_AT)
+    assert not is_not_modified(
+        Headers({"if-none-match": '"x"', "if-modified-since": same_second}),
+        etag,
+        UPDATED_AT,
+    )
+
+
+def test_not_modified_response():
+    """
+    Тест ответа 304 с заголовками валидаторов.
+    """
+    headers = Headers({"if-none-match": make_etag(1, UPDATED_AT)})
+
+    response = not_modified_response(headers, 1, UPDATED_AT)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == make_etag(1, UPDATED_AT)
+    assert response.headers["last-modified"] == "Wed, 01 May 2024 12:30:15 GMT"
+    assert not_modified_response(headers, 1, None) is None
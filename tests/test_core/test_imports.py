@@ -0,0 +1,176 @@
+import io
+
+import pytest
+
+from app import crud, schemas
+from app.core import imports
+from app.core.cache import Cache, MemoryCacheBackend
+from app.core.imports import (
+    ImportFileError,
+    ImportJob,
+    ImportJobRegistry,
+    read_chunks,
+    run_import,
+    validate_rows,
+)
+from app.crud.pet import ImportResult
+
+CSV_HEADER = "name,type,breed,color,age,price,is_available,supplier\n"
+
+
+def test_read_chunks_splits_rows_and_keeps_line_numbers():
+    """
+    Тест чтения CSV порциями: номера строк файла, пустые значения пропускаются,
+    лишние колонки сохраняются и игнорируются схемой.
+    """
+    text = io.StringIO(
+        CSV_HEADER
+        + "Рекс,собака,Овчарка,черный,2,,true,ООО Зоо\n"
+        + "Мурка,кошка,Сиамская,белый,1.5,12000,false,ООО Зоо\n"
+        + "Кеша,попугай,Волнистый,зеленый,0.5,3000,,\n"
+    )
+
+    chunks = list(read_chunks(text, chunk_size=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert [line for line, _ in chunks[0]] == [2, 3]
+    line, values = chunks[0][0]
+    assert "price" not in values
+    assert values["supplier"] == "ООО Зоо"
+
+
+def test_read_chunks_requires_columns():
+    """
+    Тест: файл без обязательных колонок отклоняется целиком.
+    """
+    with pytest.raises(ImportFileError, match="color, age"):
+        list(read_chunks(io.StringIO("name,type,breed\nРекс,собака,Овчарка\n"), 10))
+
+
+def test_validate_rows_reports_errors_by_line():
+    """
+    Тест проверки строк: корректные строки превращаются в PetCreate,
+    для остальных возвращаются ошибки с номером строки.
+    """
+    rows = [
+        (2, {"name": "Рекс", "type": "собака", "breed": "Овчарка", "color": "черный", "age": "2"}),
+        (3, {"type": "собака", "breed": "Овчарка", "color": "черный", "age": "-1"}),
+    ]
+
+    valid, errors = validate_rows(rows)
+
+    assert [(line, pet_in.age) for line, pet_in in valid] == [(2, 2.0)]
+    assert valid[0][1].is_available is True
+    assert [error["line"] for error in errors] == [3]
+    assert {error["loc"][0] for error in errors[0]["errors"]} == {"name", "age"}
+
+
+@pytest.mark.asyncio
+async def test_job_keeps_first_errors_and_registry_shares_state():
+    """
+    Тест задачи и реестра: хранится ограниченное число ошибок, состояние,
+    сохраненное одним воркером, видно другому через общее хранилище.
+    """
+    job = ImportJob(max_errors=2)
+    job.add_errors([{"line": line, "errors": []} for line in range(2, 7)])
+    assert job.failed == 5
+    assert [error["line"] for error in job.errors] == [2, 3]
+
+    backend = MemoryCacheBackend(maxsize=100)
+    worker_a = ImportJobRegistry(Cache(backend).namespace("import_jobs", ttl=60))
+    worker_b = ImportJobRegistry(Cache(backend).namespace("import_jobs", ttl=60))
+    running = await worker_a.create("supplier.csv")
+    assert (await worker_b.get(running.id)).status == schemas.ImportStatus.pending
+
+    running.status = schemas.ImportStatus.running
+    running.processed = 10
+    await worker_a.save(running)
+
+    state = await worker_b.get(running.id)
+    assert (state.status, state.processed, state.filename) == (
+        schemas.ImportStatus.running,
+        10,
+        "supplier.csv",
+    )
+    assert await worker_b.get("unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_registry_keeps_own_jobs_evicted_from_cache():
+    """
+    Тест реестра: состояние задачи своего процесса доступно, даже если
+    ограниченное по размеру хранилище уже вытеснило ее запись.
+    """
+    backend = MemoryCacheBackend(maxsize=2)
+    registry = ImportJobRegistry(Cache(backend).namespace("import_jobs", ttl=60))
+    job = await registry.create("supplier.csv")
+    job.processed = 5
+    await registry.save(job)
+
+    await backend.set_many({"a": b"1", "b": b"2"}, ttl=None)
+    assert await backend.get_many([f"import_jobs:{job.id}"]) == [None]
+
+    assert (await registry.get(job.id)).processed == 5
+
+
+@pytest.mark.asyncio
+async def test_run_import_without_valid_rows_does_not_touch_database():
+    """
+    Тест задачи импорта: файл без корректных строк и файл без нужных колонок
+    обрабатываются без обращения к БД, итог записывается в задачу.
+    """
+
+    def session_factory():
+        raise AssertionError("БД не нужна")
+
+    job = ImportJob()
+    data = (CSV_HEADER + ",собака,Овчарка,черный,abc,,,\n").encode("utf-8-sig")
+    file = io.BytesIO(data)
+    await run_import(job, file, session_factory, chunk_size=10)
+
+    assert job.status == schemas.ImportStatus.finished
+    assert (job.processed, job.created, job.failed) == (1, 0, 1)
+    assert job.errors[0]["line"] == 2
+    assert file.closed
+
+    job = ImportJob()
+    await run_import(job, io.BytesIO(b"name\n"), session_factory, chunk_size=10)
+    assert job.status == schemas.ImportStatus.failed
+    assert "обязательных колонок" in job.detail
+    assert job.finished_at is not None
+
+
+@pytest.mark.asyncio
+async def test_run_import_purges_created_and_updated_pets(monkeypatch):
+    """
+    Тест сброса кеша прокси после импорта: ключи и обновленных, и созданных
+    питомцев (их ID могли быть закешированы как отсутствующие).
+    """
+    purged = []
+
+    class Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def copy_upsert(db, *, rows):
+        return ImportResult(created=[7], updated=[3])
+
+    async def distinct_value_counts(db, *, fields):
+        return {}
+
+    async def purge_pets(pet_ids):
+        purged.extend(pet_ids)
+
+    monkeypatch.setattr(crud.pet, "copy_upsert", copy_upsert)
+    monkeypatch.setattr(crud.pet, "distinct_value_counts", distinct_value_counts)
+    monkeypatch.setattr(imports, "purge_pets", purge_pets)
+
+    job = ImportJob()
+    data = (CSV_HEADER + "Рекс,собака,Овчарка,черный,2,,,\n").encode("utf-8")
+    await run_import(job, io.BytesIO(data), Session, chunk_size=10)
+
+    assert job.status == schemas.ImportStatus.finished
+    assert sorted(purged) == [3, 7]
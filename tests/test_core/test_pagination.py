@@ -0,0 +1,22 @@
+import pytest
+
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip():
+    """
+    Тест упаковки и распаковки курсора.
+    """
+    cursor = encode_cursor([25000.0, 42])
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == [25000.0, 42]
+
+
+@pytest.mark.parametrize("cursor", ["", "не-base64", "bnVsbA", "W10"])
+def test_decode_invalid_cursor(cursor):
+    """
+    Тест того, что поврежденный курсор отклоняется.
+    """
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
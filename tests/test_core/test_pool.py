@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from app.config import settings
+from app.db.pool import MeteredQueuePool
+
+
+class FakeConnection:
+    """
+    Заменитель соединения DBAPI для проверки пула без сервера БД.
+    """
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_engine_options_follow_profile_and_overrides():
+    """
+    Тест настроек движка: значения профиля, отдельные DB_* переопределяют их.
+    """
+    prod = settings.model_copy(update={"DB_PROFILE": "prod", "DB_POOL_SIZE": 3})
+
+    options = prod.db_engine_options
+
+    assert options["echo"] is False
+    assert options["pool_pre_ping"] is True
+    assert options["pool_size"] == 3
+    assert options["connect_args"]["prepared_statement_cache_size"] == 500
+
+
+@pytest.mark.asyncio
+async def test_pool_counts_checkouts_and_timeouts():
+    """
+    Тест метрик пула: выданные соединения, время получения и отказы по
+    таймауту; счетчики сохраняются при пересоздании пула.
+    """
+    pool = MeteredQueuePool(FakeConnection, pool_size=1, max_overflow=0, timeout=0.05)
+
+    connection = await greenlet_spawn(pool.connect)
+    stats = pool.metrics.stats(pool)
+    assert (stats["checked_out"], stats["checkouts"], stats["timeouts"]) == (1, 1, 0)
+
+    with pytest.raises(exc.TimeoutError):
+        await greenlet_spawn(pool.connect)
+    assert pool.metrics.timeouts == 1
+    assert pool.metrics.checkouts == 1
+
+    await greenlet_spawn(connection.close)
+    assert pool.metrics.stats(pool)["idle"] == 1
+
+    recreated = pool.recreate()
+    assert recreated.metrics is pool.metrics
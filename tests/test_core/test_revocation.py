@@ -0,0 +1,40 @@
+import time
+import uuid
+
+from app.core.revocation import BloomFilter, RevocationSet
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """
+    Тест фильтра Блума: добавленные значения всегда находятся, доля ложных
+    срабатываний на остальных мала.
+    """
+    bloom = BloomFilter(bits=1 << 14, hashes=7)
+    added = [uuid.uuid4().hex for _ in range(500)]
+    for value in added:
+        bloom.add(value)
+
+    assert all(bloom.might_contain(value) for value in added)
+    false_positives = sum(bloom.might_contain(uuid.uuid4().hex) for _ in range(2000))
+    assert false_positives < 40
+
+
+def test_revocation_set_forgets_expired_tokens_on_load():
+    """
+    Тест множества отзывов: точная проверка без ложных срабатываний,
+    загрузка объединяет отзывы и отбрасывает истекшие.
+    """
+    revoked = RevocationSet(bits=1 << 10, hashes=3)
+    now = time.time()
+    revoked.add("local", now + 60)
+    revoked.add("expired", now - 1)
+
+    assert "local" in revoked
+    assert "other" not in revoked
+    assert None not in revoked
+
+    revoked.load([("remote", now + 60), ("old", now - 60)])
+
+    assert "local" in revoked and "remote" in revoked
+    assert "expired" not in revoked and "old" not in revoked
+    assert len(revoked) == 2
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from jose import JWTError
+
+from app import crud, schemas
+from app.core import security
+from app.core.exceptions import ServiceUnavailableError
+from app.core.revocation import revoked_tokens
+from app.core.security import (
+    REFRESH_TOKEN_TYPE,
+    PasswordHashingPool,
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    get_current_active_superuser,
+    get_current_user,
+    token_cache,
+    verify_token,
+)
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_does_not_block_event_loop():
+    """
+    Тест пула хеширования: пока операция выполняется в потоке, цикл событий
+    продолжает обслуживать другие корутины.
+    """
+    pool = PasswordHashingPool(workers=2, max_pending=4)
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        results = await asyncio.gather(
+            pool.run(lambda: time.sleep(0.1) or "hash"),
+            pool.run(lambda: time.sleep(0.1) or "hash"),
+        )
+    finally:
+        task.cancel()
+        pool.shutdown()
+
+    assert results == ["hash", "hash"]
+    assert ticks >= 5
+    assert pool.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_rejects_when_full():
+    """
+    Тест ограничения очереди: операции сверх max_pending сразу получают 503
+    с Retry-After, после освобождения пул снова принимает работу.
+    """
+    pool = PasswordHashingPool(workers=1, max_pending=2, retry_after=3)
+    release = threading.Event()
+    busy = [asyncio.create_task(pool.run(release.wait, 5)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(ServiceUnavailableError) as e:
+        await pool.run(str, 1)
+    assert e.value.status_code == 503
+    assert e.value.headers["Retry-After"] == "3"
+    assert pool.stats()["rejected"] == 1
+
+    release.set()
+    await asyncio.gather(*busy)
+    assert await pool.run(str, 1) == "1"
+    pool.shutdown()
+
+
+def test_decode_token_caches_verified_tokens(monkeypatch):
+    """
+    Тест кеша токенов: подпись проверяется один раз, поддельный токен
+    не попадает в кеш.
+    """
+    token_cache.clear()
+    calls = []
+    decode = security.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", counting_decode)
+    token = create_access_token(42, expires_delta=timedelta(minutes=5))
+
+    assert decode_token(token)["sub"] == "42"
+    assert decode_token(token)["sub"] == "42"
+    assert len(calls) == 1
+
+    with pytest.raises(JWTError):
+        decode_token(token[:-2] + "xx")
+    with pytest.raises(JWTError):
+        decode_token(token[:-2] + "xx")
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_role_claims_authorize_without_database(monkeypatch):
+    """
+    Тест токена с правами: при AUTH_ROLE_CLAIMS суперпользователь
+    определяется по самому токену без БД, без этой настройки права из
+    токена игнорируются.
+    """
+    token = create_access_token(7, claims={"is_active": True, "is_superuser": True})
+    monkeypatch.setattr(security.settings, "AUTH_ROLE_CLAIMS", True)
+
+    principal = await get_current_user(db=None, payload=verify_token(token))
+
+    assert principal == schemas.Principal(id=7, is_active=True, is_superuser=True)
+    assert await get_current_active_superuser(principal) is principal
+
+    stored = schemas.Principal(id=7, is_active=True, is_superuser=False)
+
+    async def get_principal(db, id):
+        return stored
+
+    monkeypatch.setattr(security.settings, "AUTH_ROLE_CLAIMS", False)
+    monkeypatch.setattr(crud.user, "get_principal", get_principal)
+
+    assert await get_current_user(db=None, payload=verify_token(token)) == stored
+
+
+def test_verify_token_checks_type_and_revocation():
+    """
+    Тест проверки токена: токен обновления не подходит для доступа,
+    отозванный токен отклоняется.
+    """
+    refresh = create_refresh_token(7)
+    with pytest.raises(HTTPException) as e:
+        verify_token(refresh)
+    assert e.value.status_code == 401
+    payload = verify_token(refresh, REFRESH_TOKEN_TYPE)
+
+    revoked_tokens.add(payload["jti"], payload["exp"])
+    with pytest.raises(HTTPException):
+        verify_token(refresh, REFRESH_TOKEN_TYPE)
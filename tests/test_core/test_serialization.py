@@ -0,0 +1,81 @@
+import json
+from datetime import datetime, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app import schemas
+from app.core.serialization import dump_models_json, dump_rows_json
+from app.models import Pet
+
+NOW = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def make_pet(id: int, **overrides) -> Pet:
+    values = {
+        "id": id,
+        "name": "Барсик",
+        "type": "кошка",
+        "breed": "Персидская",
+        "color": "белый",
+        "age": 2.0,
+        "is_available": True,
+        "price": None,
+        "secret_notes": "Секрет",
+        "version": 1,
+        "created_at": NOW,
+        "updated_at": NOW,
+    }
+    values.update(overrides)
+    return Pet(**values)
+
+
+def test_dump_models_json_matches_schema():
+    """
+    Тест: быстрый путь дает тот же JSON, что валидация через схему.
+    """
+    pets = [make_pet(1), make_pet(2, price=1500.0, is_available=False)]
+
+    for schema in (schemas.Pet, schemas.PetAdmin):
+        adapter = TypeAdapter(List[schema])
+        expected = adapter.dump_json(adapter.validate_python(pets, from_attributes=True))
+        assert dump_models_json(pets, schema) == expected
+
+    assert "secret_notes" not in json.loads(dump_models_json(pets, schemas.Pet))[0]
+
+
+def test_dump_rows_json():
+    """
+    Тест сериализации строк-словарей: лишние ключи не попадают в ответ.
+    """
+    row = {
+        "id": 1,
+        "name": "Кеша",
+        "type": "попугай",
+        "breed": "Волнистый",
+        "color": "зеленый",
+        "age": 1.0,
+        "is_available": True,
+        "price": 900.0,
+        "created_at": NOW,
+        "updated_at": NOW,
+        "secret_notes": "Секрет",
+    }
+
+    content = json.loads(dump_rows_json([row], schemas.Pet))
+
+    assert content == [
+        {
+            "id": 1,
+            "name": "Кеша",
+            "type": "попугай",
+            "breed": "Волнистый",
+            "color": "зеленый",
+            "age": 1.0,
+            "is_available": True,
+            "price": 900.0,
+            "created_at": "2024-05-01T12:30:00Z",
+            "updated_at": "2024-05-01T12:30:00Z",
+        }
+    ]
+    assert dump_rows_json([], schemas.Pet) == b"[]"
@@ -0,0 +1,45 @@
+from app.core.suggest import SuggestIndex
+
+
+def test_suggest_by_prefix():
+    """
+    Тест подсказок по префиксу без учета регистра.
+    """
+    index = SuggestIndex()
+    index.load(
+        {
+            "breed": {
+                "Шотландская вислоухая": 3,
+                "Шотландская прямоухая": 1,
+                "Шпиц": 2,
+                "Алабай": 1,
+            }
+        }
+    )
+
+    assert index.suggest("breed", "шот") == [
+        "Шотландская вислоухая",
+        "Шотландская прямоухая",
+    ]
+    assert index.suggest("breed", "Ш", limit=1) == ["Шотландская вислоухая"]
+    assert index.suggest("breed", "Бигль") == []
+    assert index.suggest("color", "с") == []
+
+
+def test_suggest_incremental_updates():
+    """
+    Тест добавления и удаления значений при изменении каталога.
+    """
+    index = SuggestIndex()
+    index.load({"type": {"собака": 1}})
+
+    index.add_values({"type": "ёж", "breed": "Африканский", "color": "серый"})
+    assert index.suggest("type", "е") == ["ёж"]
+    assert index.suggest("color", "сер") == ["серый"]
+
+    index.add("type", "собака")
+    index.discard("type", "собака")
+    assert index.suggest("type", "соб") == ["собака"]
+
+    index.discard("type", "собака")
+    assert index.suggest("type", "соб") == []
@@ -0,0 +1,203 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, schemas
+from app.crud.pet import PUBLIC_COLUMNS
+
+
+async def create_pet(db: AsyncSession, **overrides) -> object:
+    pet_data = {
+        "name": "Барсик",
+        "type": "кошка",
+        "breed": "Персидская",
+        "color": "белый",
+        "age": 2.0,
+        "is_available": True,
+        "price": 18000.0,
+    }
+    pet_data.update(overrides)
+    return await crud.pet.create(db, obj_in=schemas.PetCreate(**pet_data))
+
+
+@pytest.mark.asyncio
+async def test_search_by_substring(db_session: AsyncSession):
+    """
+    Тест поиска питомцев по подстроке без учета регистра.
+    """
+    await create_pet(db_session, name="Барсик")
+    await create_pet(db_session, name="Мурка")
+
+    pets = await crud.pet.search(
+        db_session, params=schemas.PetSearchParams(name="АРС")
+    )
+
+    assert [pet.name for pet in pets] == ["Барсик"]
+
+
+@pytest.mark.asyncio
+async def test_search_escapes_like_wildcards(db_session: AsyncSession):
+    """
+    Тест того, что символы % и _ в запросе ищутся буквально.
+    """
+    await create_pet(db_session, name="Барсик")
+    await create_pet(db_session, name="Скидка_50%")
+
+    pets = await crud.pet.search(db_session, params=schemas.PetSearchParams(name="%"))
+    assert [pet.name for pet in pets] == ["Скидка_50%"]
+
+    pets = await crud.pet.search(db_session, params=schemas.PetSearchParams(name="_"))
+    assert [pet.name for pet in pets] == ["Скидка_50%"]
+
+
+@pytest.mark.asyncio
+async def test_search_json_cache_invalidated_on_write(db_session: AsyncSession):
+    """
+    Тест того, что запись через CRUD делает закешированные страницы устаревшими.
+    """
+    params = schemas.PetSearchParams(type="кошка")
+    await create_pet(db_session, name="Барсик")
+
+    first = await crud.pet.search_json(db_session, params=params, schema=schemas.Pet)
+    hits = crud.pet.search_cache.hits
+    cached = await crud.pet.search_json(
+        db_session, params=schemas.PetSearchParams(type="КОШКА"), schema=schemas.Pet
+    )
+    assert cached == first
+    assert crud.pet.search_cache.hits == hits + 1
+
+    await create_pet(db_session, name="Мурка")
+
+    fresh = await crud.pet.search_json(db_session, params=params, schema=schemas.Pet)
+    assert "Мурка" in fresh.body.decode()
+
+
+@pytest.mark.asyncio
+async def test_get_many_keeps_requested_order(db_session: AsyncSession):
+    """
+    Тест пакетного чтения: порядок запрошенных ID, без повторов и отсутствующих.
+    """
+    first_id = (await create_pet(db_session, name="Первый")).id
+    second_id = (await create_pet(db_session, name="Второй")).id
+
+    pets = await crud.pet.get_many(
+        db_session, ids=[second_id, 999999, first_id, second_id]
+    )
+
+    assert [pet.id for pet in pets] == [second_id, first_id]
+    assert await crud.pet.get_many(db_session, ids=[]) == []
+
+
+@pytest.mark.asyncio
+async def test_get_public_many_uses_shared_cache(db_session: AsyncSession):
+    """
+    Тест публичного чтения по ID через общий кеш: повторное чтение берется
+    из кеша, запись через CRUD сбрасывает его.
+    """
+    first = await create_pet(db_session, name="Первый")
+    second = await create_pet(db_session, name="Второй")
+    ids = [second.id, 999999, first.id]
+
+    pets = await crud.pet.get_public_many(db_session, ids)
+    assert [pet.id for pet in pets] == [second.id, first.id]
+    hits = crud.pet.pet_cache.hits
+    assert await crud.pet.get_public_many(db_session, ids) == pets
+    assert crud.pet.pet_cache.hits == hits + 2
+
+    await crud.pet.update(db_session, db_obj=first, obj_in={"name": "Обновленный"})
+    pet = await crud.pet.get_public(db_session, first.id)
+    assert pet.name == "Обновленный"
+    assert await crud.pet.get_public(db_session, 999999) is None
+
+
+@pytest.mark.asyncio
+async def test_public_rows_skip_secret_notes(db_session: AsyncSession):
+    """
+    Тест публичного чтения: только публичные колонки, без ORM объектов.
+    """
+    pet = await create_pet(db_session, name="Тайный", secret_notes="Секрет")
+
+    row = await crud.pet.get_row(db_session, pet.id, columns=PUBLIC_COLUMNS)
+    rows = await crud.pet.search_rows(
+        db_session, params=schemas.PetSearchParams(name="Тайный")
+    )
+
+    assert row.name == "Тайный"
+    assert "secret_notes" not in row._fields
+    assert [found.id for found in rows] == [pet.id]
+    assert "secret_notes" not in rows[0]._fields
+
+    # Администраторские пути загружают секретные заметки вместе с питомцем
+    admin_pet = await crud.pet.get(db_session, pet.id)
+    assert admin_pet.secret_notes == "Секрет"
+
+
+@pytest.mark.asyncio
+async def test_create_many_keeps_input_order(db_session: AsyncSession):
+    """
+    Тест массовой вставки: строки возвращаются в порядке входного списка.
+    """
+    pets_in = [
+        schemas.PetCreate(name=f"Пакет {i}", type="кролик", breed="Рекс", color="серый", age=1.0)
+        for i in range(5)
+    ]
+
+    rows = await crud.pet.create_many(
+        db_session, objs_in=pets_in, returning=PUBLIC_COLUMNS, batch_size=2
+    )
+
+    assert [row.name for row in rows] == [pet_in.name for pet_in in pets_in]
+    assert rows == sorted(rows, key=lambda row: row.id)
+    assert await crud.pet.create_many(db_session, objs_in=[]) == []
+
+    # Поля схемы, которых нет среди колонок, не попадают в INSERT (как в create)
+    class PetCreateWithSource(schemas.PetCreate):
+        source: str = "supplier.csv"
+
+    rows = await crud.pet.create_many(
+        db_session,
+        objs_in=[PetCreateWithSource(name="Источник", type="кролик", breed="Рекс", color="серый", age=1.0)],
+    )
+    assert len(rows) == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_return_changed_rows(db_session: AsyncSession):
+    """
+    Тест изменений через RETURNING: данные возвращаются тем же запросом.
+    """
+    pet = await create_pet(db_session, secret_notes="Секрет")
+    assert pet.id is not None
+    assert pet.secret_notes == "Секрет"
+    assert pet.updated_at is not None
+
+    updated = await crud.pet.update(
+        db_session, db_obj=pet, obj_in=schemas.PetUpdate(price=20000.0)
+    )
+    assert updated is pet
+    assert updated.price == 20000.0
+    assert updated.secret_notes == "Секрет"
+
+    # Устаревший объект (например, после commit с expire_on_commit) обновляется
+    # без неявной загрузки атрибутов
+    db_session.expire(pet)
+    updated = await crud.pet.update(
+        db_session, db_obj=pet, obj_in=schemas.PetUpdate(price=21000.0)
+    )
+    assert updated.price == 21000.0
+
+    row = await crud.pet.update_row(
+        db_session,
+        id=pet.id,
+        obj_in=schemas.PetUpdate(is_available=False),
+        returning=PUBLIC_COLUMNS,
+    )
+    assert row.is_available is False
+    assert "secret_notes" not in row._fields
+    assert await crud.pet.update_row(
+        db_session, id=-1, obj_in=schemas.PetUpdate(price=1.0)
+    ) is None
+
+    removed = await crud.pet.remove_row(db_session, id=pet.id, returning=PUBLIC_COLUMNS)
+    assert removed.id == pet.id
+    assert await crud.pet.remove_row(db_session, id=pet.id) is None
+    assert await crud.pet.remove(db_session, id=pet.id) is None
@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, schemas
+
+
+@pytest.mark.asyncio
+async def test_principal_cache_invalidated_on_update(db_session: AsyncSession):
+    """
+    Тест кеша прав: повторное чтение не обращается к БД, изменение
+    пользователя сразу сбрасывает запись.
+    """
+    user = await crud.user.create(
+        db_session,
+        obj_in=schemas.UserCreate(email="principal@example.com", password="password123"),
+    )
+
+    principal = await crud.user.get_principal(db_session, user.id)
+    assert principal == schemas.Principal(id=user.id, is_active=True, is_superuser=False)
+    hits = crud.user.principal_cache.hits
+    assert await crud.user.get_principal(db_session, user.id) == principal
+    assert crud.user.principal_cache.hits == hits + 1
+
+    await crud.user.update(db_session, db_obj=user, obj_in={"is_active": False})
+    principal = await crud.user.get_principal(db_session, user.id)
+    assert principal.is_active is False
+
+    await crud.user.remove(db_session, id=user.id)
+    assert await crud.user.get_principal(db_session, user.id) is None